@@ -7,15 +7,21 @@ from plotly.subplots import make_subplots
 from datetime import datetime, timedelta
 from concurrent.futures import ThreadPoolExecutor
 import requests
+import io
 import warnings
 warnings.filterwarnings('ignore')
 
-from screener import calculate_indicators, debug_ticker
-from backtester import run_backtest_on_screened
+from screener import debug_ticker, build_scan_context, VIX_REGIMES
+from scan_engine import run_scan, DEFAULT_WORKERS
+from backtester import run_backtest_on_screened, run_parameter_sweep, run_walk_forward
+from portfolio import run_portfolio_backtest
+from replay import run_replay
+from monte_carlo import monte_carlo_table
 from news_fetcher import fetch_news
 from news_intelligence import run_news_intelligence, run_vix_analysis
 from macro_intelligence import run_macro_intelligence
 from stock_universe import STOCK_UNIVERSE
+import price_store
 
 st.set_page_config(
     page_title="Murphy Stock Scanner",
@@ -266,6 +272,12 @@ def render_sidebar():
                                    help="Filters out extended stocks, sideways chop, bull traps")
         st.markdown("---")
         max_stocks = st.slider("Max stocks to scan", 50, 1584, 1584)
+        scan_workers  = st.slider("Scan workers", 1, 32, DEFAULT_WORKERS)
+        scan_executor = st.radio("Run scan on", ["thread", "process"], horizontal=True,
+                                 help="Threads suit network-bound scans; processes suit CPU-heavy ones")
+        two_phase     = st.checkbox("⚡ Two-phase scan", value=True,
+                                    help="Screen new stocks on a 3-month snapshot (price, volume, RSI) "
+                                         "before downloading 2 years of history")
         st.markdown("---")
 
         run_scan = st.button("🔍 STEP 1 — RUN SCAN", use_container_width=True)
@@ -273,6 +285,9 @@ def render_sidebar():
         st.markdown("")
         run_bt = st.button("📊 STEP 2 — BACKTEST", use_container_width=True)
         st.caption("Tests only stocks from Step 1 — 1 year, many trades")
+        bt_intrabar = st.checkbox("Intrabar stop / target", value=False,
+                                  help="Also exit each trade at the scanner's R/R stop and target, "
+                                       "filled from daily High/Low (gaps fill at the open)")
         st.markdown("")
         debug_ticker_input = st.text_input("🔧 Debug ticker (e.g. COIN)", value="").upper().strip()
         run_debug = st.button("🔧 Debug single stock", use_container_width=True)
@@ -285,7 +300,9 @@ def render_sidebar():
             bb_period=int(bb_period), bb_std=bb_std,
             min_institutional=min_inst, show_fresh_only=fresh_only,
             apply_quality_filter=apply_qf,
-            max_stocks=max_stocks, run_scan=run_scan, run_backtest=run_bt,
+            max_stocks=max_stocks, scan_workers=scan_workers, scan_executor=scan_executor,
+            two_phase=two_phase,
+            run_scan=run_scan, run_backtest=run_bt, bt_intrabar=bt_intrabar,
             run_debug=run_debug, debug_ticker=debug_ticker_input,
         )
 
@@ -450,7 +467,7 @@ def render_stock_card(stock, bt_summary=None):
 # ══════════════════════════════════════════════
 def render_chart(ticker, params):
     try:
-        df = yf.download(ticker, period="6mo", interval="1d", progress=False)
+        df = price_store.load(ticker, "6mo")
         if df.empty or len(df) < 50: return
         close = df['Close'].squeeze()
         df['MA20']  = close.rolling(20).mean()
@@ -542,10 +559,113 @@ def render_backtest_panel(bt_data):
         df = pd.DataFrame(rows).sort_values("Win Rate", ascending=False)
         st.dataframe(df, use_container_width=True, hide_index=True)
 
+    if overall.get('stops_hit') or overall.get('targets_hit'):
+        st.caption(f"Intrabar exits: {overall['stops_hit']} stopped out, "
+                   f"{overall['targets_hit']} reached target, "
+                   f"{total - overall['stops_hit'] - overall['targets_hit']} exited on signal or still open")
+
+    log = bt_data.get('trade_log', [])
     with st.expander("📋 Full Trade Log"):
-        log = bt_data.get('trade_log', [])
-        if log:
-            st.dataframe(pd.DataFrame(log), use_container_width=True, hide_index=True)
+        if len(log):
+            st.dataframe(log.display_frame(), use_container_width=True, hide_index=True)
+            buf = io.BytesIO()
+            log.to_parquet(buf)
+            st.download_button("⬇️ Export trades (Parquet)", buf.getvalue(),
+                               file_name="backtest_trades.parquet", key="bt_parquet")
+
+    if len(log) >= 10:
+        with st.expander("🎲 Monte Carlo — how much of this is luck?"):
+            secs = len(log) / 2000                  # one method, 10,000 paths: ~0.5 ms per trade
+            st.caption("10,000 resampled trade sequences — 95% ranges for win rate, average return "
+                       "and max drawdown at 10% of equity per trade. "
+                       + (f"Takes about {secs:.0f} s for these {len(log):,} trades."
+                          if secs >= 1.5 else "Takes about a second."))
+            method = st.radio("Resampling", ["iid", "block", "permutation"], horizontal=True, key="mc_method",
+                              format_func={"iid": "With replacement", "block": "In blocks (keeps streaks)",
+                                           "permutation": "Reshuffled"}.get)
+            if st.button("🎲 Run Monte Carlo", use_container_width=True, key="mc_btn"):
+                st.session_state['monte_carlo'] = monte_carlo_table(log, seed=0, methods=(method,))
+            mc = st.session_state.get('monte_carlo')
+            if mc is not None:
+                st.dataframe(mc, use_container_width=True, hide_index=True)
+
+
+def render_sweep_panel(tickers, params):
+    with st.expander("🧪 Parameter Sweep — which thresholds worked best?"):
+        st.caption("Backtests many RSI / MA50 / BB%B threshold combinations on the scanned stocks. "
+                   "Walk-forward re-optimises on each past year and scores the next quarter.")
+        mode     = st.radio("Search", ["Grid", "Random", "Walk-forward"], horizontal=True, key="sweep_mode")
+        n_random = st.slider("Rule sets to sample", 20, 240, 60, key="sweep_n") if mode == "Random" else None
+        if st.button("🧪 Run sweep", use_container_width=True, key="sweep_btn"):
+            pb, txt = st.progress(0), st.empty()
+            if mode == "Walk-forward":
+                st.session_state['walk_forward'] = run_walk_forward(
+                    tickers, params, progress_bar=pb, status_text=txt)
+            else:
+                st.session_state['sweep_results'] = run_parameter_sweep(
+                    tickers, params, n_random=n_random, progress_bar=pb, status_text=txt)
+            pb.empty(); txt.empty()
+        if mode == "Walk-forward":
+            wf = st.session_state.get('walk_forward')
+            if wf is not None:
+                if wf['windows'].empty:
+                    st.info("Not enough history for a walk-forward window.")
+                else:
+                    o, d = wf['overall'], wf['default']
+                    st.caption(f"Out-of-sample: {o['total_trades']} trades · win rate {o['win_rate']:.1f}% · "
+                               f"avg {o['avg_return']:+.2f}%  |  default rules: {d['win_rate']:.1f}% · "
+                               f"avg {d['avg_return']:+.2f}%")
+                    st.dataframe(wf['windows'], use_container_width=True, hide_index=True)
+            return
+        table = st.session_state.get('sweep_results')
+        if table is not None:
+            if table.empty:
+                st.info("No rule set produced enough trades.")
+            else:
+                st.dataframe(table.head(25), use_container_width=True)
+
+
+def render_portfolio_panel(tickers, params):
+    with st.expander("💼 Portfolio Simulation — one account, shared capital"):
+        st.caption("Trades all scanned stocks from one $100k account over the last 12 months, "
+                   "most oversold signals first, equal slices of equity per position")
+        c1, c2 = st.columns(2)
+        with c1: max_pos = st.slider("Max open positions", 1, 30, 10, key="pf_max_pos")
+        with c2: cost    = st.slider("Cost per side (bps)", 0, 50, 5, key="pf_cost")
+        if st.button("💼 Run portfolio simulation", use_container_width=True, key="pf_btn"):
+            txt = st.empty()
+            st.session_state['portfolio'] = run_portfolio_backtest(
+                tickers, params, max_positions=max_pos, cost_bps=cost, status_text=txt)
+            txt.empty()
+        pf = st.session_state.get('portfolio')
+        if pf and pf['stats']:
+            s = pf['stats']
+            cols = st.columns(5)
+            for col, lbl, val in zip(cols, ["Total Return", "CAGR", "Max Drawdown", "Sharpe", "Trades"],
+                                     [f"{s['total_return']:+.1f}%", f"{s['cagr']:+.1f}%",
+                                      f"{s['max_drawdown']:.1f}%", f"{s['sharpe']:.2f}",
+                                      str(s['total_trades'])]):
+                col.markdown(f'<div class="metric-card"><div class="scan-label">{lbl}</div>'
+                             f'<div class="scan-stat" style="font-size:1.2rem;">{val}</div></div>',
+                             unsafe_allow_html=True)
+            st.line_chart(pf['equity'])
+
+
+def render_replay_panel(tickers, params):
+    with st.expander("⏪ Screener Replay — how did past top picks do?"):
+        st.caption("Re-scores every scanned stock on every day of the last 2 years with today's "
+                   "filters, then measures forward returns of each day's top picks")
+        top_n = st.slider("Top picks per day", 1, 20, 10, key="rp_top_n")
+        if st.button("⏪ Run replay", use_container_width=True, key="rp_btn"):
+            bar, txt = st.progress(0), st.empty()
+            st.session_state['replay'] = run_replay(tickers, params, top_n=top_n,
+                                                    progress_bar=bar, status_text=txt)
+            bar.empty()
+            txt.empty()
+        rp = st.session_state.get('replay')
+        if rp and not rp['scores'].empty:
+            st.caption(f"{len(rp['scores']):,} passing stock-days")
+            st.dataframe(rp['performance'], use_container_width=True)
 
 
 # ══════════════════════════════════════════════
@@ -692,7 +812,7 @@ def render_macro_panel():
     # ── Headlines ─────────────────────────────────────────
     with st.expander(f"📋 Headlines used ({result.get('headline_count',0)})"):
         for h in result.get('headlines', [])[:20]:
-            src = h.get('source','')
+            src = h.get('source','') + (f" +{h['source_count'] - 1}" if h.get('source_count', 1) > 1 else '')
             url = h.get('url','#')
             st.markdown(
                 f'<div style="padding:0.25rem 0;border-bottom:1px solid #1e293b;">'
@@ -783,7 +903,8 @@ def render_news_intelligence():
         with st.expander(f"📋 Headlines ({len(result.get('headlines',[]))})"):
             for h in result.get('headlines', [])[:30]:
                 src_badge = f'<span style="background:rgba(59,130,246,0.1);color:#60a5fa;font-size:0.68rem;' \
-                            f'border-radius:3px;padding:0.1rem 0.3rem;margin-right:0.3rem;">{h.get("source","")}</span>'
+                            f'border-radius:3px;padding:0.1rem 0.3rem;margin-right:0.3rem;">{h.get("source","")}' \
+                            f'{" +" + str(h["source_count"] - 1) if h.get("source_count", 1) > 1 else ""}</span>'
                 st.markdown(
                     f'<div style="padding:0.3rem 0;border-bottom:1px solid #1e293b;">'
                     f'{src_badge}'
@@ -870,7 +991,7 @@ def main():
     elif vix >= 20:
         st.warning("⚠️ **VIX 20–30 — Rotate to defensives: Utilities (XLU), Healthcare (XLV), Consumer Staples (XLP). Avoid high-beta tech.**")
 
-    for k in ['scan_results', 'backtest_results', 'macro_intel']:
+    for k in ['scan_results', 'scan_context', 'scan_stats', 'backtest_results', 'macro_intel']:
         if k not in st.session_state:
             st.session_state[k] = None
 
@@ -896,21 +1017,22 @@ def main():
         st.info(f"🔍 Scanning {len(universe)} stocks...")
         pb = st.progress(0)
         st_txt = st.empty()
-        lock_results = []
-
-        for i, ticker in enumerate(universe):
-            pb.progress((i + 1) / len(universe))
-            st_txt.caption(f"Scanning {ticker}… ({i+1}/{len(universe)}) — found: {len(lock_results)}")
-            try:
-                r = calculate_indicators(ticker, params)
-                if r and r.get('passes_filter'):
-                    lock_results.append(r)
-            except Exception:
-                pass
-
-        lock_results.sort(key=lambda x: (-x.get('score', 0), x.get('ticker', '')))
+        scan_ctx   = build_scan_context()
+        scan_stats = {}
+        lock_results = run_scan(universe, params, pb, st_txt,
+                                executor=params['scan_executor'],
+                                max_workers=params['scan_workers'],
+                                ctx=scan_ctx, two_phase=params['two_phase'],
+                                stats=scan_stats)
+        st.session_state.scan_context     = scan_ctx
+        st.session_state.scan_stats       = scan_stats
         st.session_state.scan_results     = lock_results
         st.session_state.backtest_results = None
+        st.session_state.monte_carlo      = None
+        st.session_state.sweep_results    = None
+        st.session_state.walk_forward     = None
+        st.session_state.portfolio        = None
+        st.session_state.replay           = None
         pb.empty(); st_txt.empty()
 
         if len(lock_results) == 0:
@@ -927,8 +1049,10 @@ def main():
             st.info(f"📊 Backtesting {len(tickers)} stocks with RSI range {params.get('rsi_min',0)}–{params.get('rsi_max',90)}…")
             pb2 = st.progress(0)
             st2 = st.empty()
-            bt = run_backtest_on_screened(tickers, params, pb2, st2)
+            bt = run_backtest_on_screened(tickers, params, pb2, st2,
+                                          intrabar=params.get('bt_intrabar', False))
             st.session_state.backtest_results = bt
+            st.session_state.monte_carlo      = None     # described the previous trade log
             pb2.empty(); st2.empty()
             # Show note if 0 trades
             note = bt.get('note','')
@@ -958,15 +1082,8 @@ def main():
 
             # VIX Regime priority panel
             try:
-                from screener import VIX_REGIMES, get_vix_regime
-                vix_val = data.get("VIX", {}).get("value", 0) if 'data' in dir() else 0
-                try:
-                    vix_hist = yf.Ticker("^VIX").history(period="2d", interval="1d", actions=False)
-                    vix_val  = float(vix_hist['Close'].iloc[-1]) if not vix_hist.empty else vix_val
-                except Exception:
-                    pass
-                regime_key  = get_vix_regime(vix_val)
-                regime      = VIX_REGIMES[regime_key]
+                scan_ctx    = st.session_state.scan_context
+                regime      = VIX_REGIMES[scan_ctx.vix_regime]
                 priority_found = [r for r in results if r.get('vix_priority')]
                 if priority_found:
                     st.markdown(f"""
@@ -992,6 +1109,13 @@ def main():
             if fresh_only:
                 filtered = [r for r in filtered if r.get('signal_fresh', False)]
             st.caption(f"🔍 Passed screener: {len(results)} stocks | Showing: {len(filtered)}")
+            ss = st.session_state.scan_stats
+            if ss:
+                st.caption(f"📡 Downloaded: {ss['requests']} symbol requests "
+                           f"(one per stock, in {ss.get('batches', 0)} yf.download batches) · ~{ss['bytes']/1e6:.1f} MB"
+                           + (f" | Two-phase dropped {ss['prefiltered']} stocks early — single-phase "
+                              f"would be {ss['requests_single']} requests · ~{ss['bytes_single']/1e6:.1f} MB"
+                              if ss['prefiltered'] else ""))
             if sort_by == "RSI (lowest)":
                 filtered.sort(key=lambda x: x.get('rsi',100))
             elif sort_by == "Win Rate (backtest)" and bt_data:
@@ -1032,6 +1156,9 @@ def main():
             with t5:
                 if bt_data:
                     render_backtest_panel(bt_data)
+                    render_sweep_panel([r['ticker'] for r in results], params)
+                    render_portfolio_panel([r['ticker'] for r in results], params)
+                    render_replay_panel([r['ticker'] for r in results], params)
                 else:
                     st.info("Press **STEP 2 — BACKTEST** in the sidebar after scanning.")
     else:
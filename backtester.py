@@ -4,13 +4,22 @@ Backtester — simulates Murphy-style swing trades on scanned stocks.
 Buy signal  : RSI crosses below rsi_max AND price above MA200 AND price above MA50*0.97
 Sell signal : RSI crosses above 60 OR price drops below MA50*0.95 OR BB%B > 0.85
 Re-entry    : allowed after 2-bar cooldown
+Sweep       : run_parameter_sweep ranks many overrides of DEFAULT_RULES
 """
 
-import yfinance as yf
+import os
+import hashlib
+import itertools
+import threading
+from collections import OrderedDict
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
-from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import price_store
+from parallel import run_parallel
+from levels import risk_reward, support_resistance_history
+from trade_log import TradeLog, SIGNAL, STOP, TARGET, OPEN
 
 
 # ── Indicators ────────────────────────────────────────────────
@@ -30,143 +39,291 @@ def _bb_pct(s: pd.Series, period: int = 20, std_dev: float = 2.0) -> pd.Series:
     return (s - lower) / (upper - lower)
 
 
+def _prepare(df: pd.DataFrame) -> pd.DataFrame:
+    """Backtest columns of a price-store frame (tz-naive, no MultiIndex)."""
+    if df is None or df.empty or 'Close' not in df.columns:
+        return pd.DataFrame()
+    cols = (['Open'] if 'Open' in df.columns else []) + ['Close','High','Low','Volume']
+    return df[cols].dropna(subset=['Close']).copy()
+
+
 def _get_data(ticker: str) -> pd.DataFrame:
-    """Download 2 years of data using Ticker.history (reliable, no MultiIndex)."""
+    """2 years of daily bars from the local price store."""
     try:
-        t  = yf.Ticker(ticker)
-        df = t.history(period="2y", interval="1d", auto_adjust=True, actions=False)
-        if df is None or df.empty or 'Close' not in df.columns:
-            return pd.DataFrame()
-        return df[['Close','High','Low','Volume']].dropna(subset=['Close']).copy()
+        return _prepare(price_store.load(ticker, "2y"))
     except Exception:
         return pd.DataFrame()
 
 
+def _load_all(tickers: list, period: str = "2y") -> dict:
+    """{ticker: backtest frame} for many tickers in one price-store pass."""
+    try:
+        frames = price_store.load_many(tickers, period)
+    except Exception:
+        frames = {}
+    return {t: _prepare(frames.get(t)) for t in tickers}
+
+
+# ── Rules ─────────────────────────────────────────────────────
+# RELAXED fixed thresholds to generate enough trades — the screener already
+# filtered the stocks; the backtest just needs to find the entry/exit points
+# on those same stocks
+DEFAULT_RULES = {
+    "rsi_max":   55,      # buy: RSI below this (relaxed: catch more entry points)
+    "rsi_min":   0,
+    "ma200_buy": 0.97,    # buy: within 3% of MA200
+    "ma50_buy":  0.95,    # buy: within 5% of MA50
+    "rsi_sell":  65,      # sell: overbought
+    "ma50_stop": 0.93,    # sell: breaks below MA50
+    "bb_sell":   0.90,    # sell: %B above this
+}
+INDICATOR_DEFAULTS = {"rsi_period": 14, "bb_period": 20, "bb_std": 2.0}
+
+
+def _indicators(df: pd.DataFrame, rsi_period: int = 14, bb_period: int = 20,
+                bb_std: float = 2.0) -> dict:
+    """Every series the rules read, as arrays — computed once per ticker and indicator setting."""
+    close = df['Close']
+    return {
+        "dates": close.index,
+        "close": close.to_numpy(dtype=float),
+        "rsi":   _rsi(close, rsi_period).to_numpy(dtype=float),
+        "bb":    _bb_pct(close, bb_period, bb_std).to_numpy(dtype=float),
+        "ma50":  close.rolling(50).mean().to_numpy(dtype=float),
+        "ma200": close.rolling(200).mean().to_numpy(dtype=float),
+    }
+
+
+def _signals(ind: dict, rules: dict) -> tuple:
+    """(buy, sell) boolean arrays for one rule set. NaN never signals."""
+    c, r, ma50 = ind["close"], ind["rsi"], ind["ma50"]
+    with np.errstate(invalid='ignore'):
+        # Buy: RSI in oversold zone + above MAs (no BB requirement, it's informational)
+        buy  = ((r < rules["rsi_max"]) & (r > rules["rsi_min"]) &
+                (c > ind["ma200"] * rules["ma200_buy"]) & (c > ma50 * rules["ma50_buy"]))
+        # Sell: overbought OR breaks below MA
+        sell = ((r > rules["rsi_sell"]) | (c < ma50 * rules["ma50_stop"]) |
+                (ind["bb"] > rules["bb_sell"]))
+    return buy, sell
+
+
+# ── Trade simulation ──────────────────────────────────────────
+def _cutoff() -> pd.Timestamp:
+    return pd.Timestamp(datetime.today() - timedelta(days=365))
+
+
+def _trade_positions(close: np.ndarray, buy: np.ndarray, sell: np.ndarray,
+                     start: int = 0, loss_cooldown: int = 2, end: int = None) -> list:
+    """
+    Walk the buy/sell signal arrays over bars [start, end) and return the
+    trades as (entry, exit) bar positions; exit is None for a trade still
+    open at the end. Entry on the first buy bar while flat, exit on the first
+    sell bar after entry, then skip `loss_cooldown` bars if the trade lost.
+    Jumps from signal to signal instead of visiting every bar.
+    """
+    buys   = np.flatnonzero(buy[:end])
+    sells  = np.flatnonzero(sell[:end])
+    trades = []
+    i      = start
+    while True:
+        k = buys.searchsorted(i)
+        if k == len(buys):
+            break
+        entry = int(buys[k])
+        k = sells.searchsorted(entry + 1)
+        if k == len(sells):
+            trades.append((entry, None))
+            break
+        exit_ = int(sells[k])
+        trades.append((entry, exit_))
+        won = (close[exit_] - close[entry]) / close[entry] * 100 > 0
+        i   = exit_ + 1 + (0 if won else loss_cooldown)
+    return trades
+
+
+def _entry_levels(df: pd.DataFrame) -> callable:
+    """
+    levels(entry) -> (stop, target) as the scanner would have advertised them
+    on the entry bar: risk_reward on the support/resistance of the bars up
+    to that day. No resistance above price means no target (inf).
+    """
+    high, low = df['High'].to_numpy(dtype=float), df['Low'].to_numpy(dtype=float)
+    close     = df['Close'].to_numpy(dtype=float)
+    sup, res  = support_resistance_history(high, low, close)
+    level     = lambda x: None if np.isnan(x) else float(x)
+
+    def levels(entry: int) -> tuple:
+        rr = risk_reward(round(float(close[entry]), 2), level(sup[entry]), level(res[entry]))
+        return rr["stop"], rr["target"] if rr["target"] is not None else np.inf
+    return levels
+
+
+def _bracket_positions(df: pd.DataFrame, buy: np.ndarray, sell: np.ndarray, levels,
+                       start: int = 0, loss_cooldown: int = 2, end: int = None) -> tuple:
+    """
+    _trade_positions with a stop and a target on every trade, filled
+    intrabar. On each bar after entry: an open through either level fills at
+    the open (gap); otherwise Low <= stop fills at the stop and High >= target
+    at the target (stop first when one bar touches both); otherwise a sell
+    signal exits at the close. Each trade's exit is found with one array scan.
+    Returns (positions, exit fills, exit reasons) for TradeLog.from_positions.
+    """
+    close = df['Close'].to_numpy(dtype=float)
+    high, low = df['High'].to_numpy(dtype=float), df['Low'].to_numpy(dtype=float)
+    open_ = df['Open'].to_numpy(dtype=float) if 'Open' in df.columns else np.full(len(close), np.nan)
+    n     = len(close) if end is None else end
+    buys  = np.flatnonzero(buy[:n])
+    positions, fills, reasons = [], [], []
+    i = start
+    while True:
+        k = buys.searchsorted(i)
+        if k == len(buys):
+            break
+        entry = int(buys[k])
+        stop, target = levels(entry)
+        with np.errstate(invalid='ignore'):
+            stop_hit = low[entry+1:n] <= stop
+            tgt_hit  = high[entry+1:n] >= target
+        hit = stop_hit | tgt_hit | sell[entry+1:n]
+        if not hit.any():
+            positions.append((entry, None))
+            fills.append(np.nan)
+            reasons.append(OPEN)
+            break
+        j     = int(hit.argmax())
+        exit_ = entry + 1 + j
+        gap   = open_[exit_]
+        if gap <= stop:
+            fill, why = gap, STOP
+        elif gap >= target:
+            fill, why = gap, TARGET
+        elif stop_hit[j]:
+            fill, why = stop, STOP
+        elif tgt_hit[j]:
+            fill, why = target, TARGET
+        else:
+            fill, why = close[exit_], SIGNAL
+        positions.append((entry, exit_))
+        fills.append(fill)
+        reasons.append(why)
+        won = fill > close[entry]
+        i   = exit_ + 1 + (0 if won else loss_cooldown)
+    return positions, np.array(fills, dtype=float), np.array(reasons, dtype=np.int8)
+
+
+# ── Result cache ──────────────────────────────────────────────
+# _simulate outputs keyed by ticker, a hash of the bars, the first bar in the
+# test window and the settings the simulation reads — so a rerun only
+# recomputes tickers whose data or parameters changed. Least recently used
+# entries are evicted past RESULT_CACHE_SIZE.
+RESULT_CACHE_SIZE = 4096
+
+_RESULT_CACHE = OrderedDict()
+_RESULT_LOCK  = threading.Lock()
+_RESULT_STATS = {"hits": 0, "misses": 0}
+
+
+def _data_hash(df: pd.DataFrame, intrabar: bool = False) -> str:
+    """Content hash of the bars _simulate reads (dates and closes, plus OHL intrabar)."""
+    h = hashlib.blake2b(digest_size=16)
+    h.update(df.index.asi8.tobytes())
+    for col in (('Close', 'Open', 'High', 'Low') if intrabar else ('Close',)):
+        if col in df.columns:
+            h.update(np.ascontiguousarray(df[col].to_numpy(dtype=float)).tobytes())
+    return h.hexdigest()
+
+
+def _result_key(ticker: str, df: pd.DataFrame, params: dict, cutoff: pd.Timestamp,
+                rules: dict = None, intrabar: bool = False) -> tuple:
+    if df.empty:
+        return (ticker, None)
+    i     = int(df.index.searchsorted(cutoff))
+    first = df.index[i].isoformat() if i < len(df) else None
+    ind   = tuple(params.get(k, v) for k, v in INDICATOR_DEFAULTS.items())
+    return (ticker, _data_hash(df, intrabar), first, ind,
+            tuple(sorted({**DEFAULT_RULES, **(rules or {})}.items())), intrabar)
+
+
+def _cache_get(key: tuple):
+    with _RESULT_LOCK:
+        if key in _RESULT_CACHE:
+            _RESULT_CACHE.move_to_end(key)
+            _RESULT_STATS["hits"] += 1
+            return _RESULT_CACHE[key]
+        _RESULT_STATS["misses"] += 1
+        return None
+
+
+def _cache_put(key: tuple, result: dict):
+    with _RESULT_LOCK:
+        _RESULT_CACHE[key] = result
+        _RESULT_CACHE.move_to_end(key)
+        while len(_RESULT_CACHE) > RESULT_CACHE_SIZE:
+            _RESULT_CACHE.popitem(last=False)
+
+
+def result_cache_stats() -> dict:
+    """Hits/misses since import and current size of the backtest result cache."""
+    with _RESULT_LOCK:
+        return {**_RESULT_STATS, "size": len(_RESULT_CACHE)}
+
+
+def clear_result_cache():
+    with _RESULT_LOCK:
+        _RESULT_CACHE.clear()
+
+
 # ── Single ticker backtest ────────────────────────────────────
-def _backtest_one(ticker: str, params: dict) -> dict:
+def _backtest_one(ticker: str, params: dict, intrabar: bool = False) -> dict:
+    df, cutoff = _get_data(ticker), _cutoff()
+    key = _result_key(ticker, df, params, cutoff, intrabar=intrabar)
+    res = _cache_get(key)
+    if res is None:
+        res = _simulate(ticker, df, params, cutoff, intrabar=intrabar)
+        _cache_put(key, res)
+    return res
+
+
+def _simulate_item(item: tuple, params: dict, cutoff: pd.Timestamp,
+                   intrabar: bool = False) -> dict:
+    """run_parallel adapter: item = (ticker, bars)."""
+    ticker, df = item
+    return _simulate(ticker, df, params, cutoff, intrabar=intrabar)
+
+
+def _simulate(ticker: str, df: pd.DataFrame, params: dict, cutoff: pd.Timestamp = None,
+              rules: dict = None, intrabar: bool = False) -> dict:
+    """
+    Backtest one ticker on already-loaded bars with DEFAULT_RULES (overridden
+    by `rules`). With intrabar=True every trade also carries the scanner's
+    R/R stop and target, filled from the High/Low bars (_bracket_positions).
+    No I/O, safe to run in a worker process.
+    """
     try:
-        df = _get_data(ticker)
         if df.empty or len(df) < 80:
             return {}
 
-        close = df['Close']
-
-        # Parameters — use RELAXED fixed params for backtest to generate enough trades
-        # The screener already filtered the stocks; backtest just needs to find
-        # the entry/exit points on those same stocks
-        rsi_period = params.get('rsi_period', 14)
-        rsi_max    = 55      # relaxed: catch more entry points historically
-        rsi_min    = 0
-        bb_period  = params.get('bb_period', 20)
-        bb_std     = params.get('bb_std', 2.0)
-
-        rsi_s  = _rsi(close, rsi_period)
-        bb_s   = _bb_pct(close, bb_period, bb_std)
-        ma50   = close.rolling(50).mean()
-        ma200  = close.rolling(200).mean()
-
-        # ── Buy signal: RSI in oversold zone + above MAs ──────────
-        # Relaxed: no BB requirement (it's informational)
-        buy_sig = (
-            (rsi_s < rsi_max) &
-            (rsi_s > rsi_min) &
-            (close > ma200 * 0.97) &    # within 3% of MA200
-            (close > ma50  * 0.95)      # within 5% of MA50
-        )
-
-        # ── Sell signal: overbought OR breaks below MA ─────────────
-        sell_sig = (
-            (rsi_s > 65) |
-            (close < ma50 * 0.93) |
-            (bb_s  > 0.90)
-        )
-
         # Only backtest last 12 months
-        cutoff = pd.Timestamp(datetime.today() - timedelta(days=365))
-        idx    = close.index[close.index >= cutoff].tolist()
-
-        if len(idx) < 20:
+        if cutoff is None:
+            cutoff = _cutoff()
+        ind   = _indicators(df, *(params.get(k, v) for k, v in INDICATOR_DEFAULTS.items()))
+        start = int(ind["dates"].searchsorted(cutoff))
+        if len(df) - start < 20:
             return {}
 
         # ── Simulate trades ───────────────────────────────────────
-        trades        = []
-        in_trade      = False
-        buy_price     = None
-        buy_date      = None
-        cooldown      = 0
-
-        for date in idx:
-            if cooldown > 0:
-                cooldown -= 1
-                continue
-
-            price    = float(close.loc[date])
-            is_buy   = bool(buy_sig.loc[date])  if date in buy_sig.index  else False
-            is_sell  = bool(sell_sig.loc[date]) if date in sell_sig.index else False
-
-            if not in_trade:
-                if is_buy:
-                    in_trade  = True
-                    buy_price = price
-                    buy_date  = date
-            else:
-                if is_sell:
-                    pct    = (price - buy_price) / buy_price * 100
-                    hold_d = (date - buy_date).days
-                    won    = pct > 0
-                    trades.append({
-                        "ticker":     ticker,
-                        "buy_date":   buy_date.strftime('%Y-%m-%d'),
-                        "sell_date":  date.strftime('%Y-%m-%d'),
-                        "buy_price":  round(float(buy_price), 2),
-                        "sell_price": round(float(price), 2),
-                        "return_%":   round(pct, 2),
-                        "hold_days":  hold_d,
-                        "result":     "✅ Win" if won else "❌ Loss",
-                        "rsi_at_buy": round(float(rsi_s.loc[buy_date]), 1)
-                                      if buy_date in rsi_s.index else None,
-                    })
-                    in_trade  = False
-                    buy_price = None
-                    cooldown  = 2 if not won else 0   # short cooldown after loss
-
-        # Open trade at end
-        if in_trade and buy_price is not None:
-            last_price = float(close.iloc[-1])
-            pct        = (last_price - buy_price) / buy_price * 100
-            trades.append({
-                "ticker":     ticker,
-                "buy_date":   buy_date.strftime('%Y-%m-%d'),
-                "sell_date":  "OPEN",
-                "buy_price":  round(float(buy_price), 2),
-                "sell_price": round(float(last_price), 2),
-                "return_%":   round(pct, 2),
-                "hold_days":  (close.index[-1] - buy_date).days,
-                "result":     "🔵 Open",
-                "rsi_at_buy": None,
-            })
-
-        if not trades:
+        buy_sig, sell_sig = _signals(ind, {**DEFAULT_RULES, **(rules or {})})
+        if intrabar:
+            positions, fills, reasons = _bracket_positions(df, buy_sig, sell_sig,
+                                                           _entry_levels(df), start)
+            log = TradeLog.from_positions(ticker, ind["dates"], ind["close"], ind["rsi"],
+                                          positions, fills, reasons)
+        else:
+            log = TradeLog.from_positions(ticker, ind["dates"], ind["close"], ind["rsi"],
+                                          _trade_positions(ind["close"], buy_sig, sell_sig, start))
+        if not len(log):
             return {}
-
-        # ── Stats ─────────────────────────────────────────────────
-        closed  = [t for t in trades if t['sell_date'] != "OPEN"]
-        all_r   = [t['return_%'] for t in trades]
-        wins    = [t for t in closed if t['return_%'] > 0]
-        win_r   = len(wins) / len(closed) * 100 if closed else 0
-
-        return {
-            "ticker":       ticker,
-            "trades":       trades,
-            "total_trades": len(trades),
-            "wins":         len(wins),
-            "losses":       len(closed) - len(wins),
-            "win_rate":     round(win_r, 1),
-            "avg_return":   round(float(np.mean(all_r)), 2),
-            "best_trade":   round(float(max(all_r)), 2),
-            "worst_trade":  round(float(min(all_r)), 2),
-            "avg_hold_days":round(float(np.mean([t['hold_days'] for t in trades])), 1),
-        }
+        return {"ticker": ticker, "trades": log, **log.stats()}
 
     except Exception:
         return {}
@@ -174,62 +331,310 @@ def _backtest_one(ticker: str, params: dict) -> dict:
 
 # ── Public entry point ────────────────────────────────────────
 def run_backtest_on_screened(tickers: list, params: dict,
-                              progress_bar=None, status_text=None) -> dict:
+                              progress_bar=None, status_text=None,
+                              executor: str = "process", max_workers: int = None,
+                              intrabar: bool = False) -> dict:
     """
     Run backtest on screened stocks.
-    Returns {overall, per_stock, trade_log}
+    Bars are loaded once from the price store, then the simulations run in
+    parallel (processes by default: forkserver-started workers from
+    parallel.run_parallel's shared pool, each item carrying its own bars).
+    The 12-month cutoff is fixed up front
+    and results are merged in input order, so reruns on the same bars give
+    the same output. Tickers whose bars and settings are unchanged since
+    an earlier run come from the result cache without re-simulating.
+    intrabar=True adds the scanner's R/R stop and target to every trade.
+    Returns {overall, per_stock, trade_log (TradeLog, newest entry first)}
     """
-    per_stock = {}
-    trade_log = []
-    done      = 0
-    total     = len(tickers)
-
-    # Sequential to avoid yfinance cache issues
-    for ticker in tickers:
-        done += 1
+    if status_text:
+        status_text.caption(f"Loading price history for {len(tickers)} stocks…")
+    frames = _load_all(tickers)
+    cutoff = _cutoff()
+    keys   = {t: _result_key(t, frames[t], params, cutoff, intrabar=intrabar) for t in tickers}
+    cached = {t: _cache_get(k) for t, k in keys.items()}
+    items  = [(t, frames[t]) for t in dict.fromkeys(tickers) if cached[t] is None]
+
+    def on_done(item, res, done, total):
         if progress_bar:
             progress_bar.progress(done / total)
         if status_text:
-            status_text.caption(f"Backtesting {ticker}… ({done}/{total})")
-
-        res = _backtest_one(ticker, params)
-        if res and res.get('total_trades', 0) > 0:
-            per_stock[ticker] = {
-                k: res[k] for k in
-                ['total_trades','wins','losses','win_rate',
-                 'avg_return','best_trade','worst_trade','avg_hold_days']
-            }
-            trade_log.extend(res.get('trades', []))
-
-    if not trade_log:
+            status_text.caption(f"Backtesting {item[0]}… ({done}/{total})")
+
+    fresh = run_parallel(_simulate_item, items, params, cutoff, intrabar, executor=executor,
+                         max_workers=max_workers or os.cpu_count() or 4, on_done=on_done)
+    for (t, _), res in zip(items, fresh):
+        if res is not None:
+            _cache_put(keys[t], res)
+            cached[t] = res
+    if progress_bar and not items:
+        progress_bar.progress(1.0)
+    results = [cached[t] for t in tickers]
+
+    log = TradeLog.concat([res['trades'] for res in results
+                           if res and res.get('total_trades', 0) > 0])
+    if not len(log):
         return {
             "overall":   {"total_trades":0,"wins":0,"losses":0,
                           "win_rate":0,"avg_return":0,"best_trade":0,"worst_trade":0},
             "per_stock": {},
-            "trade_log": [],
+            "trade_log": log,
             "note":      "No trades found. Try widening RSI range or unchecking MA filters."
         }
 
-    all_r     = [t['return_%'] for t in trade_log]
-    closed    = [t for t in trade_log if t['sell_date'] != "OPEN"]
-    wins_all  = [t for t in closed if t['return_%'] > 0]
-    wr_all    = len(wins_all) / len(closed) * 100 if closed else 0
-
-    overall = {
-        "total_trades":   len(trade_log),
-        "wins":           len(wins_all),
-        "losses":         len(closed) - len(wins_all),
-        "win_rate":       round(wr_all, 1),
-        "avg_return":     round(float(np.mean(all_r)), 2),
-        "best_trade":     round(float(max(all_r)), 2),
-        "worst_trade":    round(float(min(all_r)), 2),
-        "tickers_tested": len(per_stock),
-    }
-
-    trade_log.sort(key=lambda x: x['buy_date'], reverse=True)
+    per_stock = log.per_ticker()
+    overall   = {**log.stats(), "tickers_tested": len(per_stock)}
 
     return {
         "overall":   overall,
         "per_stock": per_stock,
-        "trade_log": trade_log,
+        "trade_log": log.sorted_by_entry(),
     }
+
+
+# ── Parameter sweep ───────────────────────────────────────────
+DEFAULT_GRID = {
+    "rsi_max":   [40, 45, 50, 55, 60],
+    "rsi_sell":  [60, 65, 70, 75],
+    "ma50_stop": [0.90, 0.93, 0.95],
+    "bb_sell":   [0.85, 0.90, 0.95, 1.00],
+}
+
+
+def _combos(grid: dict, n_random: int = None, seed: int = 0) -> list:
+    """Every combination of `grid`, or a reproducible random sample of n_random of them."""
+    keys = list(grid)
+    full = list(itertools.product(*(grid[k] for k in keys)))
+    if n_random and n_random < len(full):
+        pick = np.sort(np.random.default_rng(seed).choice(len(full), n_random, replace=False))
+        full = [full[i] for i in pick]
+    return [dict(zip(keys, vals)) for vals in full]
+
+
+def _tally(close: np.ndarray, buy: np.ndarray, sell: np.ndarray,
+           start: int, end: int = None) -> np.ndarray:
+    """
+    [trades, closed, wins, return sum] for one rule set over bars [start, end),
+    on unrounded returns as in TradeLog.stats().
+    """
+    end = len(close) if end is None else end
+    out = np.zeros(4)
+    for entry, exit_ in _trade_positions(close, buy, sell, start, end=end):
+        px  = close[end - 1] if exit_ is None else close[exit_]
+        ret = (px - close[entry]) / close[entry] * 100
+        out += (1, exit_ is not None, exit_ is not None and ret > 0, ret)
+    return out
+
+
+def _combo_signals(df: pd.DataFrame, params: dict, combos: list):
+    """
+    Yield (close, buy, sell) for every combo on one ticker. Indicator series
+    are computed once per indicator setting and shared by all combos that
+    use it.
+    """
+    cache = {}
+    for combo in combos:
+        ind_key = tuple(combo.get(p, params.get(p, v)) for p, v in INDICATOR_DEFAULTS.items())
+        if ind_key not in cache:
+            cache[ind_key] = _indicators(df, *ind_key)
+        ind = cache[ind_key]
+        yield (ind["close"],) + _signals(ind, {**DEFAULT_RULES, **combo})
+
+
+def _sweep_item(item: tuple, params: dict, combos: list, cutoff: pd.Timestamp) -> np.ndarray:
+    """One ticker under every combo → array of [trades, closed, wins, return sum] per combo."""
+    ticker, df = item
+    out = np.zeros((len(combos), 4))
+    try:
+        if df.empty or len(df) < 80:
+            return out
+        start = int(df.index.searchsorted(cutoff))
+        if len(df) - start < 20:
+            return out
+        for k, (c, buy, sell) in enumerate(_combo_signals(df, params, combos)):
+            out[k] = _tally(c, buy, sell, start)
+    except Exception:
+        return np.zeros((len(combos), 4))
+    return out
+
+
+def _rates(totals: np.ndarray) -> tuple:
+    """(win rate %, average return %) per row of [trades, closed, wins, return sum]."""
+    trades, closed, wins, ret_sum = totals.T
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return (np.round(np.where(closed > 0, wins / closed * 100, 0), 1),
+                np.round(np.where(trades > 0, ret_sum / trades, 0), 2))
+
+
+def _ranked(totals: np.ndarray, min_trades: int = 0) -> np.ndarray:
+    """Combo indices with at least `min_trades` trades, best first (win rate, then average return)."""
+    win_rate, avg_ret = _rates(totals)
+    trades = totals[:, 0]
+    keep   = np.flatnonzero(trades >= min_trades)
+    return keep[np.lexsort((-trades[keep], -avg_ret[keep], -win_rate[keep]))]
+
+
+def _summary_table(combos: list, totals: np.ndarray, min_trades: int = 0) -> pd.DataFrame:
+    """Rule sets with their totals, ranked by win rate then average return."""
+    trades, closed, wins, _ = totals.T
+    win_rate, avg_ret = _rates(totals)
+    table = pd.DataFrame(combos).assign(
+        total_trades = trades.astype(int),
+        wins         = wins.astype(int),
+        losses       = (closed - wins).astype(int),
+        win_rate     = win_rate,
+        avg_return   = avg_ret,
+    )
+    table = table.iloc[_ranked(totals, min_trades)].reset_index(drop=True)
+    table.index = table.index + 1
+    table.index.name = "rank"
+    return table
+
+
+def run_parameter_sweep(tickers: list, params: dict, grid: dict = None,
+                        n_random: int = None, seed: int = 0, min_trades: int = 5,
+                        progress_bar=None, status_text=None,
+                        executor: str = "process", max_workers: int = None) -> pd.DataFrame:
+    """
+    Backtest many rule sets over the same tickers and 12-month window.
+    `grid` maps DEFAULT_RULES / INDICATOR_DEFAULTS keys to candidate values
+    (DEFAULT_GRID if None); n_random samples that many combinations instead
+    of trying them all. Bars are loaded once and each ticker runs every
+    combination in one worker.
+    Returns one row per rule set with at least `min_trades` trades, ranked by
+    win rate then average return.
+    """
+    combos = _combos(grid or DEFAULT_GRID, n_random, seed)
+    if status_text:
+        status_text.caption(f"Loading price history for {len(tickers)} stocks…")
+    frames = _load_all(tickers)
+    cutoff = _cutoff()
+
+    def on_done(item, res, done, total):
+        if progress_bar:
+            progress_bar.progress(done / total)
+        if status_text:
+            status_text.caption(f"Sweeping {len(combos)} rule sets on {item[0]}… ({done}/{total})")
+
+    results = run_parallel(_sweep_item, [(t, frames[t]) for t in tickers], params, combos, cutoff,
+                           executor=executor, max_workers=max_workers or os.cpu_count() or 4,
+                           on_done=on_done)
+    totals = np.zeros((len(combos), 4))
+    for res in results:
+        if res is not None:
+            totals += res
+
+    return _summary_table(combos, totals, min_trades)
+
+
+# ── Walk-forward ──────────────────────────────────────────────
+def _windows(first: pd.Timestamp, last: pd.Timestamp, train_days: int,
+             test_days: int, warmup_days: int) -> list:
+    """Rolling (train_start, train_end, test_end) bounds; each test slice follows its train slice."""
+    train, test = pd.Timedelta(days=train_days), pd.Timedelta(days=test_days)
+    bounds = []
+    t = first + pd.Timedelta(days=warmup_days) + train
+    while t <= last:
+        bounds.append((t - train, t, min(t + test, last + pd.Timedelta(days=1))))
+        t += test
+    return bounds
+
+
+def _walk_item(item: tuple, params: dict, combos: list, bounds: list) -> np.ndarray:
+    """
+    One ticker, every combo, every window → array (windows, 2, combos, 4) of
+    train/test [trades, closed, wins, return sum]. Indicators and signals are
+    computed once over the whole history; windows only slice them.
+    """
+    ticker, df = item
+    out = np.zeros((len(bounds), 2, len(combos), 4))
+    try:
+        if df.empty or len(df) < 80:
+            return out
+        pos = df.index.searchsorted([b for w in bounds for b in w]).reshape(len(bounds), 3)
+        for k, (c, buy, sell) in enumerate(_combo_signals(df, params, combos)):
+            for w, (a, b, e) in enumerate(pos):
+                if b - a >= 20:
+                    out[w, 0, k] = _tally(c, buy, sell, a, b)
+                if e - b >= 5:
+                    out[w, 1, k] = _tally(c, buy, sell, b, e)
+    except Exception:
+        return np.zeros((len(bounds), 2, len(combos), 4))
+    return out
+
+
+def _totals_row(t: np.ndarray) -> dict:
+    win_rate, avg_ret = _rates(t[None, :])
+    return {"total_trades": int(t[0]), "win_rate": float(win_rate[0]),
+            "avg_return": float(avg_ret[0])}
+
+
+def run_walk_forward(tickers: list, params: dict, grid: dict = None,
+                     n_random: int = None, seed: int = 0, min_trades: int = 5,
+                     period: str = "5y", train_days: int = 365, test_days: int = 91,
+                     warmup_days: int = 300, progress_bar=None, status_text=None,
+                     executor: str = "process", max_workers: int = None) -> dict:
+    """
+    Walk-forward optimisation over the stored history: for each rolling
+    window pick the best rule set on the train slice (same ranking as
+    run_parameter_sweep) and score it on the following test slice, next to
+    DEFAULT_RULES on the same slice. Each worker runs one ticker through
+    every window, so all windows progress in parallel and indicators are
+    computed once per ticker.
+    Returns {windows: DataFrame, overall: {...}, default: {...}}.
+    """
+    combos = _combos(grid or DEFAULT_GRID, n_random, seed)
+    if DEFAULT_RULES not in [{**DEFAULT_RULES, **c} for c in combos]:
+        combos.append({})                        # baseline for the comparison column
+    base_k = [{**DEFAULT_RULES, **c} for c in combos].index(DEFAULT_RULES)
+
+    if status_text:
+        status_text.caption(f"Loading {period} of price history for {len(tickers)} stocks…")
+    frames = _load_all(tickers, period)
+    loaded = [df for df in frames.values() if not df.empty]
+    if not loaded:
+        return {"windows": pd.DataFrame(), "overall": _totals_row(np.zeros(4)),
+                "default": _totals_row(np.zeros(4))}
+    bounds = _windows(min(df.index[0] for df in loaded), max(df.index[-1] for df in loaded),
+                      train_days, test_days, warmup_days)
+
+    def on_done(item, res, done, total):
+        if progress_bar:
+            progress_bar.progress(done / total)
+        if status_text:
+            status_text.caption(f"Walk-forward on {item[0]}… ({done}/{total})")
+
+    results = run_parallel(_walk_item, [(t, frames[t]) for t in tickers], params, combos, bounds,
+                           executor=executor, max_workers=max_workers or os.cpu_count() or 4,
+                           on_done=on_done)
+    totals = np.zeros((len(bounds), 2, len(combos), 4))
+    for res in results:
+        if res is not None:
+            totals += res
+
+    defaults = {**DEFAULT_RULES, **{k: params.get(k, v) for k, v in INDICATOR_DEFAULTS.items()}}
+    rows, picked, base = [], np.zeros(4), np.zeros(4)
+    for w, (a, b, e) in enumerate(bounds):
+        order = _ranked(totals[w, 0], min_trades)
+        if not len(order):
+            continue
+        k     = order[0]
+        train = _totals_row(totals[w, 0, k])
+        test  = _totals_row(totals[w, 1, k])
+        dflt  = _totals_row(totals[w, 1, base_k])
+        picked += totals[w, 1, k]
+        base   += totals[w, 1, base_k]
+        rows.append({
+            "train_start": a.date(), "test_start": b.date(), "test_end": e.date(),
+            **{key: val for key, val in {**defaults, **combos[k]}.items()
+               if key in (grid or DEFAULT_GRID)},
+            "train_win_rate":     train['win_rate'],
+            "train_avg_return":   train['avg_return'],
+            "test_trades":        test['total_trades'],
+            "test_win_rate":      test['win_rate'],
+            "test_avg_return":    test['avg_return'],
+            "default_win_rate":   dflt['win_rate'],
+            "default_avg_return": dflt['avg_return'],
+        })
+
+    return {"windows": pd.DataFrame(rows), "overall": _totals_row(picked),
+            "default": _totals_row(base)}
@@ -0,0 +1,188 @@
+"""
+Chart patterns — Murphy-style pattern detection on aligned bar arrays.
+
+Every pattern is a test on the last 30–90 bars. The window statistics those
+tests need (segment min/max/mean, least-squares slopes, wedge widths) are
+computed once, in closed form, for every ticker at the same time, and the ten
+checks only read from them. Arrays are bars × tickers and right-aligned as in
+indicator_panel.right_align (row -1 is every ticker's last bar); a single
+ticker's 1-D series works too.
+"""
+
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from indicator_panel import build_panel, right_align
+
+
+# (name, type, strength) in report order; None = strength computed per ticker
+PATTERNS = (
+    ("Double Bottom (W)",      "bullish", None),
+    ("Inv. Head & Shoulders",  "bullish", 0.9),
+    ("Ascending Triangle",     "bullish", 0.8),
+    ("Cup & Handle",           "bullish", 0.85),
+    ("Falling Wedge",          "bullish", 0.75),
+    ("Bull Flag",              "bullish", 0.8),
+    ("Double Top (M) ⚠️",      "bearish", 0.85),
+    ("H&S Top ⚠️",             "bearish", 0.9),
+    ("Descending Triangle ⚠️", "bearish", 0.75),
+    ("Rising Wedge ⚠️",        "bearish", 0.7),
+)
+MIN_BARS = 50     # no pattern is reported on shorter histories
+MAX_LOOK = 90     # longest window any pattern reads
+
+
+# ── Window statistics ─────────────────────────────────────────
+def _prep(x) -> np.ndarray:
+    """2-D float array with at least MAX_LOOK rows (NaN-padded on top)."""
+    x = np.asarray(x, dtype=float)
+    x = x.reshape(len(x), -1)
+    if len(x) < MAX_LOOK:
+        x = np.vstack([np.full((MAX_LOOK - len(x), x.shape[1]), np.nan), x])
+    return x
+
+
+def slope(y: np.ndarray) -> np.ndarray:
+    """Least-squares slope of each column against x = 0..m-1, in closed form."""
+    xc = np.arange(len(y)) - (len(y) - 1) / 2
+    return xc @ y / (xc @ xc)
+
+
+def segment_stats(high, low, close) -> dict:
+    """
+    Every window statistic the pattern checks use, one value per ticker.
+    Segments are counted back from the last bar.
+    """
+    h, l, c = _prep(high), _prep(low), _prep(close)
+    mn, mx, avg = np.nanmin, np.nanmax, np.nanmean
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)    # all-NaN windows on short tickers
+        h40, l40 = h[-40:], l[-40:]
+        return {
+            "price":      c[-1],
+            # last 60 closes split in halves, middle 30 for the neckline
+            "c60_min_a":  mn(c[-60:-30], axis=0),
+            "c60_min_b":  mn(c[-30:],    axis=0),
+            "c60_max_a":  mx(c[-60:-30], axis=0),
+            "c60_max_b":  mx(c[-30:],    axis=0),
+            "c60_max_mid": mx(c[-45:-15], axis=0),
+            "c60_min_mid": mn(c[-45:-15], axis=0),
+            # last 80 closes in quarters (shoulder, head, shoulder), neckline 10 bars in
+            "c80_min_q":  [mn(c[i:i+20], axis=0) for i in (-80, -60, -40)],
+            "c80_max_q":  [mx(c[i:i+20], axis=0) for i in (-80, -60, -40)],
+            "c80_max_neck": mx(c[-70:-50], axis=0),
+            "c80_min_neck": mn(c[-70:-50], axis=0),
+            # cup = bars -90..-16, handle = last 15
+            "cup_low":    mn(c[-90:-15], axis=0),
+            "cup_left":   avg(c[-90:-75], axis=0),
+            "cup_right":  avg(c[-30:-15], axis=0),
+            "cup_last":   c[-16],
+            "handle_rng": (mx(c[-15:], axis=0) - mn(c[-15:], axis=0)) / avg(c[-15:], axis=0),
+            # flag pole = bars -30..-11, flag = last 10
+            "pole_gain":  (c[-11] - c[-30]) / c[-30] * 100,
+            "flag_rng":   (mx(c[-10:], axis=0) - mn(c[-10:], axis=0)) / avg(c[-10:], axis=0) * 100,
+            "flag_slope": slope(c[-10:]),
+            # last 40 highs/lows
+            "h40_rng":    (mx(h40, axis=0) - mn(h40, axis=0)) / avg(h40, axis=0),
+            "l40_rng":    (mx(l40, axis=0) - mn(l40, axis=0)) / avg(l40, axis=0),
+            "h40_slope":  slope(h40),
+            "l40_slope":  slope(l40),
+            "width_start": h40[0] - l40[0],
+            "width_end":   h40[-1] - l40[-1],
+        }
+
+
+# ── Pattern checks ────────────────────────────────────────────
+def detect(high, low, close, n_bars=None) -> dict:
+    """
+    {pattern name: (hit, strength)} with one boolean / strength per ticker.
+    n_bars is each ticker's own history length (defaults to the row count).
+    """
+    s = segment_stats(high, low, close)
+    n = np.asarray(len(close) if n_bars is None else n_bars)
+    p = s["price"]
+    ok = n >= MIN_BARS
+    out = {}
+    with np.errstate(invalid='ignore', divide='ignore'):
+        # 1. Double Bottom (W) — two similar lows, right side back at the neckline
+        lo1, lo2, neck = s["c60_min_a"], s["c60_min_b"], s["c60_max_mid"]
+        diff = np.abs(lo1 - lo2) / ((lo1 + lo2) / 2)
+        out["Double Bottom (W)"] = (ok & (n >= 60) & (diff < 0.04) &
+                                    (neck > np.maximum(lo1, lo2) * 1.02) & (p >= neck * 0.98),
+                                    1.0 - diff * 5)
+
+        # 2. Inverse Head & Shoulders — deepest low in the middle, similar shoulders
+        ls, hd, rs = s["c80_min_q"]
+        out["Inv. Head & Shoulders"] = (ok & (n >= 80) & (hd < ls) & (hd < rs) &
+                                        (np.abs(ls - rs) / ((ls + rs) / 2) < 0.06) &
+                                        (p >= s["c80_max_neck"] * 0.97), 0.9)
+
+        # 3. Ascending Triangle — flat resistance, rising lows
+        out["Ascending Triangle"] = (ok & (s["h40_rng"] < 0.04) & (s["l40_slope"] > 0), 0.8)
+
+        # 4. Cup & Handle — rounded bottom then a tight handle
+        cl, cr, low_ = s["cup_left"], s["cup_right"], s["cup_low"]
+        out["Cup & Handle"] = (ok & (n >= 90) & (cl > low_ * 1.05) & (cr > low_ * 1.05) &
+                               (np.abs(cl - cr) / cl < 0.05) & (s["handle_rng"] < 0.06) &
+                               (p > s["cup_last"] * 0.98), 0.85)
+
+        # 5. Falling Wedge — both lines down, lows falling less, narrowing by 40%+
+        sh, sl = s["h40_slope"], s["l40_slope"]
+        narrowing = s["width_end"] < s["width_start"] * 0.6
+        out["Falling Wedge"] = (ok & (sh < 0) & (sl < 0) & (sl > sh) & narrowing, 0.75)
+
+        # 6. Bull Flag — strong pole then tight flat/down consolidation
+        out["Bull Flag"] = (ok & (s["pole_gain"] > 8) & (s["flag_rng"] < 5) &
+                            (s["flag_slope"] <= 0), 0.8)
+
+        # 7. Double Top (M) — two similar highs, price back at the middle low
+        hi1, hi2, mid = s["c60_max_a"], s["c60_max_b"], s["c60_min_mid"]
+        out["Double Top (M) ⚠️"] = (ok & (n >= 60) &
+                                    (np.abs(hi1 - hi2) / ((hi1 + hi2) / 2) < 0.03) &
+                                    (mid < np.minimum(hi1, hi2) * 0.97) & (p <= mid * 1.02), 0.85)
+
+        # 8. Head & Shoulders Top
+        ls, hd, rs = s["c80_max_q"]
+        out["H&S Top ⚠️"] = (ok & (n >= 80) & (hd > ls) & (hd > rs) &
+                             (np.abs(ls - rs) / ((ls + rs) / 2) < 0.06) &
+                             (p <= s["c80_min_neck"] * 1.02), 0.9)
+
+        # 9. Descending Triangle — flat support, falling highs
+        out["Descending Triangle ⚠️"] = (ok & (s["l40_rng"] < 0.04) & (sh < 0), 0.75)
+
+        # 10. Rising Wedge — both lines up, highs rising less, narrowing
+        out["Rising Wedge ⚠️"] = (ok & (sh > 0) & (sl > 0) & (sh < sl) & narrowing, 0.7)
+    return out
+
+
+def pattern_list(found: dict, j: int = 0) -> list:
+    """Ticker j's hits as [{"name", "type", "strength"}], in report order."""
+    out = []
+    for name, kind, _ in PATTERNS:
+        hit, strength = found[name]
+        if hit[j]:
+            val = strength[j] if np.ndim(strength) else strength
+            out.append({"name": name, "type": kind, "strength": round(float(val), 2)})
+    return out
+
+
+# ── Entry points ──────────────────────────────────────────────
+def frame_patterns(df: pd.DataFrame) -> list:
+    """Patterns for one ticker's OHLCV frame."""
+    try:
+        if len(df) < MIN_BARS:
+            return []
+        return pattern_list(detect(df['High'], df['Low'], df['Close']))
+    except Exception:
+        return []
+
+
+def batch_patterns(frames: dict) -> dict:
+    """{ticker: patterns} for many tickers in one set of array operations."""
+    panel = right_align(build_panel(frames, ('High','Low','Close')))
+    if panel['Close'].size == 0:
+        return {}
+    found = detect(panel['High'], panel['Low'], panel['Close'], panel['n_bars'])
+    return {t: pattern_list(found, j) for j, t in enumerate(panel['tickers'])}
@@ -0,0 +1,239 @@
+"""
+Feed cache — RSS/HTTP bodies kept on disk and revalidated with conditional
+requests.
+
+Each URL's last body is stored next to its ETag / Last-Modified. A fetch
+within the source's minimum refresh interval is served from disk with no
+network call; after that the feed is requested with If-None-Match /
+If-Modified-Since, and a 304 serves the stored copy. When the network fails
+the stored copy is served stale rather than nothing.
+
+stream() yields the body as it comes off the network, so a parser can work
+on a feed while it downloads; fetch() returns it whole. SESSION is the
+keep-alive connection pool every news fetcher shares.
+"""
+
+import os
+import json
+import time
+import hashlib
+import itertools
+import threading
+from urllib.parse import urlparse
+
+import requests
+
+
+CACHE_DIR       = os.environ.get("FEED_CACHE_DIR",
+                                 os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                              ".cache", "feeds"))
+DEFAULT_REFRESH = 180       # seconds between network checks of the same URL
+REFRESH_SECONDS = {         # per-source overrides (by host)
+    "news.google.com":     300,
+    "seekingalpha.com":    120,
+    "www.bizportal.co.il": 600,
+    "www.calcalist.co.il": 600,
+}
+POOL_SIZE       = 16
+CHUNK_SIZE      = 16384     # bytes per streamed read
+
+SESSION = requests.Session()
+SESSION.headers.update({'User-Agent': 'Mozilla/5.0'})
+SESSION.mount("https://", requests.adapters.HTTPAdapter(pool_connections=8, pool_maxsize=POOL_SIZE))
+
+_LOCK    = threading.Lock()
+_INDEX   = None           # {url: {"etag", "modified", "checked": epoch}}
+_STATS   = {"fresh": 0, "not_modified": 0, "downloaded": 0, "stale": 0}
+_TMP_IDS = itertools.count()
+
+
+# ── Disk ──────────────────────────────────────────────────────
+def _index_path() -> str:
+    return os.path.join(CACHE_DIR, "_index.json")
+
+
+def _body_path(url: str) -> str:
+    return os.path.join(CACHE_DIR, hashlib.sha1(url.encode()).hexdigest() + ".body")
+
+
+def _load_index() -> dict:
+    global _INDEX
+    if _INDEX is None:
+        try:
+            with open(_index_path()) as f:
+                _INDEX = json.load(f)
+        except Exception:
+            _INDEX = {}
+    return _INDEX
+
+
+def _save_index():
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        tmp = _index_path() + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(_INDEX, f)
+        os.replace(tmp, _index_path())
+    except Exception:
+        pass
+
+
+def _read(url: str):
+    try:
+        with open(_body_path(url), "rb") as f:
+            return f.read()
+    except Exception:
+        return None
+
+
+def _tmp_path(url: str) -> str:
+    return _body_path(url) + f".{os.getpid()}.{next(_TMP_IDS)}.tmp"     # one per download, even off-thread
+
+
+# ── Fetch ─────────────────────────────────────────────────────
+def refresh_interval(url: str) -> float:
+    return REFRESH_SECONDS.get(urlparse(url).netloc, DEFAULT_REFRESH)
+
+
+def stream(url: str, timeout: float = 8, min_interval: float = None, chunk_size: int = CHUNK_SIZE):
+    """
+    Body of `url` as an iterator of byte chunks, yielded as they arrive off
+    the network (or in one piece from disk). Yields nothing if the feed has
+    never been fetched successfully. Served from disk when checked less than
+    `min_interval` seconds ago (default: the host's REFRESH_SECONDS),
+    otherwise revalidated.
+    """
+    interval = refresh_interval(url) if min_interval is None else min_interval
+    with _LOCK:
+        meta = dict(_load_index().get(url, {}))
+    if meta and time.time() - meta.get("checked", 0) < interval:
+        body = _read(url)
+        if body is not None:
+            _count("fresh")
+            yield body
+            return
+
+    headers = {}
+    if meta.get("etag"):
+        headers["If-None-Match"] = meta["etag"]
+    if meta.get("modified"):
+        headers["If-Modified-Since"] = meta["modified"]
+    try:
+        resp = SESSION.get(url, timeout=timeout, headers=headers, stream=True)
+        if resp.status_code == 304 and _read(url) is None:
+            resp.close()
+            _forget(url)                    # validators outlived the body — ask again unconditionally
+            meta, resp = {}, SESSION.get(url, timeout=timeout, stream=True)
+    except Exception:
+        resp = None
+
+    if resp is not None and resp.status_code == 304:
+        resp.close()
+        body = _read(url)
+        if body is not None:
+            _count("not_modified")
+            _remember(url, {**meta, "checked": time.time()})
+            yield body
+            return
+    if resp is not None and resp.status_code == 200:
+        if (yield from _download(url, resp, chunk_size)):
+            return
+    elif resp is not None:
+        resp.close()
+
+    _count("stale")
+    body = _read(url) if meta else None     # network failed — serve what we have
+    if body is not None:
+        yield body
+
+
+def _download(url: str, resp, chunk_size: int):
+    """
+    Yield resp's body chunk by chunk while spooling it to a temp file. If the
+    reader stops early, the rest is drained to disk by a background thread so
+    the cached copy is complete without holding up the reader. The body and
+    its validators are stored only once the whole response is on disk.
+    Returns whether anything was yielded.
+    """
+    tmp, sent = _tmp_path(url), False
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        f = open(tmp, "wb")
+    except Exception:
+        resp.close()
+        return False
+    chunks = resp.iter_content(chunk_size)
+    try:
+        for chunk in chunks:
+            f.write(chunk)
+            sent = True
+            yield chunk
+    except GeneratorExit:               # reader has what it needs — finish the cache copy off-thread
+        threading.Thread(target=_finish, args=(url, resp, f, tmp, chunks), daemon=True).start()
+        raise
+    except Exception:
+        _finish(url, resp, f, tmp, None)
+        return sent
+    _finish(url, resp, f, tmp, ())
+    return sent
+
+
+def _finish(url: str, resp, f, tmp: str, rest):
+    """
+    Write the `rest` of the body to the open temp file, then store it as
+    url's cached copy with resp's validators. rest=None (the download
+    failed) discards the temp file.
+    """
+    done = False
+    try:
+        if rest is not None:
+            for chunk in rest:
+                f.write(chunk)
+            done = True
+    except Exception:
+        pass
+    finally:
+        f.close()
+        resp.close()
+    if not done:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        return
+    _count("downloaded")
+    try:
+        os.replace(tmp, _body_path(url))
+        _remember(url, {"etag":     resp.headers.get("ETag"),
+                        "modified": resp.headers.get("Last-Modified"),
+                        "checked":  time.time()})
+    except Exception:
+        _forget(url)                    # validators only describe a body we kept
+
+
+def fetch(url: str, timeout: float = 8, min_interval: float = None):
+    """Whole body of `url` as bytes (see stream()), or None if there is none."""
+    return b"".join(stream(url, timeout, min_interval)) or None
+
+
+def _count(key: str):
+    with _LOCK:
+        _STATS[key] += 1
+
+
+def _remember(url: str, meta: dict):
+    with _LOCK:
+        _load_index()[url] = meta
+        _save_index()
+
+
+def _forget(url: str):
+    with _LOCK:
+        if _load_index().pop(url, None) is not None:
+            _save_index()
+
+
+def cache_stats() -> dict:
+    """fresh / not_modified / downloaded / stale counts since import."""
+    with _LOCK:
+        return dict(_STATS)
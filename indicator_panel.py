@@ -0,0 +1,249 @@
+"""
+Indicator panel — screener indicators for the whole universe at once.
+
+Per-ticker frames are loaded into aligned 2-D NumPy arrays (dates × tickers)
+and RSI, Bollinger %B, MACD, MA20/50/200, 4-week trend and volume averages
+are computed for every column in one vectorized pass. compute_features()
+returns the last-bar values with the same guards and rounding as the
+screener's scalar helpers (_rsi, _bb, _macd, _trend_pct), so the filters and
+scoring in calculate_indicators can consume them directly.
+
+All series functions work along axis 0 and treat NaN as "no bar".
+"""
+
+import numpy as np
+import pandas as pd
+
+
+PANEL_FIELDS = ('Open','High','Low','Close','Volume')
+
+
+# ── Panel construction ────────────────────────────────────────
+def build_panel(frames: dict, fields: tuple = PANEL_FIELDS) -> dict:
+    """
+    Align {ticker: OHLCV DataFrame} on the union of their dates.
+    Returns {"dates": DatetimeIndex, "tickers": [...], field: 2-D array, ...}
+    with NaN where a ticker has no bar.
+    """
+    tickers = [t for t, df in frames.items() if df is not None and not df.empty]
+    dates   = pd.DatetimeIndex([])
+    for t in tickers:
+        dates = dates.union(frames[t].index)
+
+    panel = {"dates": dates, "tickers": tickers}
+    for f in fields:
+        arr = np.full((len(dates), len(tickers)), np.nan)
+        for j, t in enumerate(tickers):
+            df = frames[t]
+            if f in df.columns:
+                arr[dates.get_indexer(df.index), j] = df[f].to_numpy(dtype=float)
+        panel[f] = arr
+    return panel
+
+
+def right_align(panel: dict) -> dict:
+    """
+    Shift every column so each ticker's own bars are contiguous and its last
+    bar sits on the last row (missing bars move to the top). Row -k is then
+    "k-1 bars ago" for every ticker, as in a per-ticker frame. "order" maps
+    aligned rows back to panel rows (see unalign).
+    """
+    close = panel['Close']
+    order = np.argsort(~np.isnan(close), axis=0, kind='stable')
+    out   = {"tickers": panel["tickers"],
+             "order":   order,
+             "n_bars":  (~np.isnan(close)).sum(axis=0)}
+    for f in PANEL_FIELDS:
+        if f in panel:
+            out[f] = np.take_along_axis(panel[f], order, axis=0)
+    return out
+
+
+def unalign(x: np.ndarray, order: np.ndarray) -> np.ndarray:
+    """Inverse of right_align for one array: put rows back on the panel calendar."""
+    out = np.empty_like(x)
+    np.put_along_axis(out, order, x, axis=0)
+    return out
+
+
+# ── Vectorized series ─────────────────────────────────────────
+def _window_sum(a: np.ndarray, window: int) -> np.ndarray:
+    """Sums of every `window` consecutive rows (rows window-1.. of a rolling sum), via one cumsum."""
+    cs  = np.cumsum(a, axis=0)
+    out = cs[window-1:].copy()
+    out[1:] -= cs[:-window]
+    return out
+
+
+def sma(x: np.ndarray, window: int) -> np.ndarray:
+    """Rolling mean; NaN unless all `window` values are present."""
+    valid = ~np.isnan(x)
+    out   = np.full(x.shape, np.nan)
+    if len(x) < window:
+        return out
+    s = _window_sum(np.where(valid, x, 0.0), window)
+    c = _window_sum(valid, window)
+    out[window-1:] = np.where(c == window, s / window, np.nan)
+    return out
+
+
+def rolling_std(x: np.ndarray, window: int) -> np.ndarray:
+    """
+    Rolling sample std (ddof=1); NaN unless all `window` values are present.
+    Window sums of x and x² as in sma, taken about each column's mean so the
+    sum of squares does not swamp the variance; windows of one repeated value
+    are exactly 0, as in pandas.
+    """
+    valid = ~np.isnan(x)
+    out   = np.full(x.shape, np.nan)
+    if len(x) < window:
+        return out
+    n   = valid.sum(axis=0)
+    ref = np.where(valid, x, 0.0).sum(axis=0) / np.maximum(n, 1)
+    d   = np.where(valid, x - ref, 0.0)
+    s   = _window_sum(d, window)
+    ss  = _window_sum(d * d, window)
+    c   = _window_sum(valid, window)
+    moves = np.zeros(x.shape, dtype=bool)
+    moves[1:] = d[1:] != d[:-1]
+    flat  = _window_sum(moves, window) == moves[:len(s)]     # no change after the window's first row
+    with np.errstate(invalid='ignore', divide='ignore'):
+        var = np.where(flat, 0.0, np.maximum(ss - s * s / window, 0.0) / (window - 1))
+    out[window-1:] = np.where(c == window, np.sqrt(var), np.nan)
+    return out
+
+
+def ewm_mean(x: np.ndarray, alpha: float, adjust: bool = True,
+             min_periods: int = 0) -> np.ndarray:
+    """
+    Exponentially weighted mean along axis 0, matching pandas .ewm(...).mean()
+    (ignore_na=False). One step per row, vectorized across columns.
+    """
+    out   = np.full(x.shape, np.nan)
+    decay = 1.0 - alpha
+    num   = np.zeros(x.shape[1:])
+    den   = np.zeros(x.shape[1:])
+    nobs  = np.zeros(x.shape[1:])
+    for i in range(len(x)):
+        row = x[i]
+        obs = ~np.isnan(row)
+        nobs += obs
+        if adjust:
+            num = decay * num + np.where(obs, row, 0.0)
+            den = decay * den + obs
+        else:
+            num = np.where(obs, np.where(den > 0, decay * num + alpha * row, row), num)
+            den = np.where(obs, 1.0, den)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            val = num / den
+        out[i] = np.where((den > 0) & (nobs >= max(min_periods, 1)), val, np.nan)
+    return out
+
+
+def rsi(close: np.ndarray, period: int = 14) -> np.ndarray:
+    delta = np.full(close.shape, np.nan)
+    delta[1:] = close[1:] - close[:-1]
+    gain = np.where(np.isnan(delta), np.nan, np.clip(delta, 0, None))
+    loss = np.where(np.isnan(delta), np.nan, -np.clip(delta, None, 0))
+    a    = 1.0 / period                      # com = period-1
+    avg_gain = ewm_mean(gain, a, min_periods=period)
+    avg_loss = ewm_mean(loss, a, min_periods=period)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        rs = avg_gain / avg_loss
+        return 100 - 100 / (1 + rs)
+
+
+def bollinger(close: np.ndarray, period: int = 20, std_dev: float = 2.0):
+    """Returns (%B, upper, lower) series."""
+    mid   = sma(close, period)
+    sigma = rolling_std(close, period)
+    upper = mid + std_dev * sigma
+    lower = mid - std_dev * sigma
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return (close - lower) / (upper - lower), upper, lower
+
+
+def macd(close: np.ndarray, fast: int = 12, slow: int = 26, signal: int = 9):
+    """Returns (macd line, signal line, histogram) series."""
+    ema_fast = ewm_mean(close, 2.0 / (fast + 1), adjust=False)
+    ema_slow = ewm_mean(close, 2.0 / (slow + 1), adjust=False)
+    line     = ema_fast - ema_slow
+    sig      = ewm_mean(line, 2.0 / (signal + 1), adjust=False)
+    return line, sig, line - sig
+
+
+# ── Last-bar feature table ────────────────────────────────────
+def _last(x: np.ndarray) -> np.ndarray:
+    return x[-1] if len(x) else np.full(x.shape[1], np.nan)
+
+
+def _round(x: np.ndarray, nd: int) -> np.ndarray:
+    """Python round() per element, so ties land exactly where the scalar helpers put them."""
+    return np.array([round(float(v), nd) if v == v else np.nan for v in x])
+
+
+def compute_features(frames: dict, params: dict) -> pd.DataFrame:
+    """
+    Last-bar indicator values for every ticker in `frames`, one row per
+    ticker, in the same shape the screener helpers return them.
+    """
+    panel = right_align(build_panel(frames, ('Close','Volume')))
+    close, volume, n = panel['Close'], panel['Volume'], panel['n_bars']
+    if close.size == 0:
+        return pd.DataFrame()
+
+    rsi_period = params.get('rsi_period', 14)
+    bb_period  = params.get('bb_period', 20)
+    bb_std     = params.get('bb_std', 2.0)
+
+    # RSI — _rsi(): 50.0 when history is short or the value is NaN
+    r = _last(rsi(close, rsi_period))
+    r = np.where((n < rsi_period * 2) | np.isnan(r), 50.0, _round(r, 1))
+
+    # Bollinger — _bb(): (0.5, None, None) when history is short
+    pct, up, lo = (_last(a) for a in bollinger(close, bb_period, bb_std))
+    short_bb = n < bb_period + 2
+    pct = np.where(short_bb | np.isnan(pct), 0.5, _round(pct, 3))
+    up  = np.where(short_bb, np.nan, _round(up, 2))
+    lo  = np.where(short_bb, np.nan, _round(lo, 2))
+
+    # MACD — _macd(): zeros when history is short
+    line, sig, hist = (_last(a) for a in macd(close))
+    short_macd = n < 26 + 9 + 5
+    line = np.where(short_macd, 0.0, _round(line, 4))
+    sig  = np.where(short_macd, 0.0, _round(sig, 4))
+    hist = np.where(short_macd, 0.0, _round(hist, 4))
+
+    # 4-week trend — _trend_pct(close, 20)
+    price = _last(close)
+    start = close[-21] if len(close) >= 21 else np.full(close.shape[1], np.nan)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        trend = np.where((n < 22) | ~(start > 0), 0.0,
+                         _round((price - start) / start * 100, 2))
+
+    feats = {
+        "price":       _round(price, 2),
+        "n_bars":      n,
+        "rsi":         r,
+        "bb_pct":      pct,
+        "bb_upper":    up,
+        "bb_lower":    lo,
+        "macd_line":   line,
+        "macd_signal": sig,
+        "macd_hist":   hist,
+        "trend_4w":    trend,
+        "avg_vol":     _last(sma(volume, 20)),
+        "avg_vol_50":  _last(sma(volume, 50)),
+    }
+    for w in (20, 50, 200):
+        feats[f"ma{w}"] = np.where(n >= w, _round(_last(sma(close, w)), 2), np.nan)
+
+    return pd.DataFrame(feats, index=panel['tickers'])
+
+
+def feature_rows(features: pd.DataFrame) -> dict:
+    """{ticker: {feature: value}} with NaN turned into None."""
+    if features.empty:
+        return {}
+    clean = features.astype(object).where(features.notna(), None)
+    return clean.to_dict('index')
@@ -0,0 +1,89 @@
+"""
+Levels — support/resistance clustering and the stop/target built on it.
+
+Shared by the live screener (one ticker, latest bar), the replay (every
+past day) and the intrabar backtest (stop and target as advertised on the
+entry bar), so all three draw the same levels.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+LOOKBACK  = 504    # bars in the live scan's 2-year window
+SR_WINDOW = 10     # local-extreme neighbourhood of the screener's _support_resistance
+
+
+def cluster_levels(levels: np.ndarray, pct: float = 0.02, min_size: int = 2) -> list:
+    """
+    Group sorted levels into chains where each level is within `pct` of the
+    previous one; returns the rounded mean of every chain with at least
+    `min_size` members.
+    """
+    if not len(levels):
+        return []
+    levels = np.sort(levels)
+    breaks = np.abs(np.diff(levels)) / levels[:-1] >= pct
+    starts = np.r_[0, np.flatnonzero(breaks) + 1]
+    sizes  = np.diff(np.r_[starts, len(levels)])
+    means  = np.add.reduceat(levels, starts) / sizes
+    return [round(float(m), 2) for m in means[sizes >= min_size]]
+
+
+def support_resistance_history(high: np.ndarray, low: np.ndarray, c: np.ndarray) -> tuple:
+    """
+    The screener's _support_resistance() for every day, over the LOOKBACK
+    bars ending that day: (support, resistance) with NaN for none. A bar is a
+    local extreme for the window ending day t exactly when it is one on the
+    full series and sits SR_WINDOW bars inside [start, t], so extremes are
+    found once; levels are only re-clustered on days where the set of
+    extremes in the window changes.
+    """
+    T, w   = len(c), SR_WINDOW
+    width  = 2 * w + 1
+    hi_pos = np.flatnonzero(high == pd.Series(high).rolling(width, center=True, min_periods=1).max().to_numpy())
+    lo_pos = np.flatnonzero(low  == pd.Series(low).rolling(width, center=True, min_periods=1).min().to_numpy())
+    first  = np.maximum(np.arange(T) - LOOKBACK + 1, 0) + w
+    last   = np.arange(T) - w
+    keys   = np.stack([lo_pos.searchsorted(first), lo_pos.searchsorted(last, side='right'),
+                       hi_pos.searchsorted(first), hi_pos.searchsorted(last, side='right')], axis=1)
+    sup, res = np.full(T, np.nan), np.full(T, np.nan)
+    uniq, inv = np.unique(keys, axis=0, return_inverse=True)
+    inv = inv.ravel()
+    for g, (la, lb, ha, hb) in enumerate(uniq):
+        days = np.flatnonzero(inv == g)
+        sups = np.array(cluster_levels(low[lo_pos[la:lb]]))  if lb > la else np.array([])
+        ress = np.array(cluster_levels(high[hi_pos[ha:hb]])) if hb > ha else np.array([])
+        px   = c[days]
+        if len(sups):
+            k = sups.searchsorted(px, side='left') - 1         # highest level below price
+            sup[days] = np.where(k >= 0, sups[np.maximum(k, 0)], np.nan)
+        if len(ress):
+            k = ress.searchsorted(px, side='right')            # lowest level above price
+            res[days] = np.where(k < len(ress), ress[np.minimum(k, len(ress) - 1)], np.nan)
+    return sup, res
+
+
+def risk_reward(price: float, support: float, resistance: float,
+                stop_pct: float = 0.05) -> dict:
+    """
+    Calculate Risk/Reward ratio.
+    Stop loss = support or price * (1 - stop_pct).
+    Target    = resistance.
+    Murphy rule: need at least 1:3 ratio.
+    """
+    try:
+        stop_loss = support if support else price * (1 - stop_pct)
+        if resistance is None or resistance <= price:
+            return {"ratio": 0, "valid": False, "stop": round(stop_loss,2), "target": None}
+        risk    = price - stop_loss
+        reward  = resistance - price
+        ratio   = round(reward / risk, 2) if risk > 0 else 0
+        return {
+            "ratio":  ratio,
+            "valid":  ratio >= 1.5,          # lowered from 3 for more opportunities
+            "stop":   round(stop_loss, 2),
+            "target": round(resistance, 2),
+        }
+    except Exception:
+        return {"ratio": 0, "valid": False, "stop": None, "target": None}
@@ -9,14 +9,20 @@ Macro Intelligence Engine
 Historical macro playbooks based on real market behavior:
 """
 
+import re
 import requests
 import json
-import re
 import yfinance as yf
 import numpy as np
 import pandas as pd
 from datetime import datetime, timedelta
 
+import price_store
+import feed_cache
+import rss_parser
+import news_dedup
+from news_intelligence import _gather
+
 
 # ──────────────────────────────────────────────────────────────
 #  MACRO PLAYBOOKS — historical precedents
@@ -149,66 +155,133 @@ MACRO_PLAYBOOKS = {
 # ──────────────────────────────────────────────────────────────
 #  NEWS FETCHER (reuse from news_intelligence)
 # ──────────────────────────────────────────────────────────────
+def _yahoo_headlines(sym: str) -> list:
+    out = []
+    for item in (yf.Ticker(sym).news or [])[:5]:
+        title = (item.get('title') or
+                 item.get('content', {}).get('title') or '')
+        if title:
+            out.append({
+                'title': title,
+                'source': 'Yahoo Finance',
+                'url': item.get('link') or item.get('url', ''),
+            })
+    return out
+
+
+def _google_headlines(query: str) -> list:
+    url = f"https://news.google.com/rss/search?q={query.replace(' ','+')}&hl=en-US&gl=US&ceid=US:en"
+    return [{'title': item['title'], 'source': 'Google News', 'url': item['link']}
+            for item in rss_parser.parse_items(feed_cache.stream(url, timeout=6), limit=8)
+            if item['title']]
+
+
 def _fetch_headlines() -> list:
-    """Fetch top headlines from multiple sources."""
+    """Fetch top headlines from multiple sources, one per story."""
     headlines = []
     seen = set()
 
-    # Yahoo Finance
-    for sym in ["SPY","QQQ","GLD","USO","BTC-USD","^VIX","^GSPC","XOM","LMT"]:
-        try:
-            news = yf.Ticker(sym).news or []
-            for item in news[:5]:
-                title = (item.get('title') or
-                         item.get('content', {}).get('title') or '')
-                if title and title not in seen:
-                    seen.add(title)
-                    headlines.append({
-                        'title': title,
-                        'source': 'Yahoo Finance',
-                        'url': item.get('link') or item.get('url', ''),
-                    })
-        except Exception:
-            pass
-
-    # Google News RSS
-    for query in ["stock market today", "geopolitical market", "fed reserve"]:
-        try:
-            url = f"https://news.google.com/rss/search?q={query.replace(' ','+')}&hl=en-US&gl=US&ceid=US:en"
-            resp = requests.get(url, timeout=6, headers={'User-Agent': 'Mozilla/5.0'})
-            if resp.status_code == 200:
-                for item in re.findall(r'<item>(.*?)</item>', resp.text, re.DOTALL)[:8]:
-                    title = re.search(r'<title>(.*?)</title>', item)
-                    link  = re.search(r'<link>(.*?)</link>', item)
-                    if title:
-                        t = re.sub(r'<[^>]+>', '', title.group(1)).strip()
-                        if t and t not in seen:
-                            seen.add(t)
-                            headlines.append({
-                                'title': t,
-                                'source': 'Google News',
-                                'url': link.group(1).strip() if link else '',
-                            })
-        except Exception:
-            pass
+    # Yahoo Finance and Google News RSS, fetched concurrently, merged in source order
+    tasks = ([(_yahoo_headlines, (sym,)) for sym in
+              ["SPY","QQQ","GLD","USO","BTC-USD","^VIX","^GSPC","XOM","LMT"]] +
+             [(_google_headlines, (query,)) for query in
+              ["stock market today", "geopolitical market", "fed reserve"]])
+    for items in _gather(tasks):
+        for item in items:
+            if item['title'] not in seen:
+                seen.add(item['title'])
+                headlines.append(item)
 
-    return headlines[:50]
+    return news_dedup.collapse(headlines)[:50]
 
 
 # ──────────────────────────────────────────────────────────────
 #  THEME DETECTOR — rule-based fast scan
 # ──────────────────────────────────────────────────────────────
+THEME_KEYS = tuple(MACRO_PLAYBOOKS)
+_TRIGGERS  = tuple(dict.fromkeys(kw.lower() for p in MACRO_PLAYBOOKS.values() for kw in p['triggers']))
+_TRIGGER_THEMES = [[j for j, p in enumerate(MACRO_PLAYBOOKS.values())
+                    if kw in (t.lower() for t in p['triggers'])]
+                   for kw in _TRIGGERS]
+_THEME_PTR   = np.cumsum([0] + [len(t) for t in _TRIGGER_THEMES])     # CSR over _TRIGGER_THEMES
+_THEME_IDX   = np.concatenate(_TRIGGER_THEMES)
+# A match reports only the longest trigger starting at a position, so each
+# trigger also implies the shorter triggers it begins with ("inflation fight"
+# → "inflation").
+_IMPLIED = {kw: [i for i, other in enumerate(_TRIGGERS)
+                 if other == kw or (kw.startswith(other) and not kw[len(other)].isalnum())]
+            for kw in _TRIGGERS}
+
+
+def _trie_pattern(words) -> str:
+    """Regex for any of `words` with shared prefixes factored out (longest first)."""
+    trie = {}
+    for w in words:
+        node = trie
+        for ch in w:
+            node = node.setdefault(ch, {})
+        node[''] = {}
+
+    def emit(node):
+        alts = [re.escape(ch) + emit(child) for ch, child in node.items() if ch]
+        if not alts:
+            return ''
+        body = alts[0] if len(alts) == 1 else '(?:' + '|'.join(alts) + ')'
+        return f'(?:{body})?' if '' in node else body
+    return emit(trie)
+
+
+# Every trigger in one compiled trie-shaped alternation, inside a lookahead so
+# overlapping triggers ("peace deal" / "iran deal") are all found; word
+# boundaries stop "war" matching "warning".
+_TRIGGER_RE = re.compile(r'(?<!\w)(?=(' + _trie_pattern(_TRIGGERS) + r')(?!\w))')
+
+
+def _trigger_themes(trig: np.ndarray) -> tuple:
+    """(themes per trigger, flat theme indices) for an array of trigger indices."""
+    n_themes = np.diff(_THEME_PTR)[trig]
+    first    = np.repeat(_THEME_PTR[trig], n_themes)
+    within   = np.arange(n_themes.sum()) - np.repeat(np.cumsum(n_themes) - n_themes, n_themes)
+    return n_themes, _THEME_IDX[first + within]
+
+
+def theme_hits(headlines: list) -> tuple:
+    """
+    One scan over all headlines. Returns (hits, found): hits[i, j] is the
+    number of distinct triggers of THEME_KEYS[j] in headline i, found the
+    array of trigger indices matched anywhere.
+    """
+    titles  = [(h.get('title') or '').lower() for h in headlines]
+    offsets = np.cumsum([0] + [len(t) + 1 for t in titles])
+    starts, trig = [], []
+    for m in _TRIGGER_RE.finditer("\n".join(titles)):
+        implied = _IMPLIED[m.group(1)]
+        starts.extend([m.start()] * len(implied))
+        trig.extend(implied)
+    hits = np.zeros((len(titles), len(THEME_KEYS)), dtype=np.int32)
+    if not trig:
+        return hits, np.array([], dtype=np.intp)
+
+    rows  = np.searchsorted(offsets, starts, side='right') - 1
+    pairs = np.unique(rows * len(_TRIGGERS) + np.asarray(trig))      # distinct (headline, trigger)
+    rows, trig = np.divmod(pairs, len(_TRIGGERS))
+    n_themes, themes = _trigger_themes(trig)
+    np.add.at(hits, (np.repeat(rows, n_themes), themes), 1)
+    return hits, np.unique(trig)
+
+
 def _detect_themes_fast(headlines: list) -> list:
-    """Quick keyword matching to detect macro themes."""
-    text = " ".join(h['title'].lower() for h in headlines)
+    """Keyword matching to detect macro themes; score = distinct triggers seen."""
+    hits, found = theme_hits(headlines)
+    scores = np.bincount(_trigger_themes(found)[1], minlength=len(THEME_KEYS))
     detected = []
-    for theme_key, playbook in MACRO_PLAYBOOKS.items():
-        score = sum(1 for kw in playbook['triggers'] if kw in text)
-        if score >= 1:
+    for j, theme_key in enumerate(THEME_KEYS):
+        if scores[j] >= 1:
             detected.append({
-                "theme":    theme_key,
-                "score":    score,
-                "playbook": playbook,
+                "theme":     theme_key,
+                "score":     int(scores[j]),
+                "headlines": int((hits[:, j] > 0).sum()),
+                "playbook":  MACRO_PLAYBOOKS[theme_key],
             })
     detected.sort(key=lambda x: -x['score'])
     return detected[:3]  # top 3 themes
@@ -221,6 +294,7 @@ def _claude_macro_analysis(headlines: list) -> dict:
     """Send headlines to Claude for deep macro analysis."""
     headlines_text = "\n".join(
         f"[{h.get('source','?')}] {h['title']}"
+        + (f" ({h['source_count']} sources)" if h.get('source_count', 1) > 1 else "")
         for h in headlines[:35]
     )
 
@@ -287,10 +361,13 @@ def _verify_historical_performance(tickers: list, days_back: int = 252) -> dict:
     to validate if they are actually strong candidates.
     """
     results = {}
-    for ticker in tickers[:8]:  # limit to avoid timeouts
+    try:
+        frames = price_store.load_many(tickers[:8], "1y")  # limit to avoid timeouts
+    except Exception:
+        return results
+    for ticker in tickers[:8]:
         try:
-            t  = yf.Ticker(ticker)
-            df = t.history(period="1y", interval="1d", auto_adjust=True, actions=False)
+            df = frames.get(ticker, pd.DataFrame())
             if df.empty or len(df) < 20:
                 continue
             perf_1y  = (float(df['Close'].iloc[-1]) - float(df['Close'].iloc[0])) / float(df['Close'].iloc[0]) * 100
@@ -0,0 +1,118 @@
+"""
+Monte Carlo — confidence intervals for backtest stats by resampling the
+trade log.
+
+The overall win rate, average return and max drawdown of a backtest come
+from the one order of trades that happened. Here the log is resampled into
+thousands of alternative paths and each stat is measured on every path:
+
+  iid          trades drawn with replacement
+  block        circular blocks of consecutive trades (keeps streaks together)
+  permutation  the same trades in random order (only drawdown changes)
+
+Paths are index arrays into the log, generated and scored as NumPy matrices
+in chunks of CHUNK_CELLS so memory stays flat however many paths are asked
+for. Drawdown is measured on an equity curve that puts `position_size` of
+equity into each trade in turn.
+"""
+
+import numpy as np
+import pandas as pd
+
+from trade_log import TradeLog
+
+
+METHODS     = ("iid", "block", "permutation")
+CHUNK_CELLS = 4_000_000    # path × trade cells scored per chunk
+METRICS     = {"win_rate": "Win Rate %", "avg_return": "Avg Return %", "max_drawdown": "Max Drawdown %"}
+
+
+def _trade_arrays(trade_log: TradeLog) -> tuple:
+    """(return %, closed-win flag, closed flag) in entry order."""
+    log = trade_log.sorted_by_entry(descending=False)
+    return log.return_pct, log.is_win, ~log.is_open
+
+
+def _paths(rng, n: int, rows: int, method: str, block_size: int) -> np.ndarray:
+    """rows × n matrix of trade indices, one resampled path per row."""
+    if method == "permutation":
+        return rng.random((rows, n), dtype=np.float32).argsort(axis=1)   # faster than rng.permuted
+    if method == "block":
+        k      = -(-n // block_size)
+        starts = rng.integers(0, n, (rows, k, 1), dtype=np.int32)
+        return ((starts + np.arange(block_size, dtype=np.int32)) % n).reshape(rows, -1)[:, :n]
+    return rng.integers(0, n, (rows, n), dtype=np.int32)
+
+
+def _max_drawdown(log_ret: np.ndarray) -> np.ndarray:
+    """Max drawdown % of each row's equity curve, from per-trade log growth."""
+    curve = np.cumsum(log_ret, axis=1)
+    peak  = np.maximum(np.maximum.accumulate(curve, axis=1), 0.0)
+    return np.expm1((curve - peak).min(axis=1)) * 100
+
+
+def _path_stats(ret, win, closed, log_ret, idx, reorder_only: bool = False) -> dict:
+    if reorder_only:                                   # same trades, so only drawdown moves
+        rows = np.ones(len(idx))
+        full = _path_stats(ret, win, closed, log_ret, np.arange(len(ret))[None, :])
+        return {"win_rate":     rows * full["win_rate"][0],
+                "avg_return":   rows * full["avg_return"][0],
+                "max_drawdown": _max_drawdown(log_ret[idx])}
+    n_closed = closed[idx].sum(axis=1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        win_rate = np.where(n_closed > 0, win[idx].sum(axis=1) / n_closed * 100, 0.0)
+    return {"win_rate":     win_rate,
+            "avg_return":   ret[idx].mean(axis=1),
+            "max_drawdown": _max_drawdown(log_ret[idx])}
+
+
+def bootstrap(trade_log: TradeLog, method: str = "iid", n_paths: int = 10_000,
+              block_size: int = None, position_size: float = 0.1,
+              conf: float = 0.95, seed: int = None) -> dict:
+    """
+    Resample the backtest's `trade_log` into `n_paths` paths.
+    block_size defaults to √(trades). position_size is the fraction of
+    equity put into each trade for the drawdown curve.
+    Returns {method, paths, trades, stats: {metric: {actual, mean, lo, hi}},
+    samples: {metric: array}} with lo/hi the central `conf` interval.
+    """
+    if method not in METHODS:
+        raise ValueError(f"method must be one of {METHODS}")
+    ret, win, closed = _trade_arrays(trade_log)
+    n = len(ret)
+    if not n:
+        return {"method": method, "paths": 0, "trades": 0, "stats": {}, "samples": {}}
+
+    size    = min(max(position_size, 1e-6), 1.0)
+    log_ret = np.log1p(np.maximum(ret, -100.0) / 100 * size)
+    block   = max(1, min(n, block_size or int(round(np.sqrt(n)))))
+    rng     = np.random.default_rng(seed)
+    rows    = max(1, CHUNK_CELLS // n)
+
+    parts = []
+    for start in range(0, n_paths, rows):
+        idx = _paths(rng, n, min(rows, n_paths - start), method, block)
+        parts.append(_path_stats(ret, win, closed, log_ret, idx, method == "permutation"))
+    samples = {m: np.concatenate([p[m] for p in parts]) for m in METRICS}
+
+    actual = _path_stats(ret, win, closed, log_ret, np.arange(n)[None, :])
+    tail   = (1 - conf) / 2 * 100
+    stats  = {}
+    for m, s in samples.items():
+        lo, hi = np.percentile(s, [tail, 100 - tail])
+        stats[m] = {"actual": round(float(actual[m][0]), 2), "mean": round(float(s.mean()), 2),
+                    "lo": round(float(lo), 2), "hi": round(float(hi), 2)}
+    return {"method": method, "paths": n_paths, "trades": n, "stats": stats, "samples": samples}
+
+
+def monte_carlo_table(trade_log: TradeLog, n_paths: int = 10_000, block_size: int = None,
+                      position_size: float = 0.1, conf: float = 0.95, seed: int = None,
+                      methods: tuple = METHODS) -> pd.DataFrame:
+    """Confidence intervals of each of `methods` as one table (rows: metric × method)."""
+    rows = []
+    for method in methods:
+        res = bootstrap(trade_log, method, n_paths, block_size, position_size, conf, seed)
+        for m, s in res["stats"].items():
+            rows.append({"Metric": METRICS[m], "Method": method, "Actual": s["actual"],
+                         "Mean": s["mean"], f"{conf:.0%} Low": s["lo"], f"{conf:.0%} High": s["hi"]})
+    return pd.DataFrame(rows)
@@ -0,0 +1,119 @@
+"""
+News dedup — near-duplicate headlines grouped into stories.
+
+The same story arrives from Yahoo, Google News and Seeking Alpha with small
+wording changes, so exact-title dedup keeps every copy. Each title is cut
+into character shingles (crc32-hashed), summarised by a MinHash signature,
+and the signatures are banded into an LSH index: only titles sharing a band
+bucket are compared (every pair within a bucket), so grouping is roughly
+linear in the number of headlines. Candidates whose estimated Jaccard
+similarity clears THRESHOLD are merged with union-find.
+
+collapse() keeps one representative per story (the first seen, so source
+order still decides which copy is shown) and records how many sources
+carried it in `source_count`, which callers use as the story's weight.
+"""
+
+import re
+import zlib
+
+import numpy as np
+
+
+SHINGLE    = 5            # characters per shingle
+NUM_PERM   = 64           # MinHash signature length
+BANDS      = 16           # LSH bands (NUM_PERM // BANDS rows each)
+THRESHOLD  = 0.5          # estimated Jaccard to call two titles the same story
+CHUNK      = 512          # titles hashed per NumPy batch
+
+_rng     = np.random.default_rng(1)
+_A       = _rng.integers(0, 1 << 63, NUM_PERM, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+_B       = _rng.integers(0, 1 << 63, NUM_PERM, dtype=np.uint64)
+_SUFFIX  = re.compile(r'\s+[-–|]\s+[^-–|]{1,40}$')     # "… - Reuters" publisher tails
+_NONWORD = re.compile(r'[^\w]+')
+
+
+# ── MinHash ───────────────────────────────────────────────────
+def _normalize(title: str) -> str:
+    return _NONWORD.sub(' ', _SUFFIX.sub('', title or '').lower()).strip()
+
+
+def _shingles(title: str) -> np.ndarray:
+    text = _normalize(title)
+    grams = {text[i:i + SHINGLE] for i in range(max(1, len(text) - SHINGLE + 1))}
+    return np.fromiter((zlib.crc32(g.encode()) for g in grams), dtype=np.uint64, count=len(grams))
+
+
+def signatures(titles: list) -> np.ndarray:
+    """len(titles) × NUM_PERM uint32 MinHash signatures."""
+    sig = np.empty((len(titles), NUM_PERM), dtype=np.uint32)
+    for start in range(0, len(titles), CHUNK):
+        sh     = [_shingles(t) for t in titles[start:start + CHUNK]]
+        flat   = np.concatenate(sh)
+        bounds = np.cumsum([0] + [len(s) for s in sh[:-1]])
+        hashed = (flat[:, None] * _A + _B) >> np.uint64(32)      # multiply-shift, one per permutation
+        sig[start:start + len(sh)] = np.minimum.reduceat(hashed, bounds, axis=0)
+    return sig
+
+
+# ── LSH clustering ────────────────────────────────────────────
+def candidate_pairs(sig: np.ndarray) -> np.ndarray:
+    """(i, j) pairs, i < j, that share at least one LSH band bucket."""
+    n, rows = len(sig), NUM_PERM // BANDS
+    pairs = []
+    for b in range(BANDS):
+        band = np.ascontiguousarray(sig[:, b * rows:(b + 1) * rows])
+        keys = band.view(np.dtype((np.void, band.dtype.itemsize * rows))).ravel()
+        _, inv, counts = np.unique(keys, return_inverse=True, return_counts=True)
+        order  = np.argsort(inv.ravel(), kind='stable')
+        bounds = np.r_[0, np.cumsum(counts)]
+        for g in np.flatnonzero(counts > 1):                # every pair within the bucket
+            members = order[bounds[g]:bounds[g + 1]]
+            i, j    = np.triu_indices(len(members), 1)
+            pairs.append(members[i] * n + members[j])
+    if not pairs:
+        return np.empty((0, 2), dtype=np.intp)
+    flat = np.unique(np.concatenate(pairs))
+    return np.stack(np.divmod(flat, n), axis=1)
+
+
+def cluster_labels(titles: list, threshold: float = THRESHOLD) -> np.ndarray:
+    """Story id per title: the index of the first title in its cluster."""
+    n = len(titles)
+    parent = np.arange(n)
+    if n < 2:
+        return parent
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    sig     = signatures(titles)
+    pairs   = candidate_pairs(sig)
+    similar = np.concatenate([(sig[p[:, 0]] == sig[p[:, 1]]).mean(axis=1) >= threshold
+                              for p in np.array_split(pairs, max(1, len(pairs) // 65536))])
+    for i, j in pairs[similar]:
+        ri, rj = find(i), find(j)
+        if ri != rj:
+            parent[max(ri, rj)] = min(ri, rj)
+    return np.array([find(i) for i in range(n)])
+
+
+def collapse(headlines: list, threshold: float = THRESHOLD) -> list:
+    """
+    One headline per story, most widely carried first (ties keep input
+    order). Each representative gets `source_count` (distinct sources in
+    its cluster) and `sources`.
+    """
+    if not headlines:
+        return []
+    labels  = cluster_labels([h.get('title', '') for h in headlines], threshold)
+    sources = {}
+    for h, lab in zip(headlines, labels):
+        sources.setdefault(int(lab), {})[h.get('source', '')] = None
+    reps = [{**h, 'sources': list(sources[i]), 'source_count': len(sources[i])}
+            for i, h in enumerate(headlines) if labels[i] == i]
+    reps.sort(key=lambda h: -h['source_count'])
+    return reps
@@ -8,11 +8,16 @@ News Intelligence v2:
 import yfinance as yf
 import requests
 import json
-import re
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FuturesTimeout
 from datetime import datetime, timedelta
 import pandas as pd
 import numpy as np
 
+import price_store
+import feed_cache
+import rss_parser
+import news_dedup
+
 
 # ── Sector/theme → ticker mapping ────────────────────────────
 THEME_TICKERS = {
@@ -56,36 +61,74 @@ VIX_LOSERS = [
 #  1. MULTI-SOURCE NEWS FETCHER
 # ══════════════════════════════════════════════════════════════
 
+FETCH_TIMEOUT  = 8       # seconds per HTTP request
+FETCH_DEADLINE = 10      # seconds for the whole fetch_all_news call
+FETCH_WORKERS  = 16
+YAHOO_SYMBOLS  = ["SPY","QQQ","GLD","USO","BTC-USD","^VIX","^GSPC","AAPL","NVDA","META"]
+
+
+def _gather(tasks: list, deadline: float = FETCH_DEADLINE) -> list:
+    """
+    Run [(fn, args), ...] on a thread pool and return their results in task
+    order. Tasks that fail, or are still running when `deadline` seconds are
+    up, contribute [] — the caller never waits on a slow source.
+    """
+    results = [[] for _ in tasks]
+    if not tasks:
+        return results
+    pool = ThreadPoolExecutor(max_workers=min(FETCH_WORKERS, len(tasks)))
+    futs = {pool.submit(fn, *args): i for i, (fn, args) in enumerate(tasks)}
+    try:
+        for fut in as_completed(futs, timeout=deadline):
+            try:
+                results[futs[fut]] = fut.result() or []
+            except Exception:
+                pass
+    except FuturesTimeout:
+        pass
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+    return results
+
+
+def _fetch_yahoo_symbol(sym: str) -> list:
+    """Yahoo Finance headlines for one symbol via yfinance."""
+    headlines = []
+    try:
+        news = yf.Ticker(sym).news or []
+        for item in news[:6]:
+            title = (item.get('title') or
+                     item.get('content', {}).get('title') or '')
+            if not title:
+                continue
+            pub = item.get('providerPublishTime', 0)
+            try:
+                pub_str = datetime.fromtimestamp(pub).strftime('%b %d %H:%M')
+            except Exception:
+                pub_str = ''
+            url = (item.get('link') or item.get('url') or
+                   item.get('content', {}).get('url') or '')
+            headlines.append({
+                'title':     title,
+                'publisher': item.get('publisher', 'Yahoo Finance'),
+                'published': pub_str,
+                'url':       url,
+                'source':    'Yahoo Finance',
+            })
+    except Exception:
+        pass
+    return headlines
+
+
 def _fetch_yahoo_news() -> list:
-    """Fetch from Yahoo Finance via yfinance."""
+    """Fetch from Yahoo Finance via yfinance, all symbols at once."""
     headlines = []
     seen = set()
-    sources = ["SPY","QQQ","GLD","USO","BTC-USD","^VIX","^GSPC","AAPL","NVDA","META"]
-    for sym in sources:
-        try:
-            news = yf.Ticker(sym).news or []
-            for item in news[:6]:
-                title = (item.get('title') or
-                         item.get('content', {}).get('title') or '')
-                if not title or title in seen:
-                    continue
-                seen.add(title)
-                pub = item.get('providerPublishTime', 0)
-                try:
-                    pub_str = datetime.fromtimestamp(pub).strftime('%b %d %H:%M')
-                except Exception:
-                    pub_str = ''
-                url = (item.get('link') or item.get('url') or
-                       item.get('content', {}).get('url') or '')
-                headlines.append({
-                    'title':     title,
-                    'publisher': item.get('publisher', 'Yahoo Finance'),
-                    'published': pub_str,
-                    'url':       url,
-                    'source':    'Yahoo Finance',
-                })
-        except Exception:
-            pass
+    for items in _gather([(_fetch_yahoo_symbol, (sym,)) for sym in YAHOO_SYMBOLS]):
+        for item in items:
+            if item['title'] not in seen:
+                seen.add(item['title'])
+                headlines.append(item)
     return headlines
 
 
@@ -93,26 +136,17 @@ def _fetch_google_news_rss(query: str = "stock market today") -> list:
     """Fetch from Google News RSS feed."""
     headlines = []
     try:
-        url = f"https://news.google.com/rss/search?q={query.replace(' ','+')}&hl=en-US&gl=US&ceid=US:en"
-        resp = requests.get(url, timeout=8, headers={'User-Agent': 'Mozilla/5.0'})
-        if resp.status_code != 200:
-            return []
-        # Parse RSS items
-        items = re.findall(r'<item>(.*?)</item>', resp.text, re.DOTALL)
-        for item in items[:15]:
-            title = re.search(r'<title>(.*?)</title>', item)
-            link  = re.search(r'<link>(.*?)</link>', item)
-            pub   = re.search(r'<pubDate>(.*?)</pubDate>', item)
-            if title:
-                t = re.sub(r'<[^>]+>', '', title.group(1)).strip()
-                if t:
-                    headlines.append({
-                        'title':     t,
-                        'publisher': 'Google News',
-                        'published': pub.group(1)[:16] if pub else '',
-                        'url':       link.group(1).strip() if link else '',
-                        'source':    'Google News',
-                    })
+        url  = f"https://news.google.com/rss/search?q={query.replace(' ','+')}&hl=en-US&gl=US&ceid=US:en"
+        feed = feed_cache.stream(url, timeout=FETCH_TIMEOUT)
+        for item in rss_parser.parse_items(feed, limit=15):
+            if item['title']:
+                headlines.append({
+                    'title':     item['title'],
+                    'publisher': 'Google News',
+                    'published': item['published'][:16],
+                    'url':       item['link'],
+                    'source':    'Google News',
+                })
     except Exception:
         pass
     return headlines
@@ -122,25 +156,17 @@ def _fetch_seeking_alpha_rss() -> list:
     """Fetch from Seeking Alpha market news RSS."""
     headlines = []
     try:
-        url = "https://seekingalpha.com/market_currents.xml"
-        resp = requests.get(url, timeout=8, headers={'User-Agent': 'Mozilla/5.0'})
-        if resp.status_code != 200:
-            return []
-        items = re.findall(r'<item>(.*?)</item>', resp.text, re.DOTALL)
-        for item in items[:10]:
-            title = re.search(r'<title>(.*?)</title>', item)
-            link  = re.search(r'<link>(.*?)</link>', item)
-            pub   = re.search(r'<pubDate>(.*?)</pubDate>', item)
-            if title:
-                t = re.sub(r'<[^>]+>|<!\[CDATA\[|\]\]>', '', title.group(1)).strip()
-                if t:
-                    headlines.append({
-                        'title':     t,
-                        'publisher': 'Seeking Alpha',
-                        'published': pub.group(1)[:16] if pub else '',
-                        'url':       link.group(1).strip() if link else '',
-                        'source':    'Seeking Alpha',
-                    })
+        url  = "https://seekingalpha.com/market_currents.xml"
+        feed = feed_cache.stream(url, timeout=FETCH_TIMEOUT)
+        for item in rss_parser.parse_items(feed, limit=10):
+            if item['title']:
+                headlines.append({
+                    'title':     item['title'],
+                    'publisher': 'Seeking Alpha',
+                    'published': item['published'][:16],
+                    'url':       item['link'],
+                    'source':    'Seeking Alpha',
+                })
     except Exception:
         pass
     return headlines
@@ -150,24 +176,17 @@ def _fetch_bizportal_rss() -> list:
     """Fetch from Bizportal (Israeli financial news) RSS."""
     headlines = []
     try:
-        url = "https://www.bizportal.co.il/rss/wallstreet"
-        resp = requests.get(url, timeout=8, headers={'User-Agent': 'Mozilla/5.0'})
-        if resp.status_code != 200:
-            return []
-        items = re.findall(r'<item>(.*?)</item>', resp.text, re.DOTALL)
-        for item in items[:8]:
-            title = re.search(r'<title>(.*?)</title>', item)
-            link  = re.search(r'<link>(.*?)</link>', item)
-            if title:
-                t = re.sub(r'<[^>]+>|<!\[CDATA\[|\]\]>', '', title.group(1)).strip()
-                if t:
-                    headlines.append({
-                        'title':     t,
-                        'publisher': 'Bizportal 🇮🇱',
-                        'published': '',
-                        'url':       link.group(1).strip() if link else '',
-                        'source':    'Bizportal',
-                    })
+        url  = "https://www.bizportal.co.il/rss/wallstreet"
+        feed = feed_cache.stream(url, timeout=FETCH_TIMEOUT)
+        for item in rss_parser.parse_items(feed, limit=8):
+            if item['title']:
+                headlines.append({
+                    'title':     item['title'],
+                    'publisher': 'Bizportal 🇮🇱',
+                    'published': '',
+                    'url':       item['link'],
+                    'source':    'Bizportal',
+                })
     except Exception:
         pass
     return headlines
@@ -177,48 +196,45 @@ def _fetch_calcalist_rss() -> list:
     """Fetch from Calcalist RSS."""
     headlines = []
     try:
-        url = "https://www.calcalist.co.il/rss/AID-1523266706869"
-        resp = requests.get(url, timeout=8, headers={'User-Agent': 'Mozilla/5.0'})
-        if resp.status_code != 200:
-            return []
-        items = re.findall(r'<item>(.*?)</item>', resp.text, re.DOTALL)
-        for item in items[:6]:
-            title = re.search(r'<title>(.*?)</title>', item)
-            link  = re.search(r'<link>(.*?)</link>', item)
-            if title:
-                t = re.sub(r'<[^>]+>|<!\[CDATA\[|\]\]>', '', title.group(1)).strip()
-                if t:
-                    headlines.append({
-                        'title':     t,
-                        'publisher': 'Calcalist IL 🇮🇱',
-                        'published': '',
-                        'url':       link.group(1).strip() if link else '',
-                        'source':    'Calcalist',
-                    })
+        url  = "https://www.calcalist.co.il/rss/AID-1523266706869"
+        feed = feed_cache.stream(url, timeout=FETCH_TIMEOUT)
+        for item in rss_parser.parse_items(feed, limit=6):
+            if item['title']:
+                headlines.append({
+                    'title':     item['title'],
+                    'publisher': 'Calcalist IL 🇮🇱',
+                    'published': '',
+                    'url':       item['link'],
+                    'source':    'Calcalist',
+                })
     except Exception:
         pass
     return headlines
 
 
 def fetch_all_news() -> list:
-    """Aggregate news from all sources, deduplicated."""
+    """
+    Aggregate news from all sources, deduplicated.
+    Near-duplicate titles are collapsed into one headline per story, with
+    stories carried by the most sources first (see news_dedup).
+    Every source (and every Yahoo symbol) is fetched concurrently under one
+    FETCH_DEADLINE; results are merged in source order so the output does
+    not depend on which request finished first.
+    """
     all_headlines = []
     seen = set()
 
-    for fn in [_fetch_yahoo_news, _fetch_google_news_rss,
-               _fetch_seeking_alpha_rss, _fetch_bizportal_rss,
-               _fetch_calcalist_rss]:
-        try:
-            items = fn()
-            for item in items:
-                t = item.get('title', '').strip()
-                if t and t not in seen and len(t) > 10:
-                    seen.add(t)
-                    all_headlines.append(item)
-        except Exception:
-            pass
+    tasks = ([(_fetch_yahoo_symbol, (sym,)) for sym in YAHOO_SYMBOLS] +
+             [(fn, ()) for fn in [_fetch_google_news_rss, _fetch_seeking_alpha_rss,
+                                  _fetch_bizportal_rss, _fetch_calcalist_rss]])
+    for items in _gather(tasks):
+        for item in items:
+            t = item.get('title', '').strip()
+            if t and t not in seen and len(t) > 10:
+                seen.add(t)
+                all_headlines.append(item)
 
-    return all_headlines[:60]
+    return news_dedup.collapse(all_headlines)[:60]
 
 
 # ══════════════════════════════════════════════════════════════
@@ -226,10 +242,9 @@ def fetch_all_news() -> list:
 # ══════════════════════════════════════════════════════════════
 
 def _get_historical_vix(period: str = "2y") -> pd.DataFrame:
-    """Download VIX history."""
+    """VIX history from the local price store."""
     try:
-        t = yf.Ticker("^VIX")
-        df = t.history(period=period, interval="1d", auto_adjust=True, actions=False)
+        df = price_store.load("^VIX", period)
         return df[['Close']].rename(columns={'Close': 'VIX'}) if not df.empty else pd.DataFrame()
     except Exception:
         return pd.DataFrame()
@@ -242,10 +257,13 @@ def _get_stock_returns_on_dates(tickers: list, dates: list,
     Returns {ticker: avg_return_pct}
     """
     results = {}
+    try:
+        frames = price_store.load_many(tickers, "2y")
+    except Exception:
+        return results
     for ticker in tickers:
         try:
-            t   = yf.Ticker(ticker)
-            df  = t.history(period="2y", interval="1d", auto_adjust=True, actions=False)
+            df  = frames.get(ticker, pd.DataFrame())
             if df.empty:
                 continue
             close = df['Close']
@@ -333,6 +351,7 @@ def _call_claude(headlines: list) -> dict:
     """Send headlines to Claude API for analysis."""
     headlines_text = "\n".join(
         f"[{h.get('source','?')}] {h.get('published','')} — {h['title']}"
+        + (f" ({h['source_count']} sources)" if h.get('source_count', 1) > 1 else "")
         for h in headlines[:40]
     )
 
@@ -0,0 +1,100 @@
+"""
+Parallel — bounded fan-out of one function over many items.
+
+Threads by default (most work here is network wait), processes on request
+for CPU-bound runs. Work is submitted in a bounded window so a long item
+list never queues more than a few dozen futures at once, and progress is
+reported from the calling thread so Streamlit widgets can be updated safely.
+
+Worker processes are started fresh (forkserver, or spawn where that is
+missing), never forked from the caller: the app is multi-threaded, and a
+child forked while another thread holds a lock (ticker_meta's background
+refresh, logging, ...) deadlocks on it. Workers therefore see none of the
+caller's in-memory caches; callers pass the data they need in the items.
+Process pools are kept and reused across calls, so a session pays the
+worker start-up once rather than on every backtest, sweep or replay.
+"""
+
+import threading
+import multiprocessing as mp
+from concurrent.futures import (ThreadPoolExecutor, ProcessPoolExecutor,
+                                FIRST_COMPLETED, wait)
+from concurrent.futures.process import BrokenProcessPool
+
+
+DEFAULT_WORKERS = 10
+START_METHOD    = "forkserver" if "forkserver" in mp.get_all_start_methods() else "spawn"
+_MP_CONTEXT     = mp.get_context(START_METHOD)
+if START_METHOD == "forkserver":
+    _MP_CONTEXT.set_forkserver_preload(["numpy", "pandas"])    # imported once, in the server
+
+_POOLS     = {}            # max_workers -> live ProcessPoolExecutor
+_POOL_LOCK = threading.Lock()
+
+
+def _process_pool(max_workers: int) -> ProcessPoolExecutor:
+    with _POOL_LOCK:
+        pool = _POOLS.get(max_workers)
+        if pool is None:
+            pool = _POOLS[max_workers] = ProcessPoolExecutor(max_workers=max_workers,
+                                                             mp_context=_MP_CONTEXT)
+        return pool
+
+
+def _discard_pool(pool: ProcessPoolExecutor):
+    """Forget a pool whose worker died so the next call starts a new one."""
+    with _POOL_LOCK:
+        for k, p in list(_POOLS.items()):
+            if p is pool:
+                del _POOLS[k]
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def run_parallel(fn, items: list, *args, executor: str = "thread",
+                 max_workers: int = DEFAULT_WORKERS, on_done=None) -> list:
+    """
+    Call fn(item, *args) for every item with at most `max_workers` running
+    and `2 * max_workers` in flight. on_done(item, result, done, total) is
+    called in the caller's thread as each call finishes.
+    Returns results in input order (None where fn raised).
+    """
+    items   = list(items)
+    total   = len(items)
+    results = [None] * total
+    if not total:
+        return results
+
+    workers = max(1, min(int(max_workers), total))
+    window  = workers * 2
+    done    = 0
+    next_i  = 0
+    pending = {}
+    if executor == "process":
+        pool = _process_pool(max(1, int(max_workers)))
+    else:
+        pool = ThreadPoolExecutor(max_workers=workers)
+
+    try:
+        while next_i < total or pending:
+            while next_i < total and len(pending) < window:
+                fut = pool.submit(fn, items[next_i], *args)
+                pending[fut] = next_i
+                next_i += 1
+
+            finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for fut in finished:
+                i = pending.pop(fut)
+                try:
+                    results[i] = fut.result()
+                except Exception:
+                    results[i] = None
+                done += 1
+                if on_done:
+                    on_done(items[i], results[i], done, total)
+    except BrokenProcessPool:
+        _discard_pool(pool)             # remaining items stay None
+    finally:
+        if executor != "process":
+            pool.shutdown()
+
+    return results
@@ -0,0 +1,159 @@
+"""
+Portfolio backtester — one book of capital trading the backtest rules on many
+tickers at once.
+
+All tickers are aligned on one sorted trading calendar and their indicators
+and buy/sell signals are computed as dates × tickers arrays in a single
+vectorized pass (indicator_panel). Indicators run on each ticker's own bars
+(right-aligned) and are then put back on the calendar, so a day one ticker
+did not trade does not leave a gap in its moving-average or RSI windows. The simulation then walks the calendar
+once: each day it closes positions whose sell signal fired, opens new ones
+while there are free slots and cash (most oversold RSI first), and marks the
+book to market. Output is an equity curve, a trade log and summary stats.
+"""
+
+import numpy as np
+import pandas as pd
+
+from indicator_panel import build_panel, right_align, unalign, rsi, bollinger, sma
+from backtester import DEFAULT_RULES, INDICATOR_DEFAULTS, _signals, _load_all
+
+
+def _panel_indicators(frames: dict, params: dict) -> dict:
+    """Close, RSI, %B, MA50 and MA200 as dates × tickers arrays."""
+    panel   = build_panel(frames, ('Close',))
+    aligned = right_align(panel)
+    close   = aligned['Close']
+    order   = aligned['order']
+    rsi_period, bb_period, bb_std = (params.get(k, v) for k, v in INDICATOR_DEFAULTS.items())
+    return {
+        "dates":   panel['dates'],
+        "tickers": panel['tickers'],
+        "close":   panel['Close'],
+        "rsi":     unalign(rsi(close, rsi_period), order),
+        "bb":      unalign(bollinger(close, bb_period, bb_std)[0], order),
+        "ma50":    unalign(sma(close, 50), order),
+        "ma200":   unalign(sma(close, 200), order),
+    }
+
+
+def _trade(ticker, dates, entry, exit_, buy_price, price) -> dict:
+    pct = (price - buy_price) / buy_price * 100
+    end = dates[exit_] if exit_ is not None else dates[-1]
+    return {
+        "ticker":     ticker,
+        "buy_date":   dates[entry].strftime('%Y-%m-%d'),
+        "sell_date":  end.strftime('%Y-%m-%d') if exit_ is not None else "OPEN",
+        "buy_price":  round(float(buy_price), 2),
+        "sell_price": round(float(price), 2),
+        "return_%":   round(pct, 2),
+        "hold_days":  (end - dates[entry]).days,
+        "result":     "🔵 Open" if exit_ is None else "✅ Win" if pct > 0 else "❌ Loss",
+    }
+
+
+def _stats(equity: pd.Series, trades: list, exposure: float) -> dict:
+    if equity.empty:
+        return {}
+    rets   = equity.pct_change().dropna()
+    peak   = equity.cummax()
+    closed = [t for t in trades if t['sell_date'] != "OPEN"]
+    wins   = [t for t in closed if t['return_%'] > 0]
+    years  = max((equity.index[-1] - equity.index[0]).days / 365.25, 1e-9)
+    total  = equity.iloc[-1] / equity.iloc[0]
+    return {
+        "total_return":  round(float(total - 1) * 100, 2),
+        "cagr":          round(float(total ** (1 / years) - 1) * 100, 2),
+        "max_drawdown":  round(float((equity / peak - 1).min()) * 100, 2),
+        "sharpe":        round(float(rets.mean() / rets.std() * np.sqrt(252)), 2)
+                         if len(rets) > 1 and rets.std() > 0 else 0.0,
+        "total_trades":  len(trades),
+        "win_rate":      round(len(wins) / len(closed) * 100, 1) if closed else 0,
+        "avg_return":    round(float(np.mean([t['return_%'] for t in trades])), 2) if trades else 0,
+        "exposure":      round(float(exposure) * 100, 1),
+    }
+
+
+def simulate_portfolio(frames: dict, params: dict, rules: dict = None,
+                       capital: float = 100_000, max_positions: int = 10,
+                       start: pd.Timestamp = None, cost_bps: float = 0.0,
+                       loss_cooldown: int = 2) -> dict:
+    """
+    Trade every ticker in `frames` out of one account.
+    Each new position gets equity / max_positions (or whatever cash is
+    left); entries and exits fill at the signal day's close, with
+    `cost_bps` charged per side. After a losing trade the ticker sits out
+    its next `loss_cooldown` bars, as in the per-ticker backtest.
+    Returns {equity: Series, trades: [...], stats: {...}}.
+    """
+    ind = _panel_indicators(frames, params)
+    dates, tickers, close = ind['dates'], ind['tickers'], ind['close']
+    if not len(tickers):
+        return {"equity": pd.Series(dtype=float), "trades": [], "stats": {}}
+    buy, sell = _signals(ind, {**DEFAULT_RULES, **(rules or {})})
+    mark = pd.DataFrame(close).ffill().to_numpy()      # last known close for open positions
+    bars = np.cumsum(~np.isnan(close), axis=0)          # each ticker's own bar count so far
+    rsi_ = ind['rsi']
+    fee  = cost_bps / 10_000
+
+    n_t      = len(tickers)
+    held     = np.zeros(n_t, dtype=bool)
+    shares   = np.zeros(n_t)
+    entry_i  = np.zeros(n_t, dtype=int)
+    entry_px = np.zeros(n_t)
+    blocked  = np.zeros(n_t, dtype=int)                # first own bar a ticker may re-enter on
+    cash     = float(capital)
+    first    = int(dates.searchsorted(start)) if start is not None else 0
+    equity   = np.full(len(dates), np.nan)
+    trades   = []
+    invested = 0
+
+    for d in range(first, len(dates)):
+        px, has_bar = close[d], ~np.isnan(close[d])
+
+        # exits
+        for j in np.flatnonzero(held & sell[d] & has_bar):
+            cash += shares[j] * px[j] * (1 - fee)
+            trades.append(_trade(tickers[j], dates, entry_i[j], d, entry_px[j], px[j]))
+            held[j], shares[j] = False, 0.0
+            blocked[j] = bars[d, j] + 1 + (0 if px[j] > entry_px[j] else loss_cooldown)
+
+        # entries — most oversold first, one slot per position
+        value = cash + np.dot(shares, np.nan_to_num(mark[d]))
+        slots = max_positions - int(held.sum())
+        if slots > 0:
+            cand = np.flatnonzero(~held & buy[d] & has_bar & (blocked <= bars[d]))
+            cand = cand[np.argsort(rsi_[d, cand], kind='stable')][:slots]
+            for j in cand:
+                alloc = min(value / max_positions, cash)
+                if alloc <= 0:
+                    break
+                shares[j]   = alloc * (1 - fee) / px[j]
+                cash       -= alloc
+                held[j]     = True
+                entry_i[j]  = d
+                entry_px[j] = px[j]
+
+        equity[d] = cash + np.dot(shares, np.nan_to_num(mark[d]))
+        invested += held.any()
+
+    for j in np.flatnonzero(held):                     # still open at the end
+        trades.append(_trade(tickers[j], dates, entry_i[j], None, entry_px[j], mark[-1, j]))
+
+    curve = pd.Series(equity[first:], index=dates[first:], name="equity")
+    return {"equity": curve, "trades": trades,
+            "stats": _stats(curve, trades, invested / max(len(curve), 1))}
+
+
+def run_portfolio_backtest(tickers: list, params: dict, rules: dict = None,
+                           capital: float = 100_000, max_positions: int = 10,
+                           period: str = "2y", test_days: int = 365,
+                           cost_bps: float = 0.0, status_text=None) -> dict:
+    """Load bars for `tickers` from the price store and simulate the last `test_days` as one portfolio."""
+    if status_text:
+        status_text.caption(f"Loading price history for {len(tickers)} stocks…")
+    frames = {t: df for t, df in _load_all(tickers, period).items() if not df.empty}
+    start  = pd.Timestamp.today().normalize() - pd.Timedelta(days=test_days)
+    if status_text:
+        status_text.caption(f"Simulating portfolio of {len(frames)} stocks…")
+    return simulate_portfolio(frames, params, rules, capital, max_positions, start, cost_bps)
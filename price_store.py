@@ -0,0 +1,235 @@
+"""
+Price store — daily OHLCV bars kept on disk, one Parquet file per ticker.
+
+A ticker is downloaded in full once; after that only the bars since its last
+stored date are fetched, and a ticker already refreshed today is served from
+disk with no network call at all. Downloads go through chunked
+yf.download calls. yfinance still sends one chart request per symbol inside
+each call, so chunking bounds the number of calls and threads, not the
+number of HTTP round trips. The store is what keeps those down: after the
+first day a scan only requests tickers that need new bars.
+
+If the tail download shows that history was re-adjusted (split/dividend with
+auto_adjust), the ticker is re-downloaded in full.
+"""
+
+import os
+import json
+import threading
+from datetime import datetime, timedelta
+
+import yfinance as yf
+import pandas as pd
+
+
+STORE_DIR    = os.environ.get("PRICE_STORE_DIR",
+                              os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                           ".cache", "ohlcv"))
+OHLCV_COLS   = ['Open','High','Low','Close','Volume']
+PERIOD_DAYS  = {"1mo": 31, "3mo": 92, "6mo": 183, "1y": 366, "2y": 731, "5y": 1827, "10y": 3653}
+ADJUST_TOL   = 0.005    # overlap bar moving more than this means history was re-adjusted
+BAR_BYTES    = 80       # rough size of one daily bar in Yahoo's chart response
+
+_LOCK  = threading.Lock()
+_INDEX = None           # {ticker: {"since": date, "checked": date}}
+_STATS = {"requests": 0, "batches": 0, "bars": 0}    # download_bars totals since import
+
+
+# ── Download ──────────────────────────────────────────────────
+def clean_ohlcv(df: pd.DataFrame) -> pd.DataFrame:
+    """Keep OHLCV columns, drop empty bars, use tz-naive dates."""
+    if df is None or df.empty or 'Close' not in df.columns:
+        return pd.DataFrame()
+    cols = [c for c in OHLCV_COLS if c in df.columns]
+    df   = df[cols].dropna(subset=['Close']).copy()
+    if getattr(df.index, 'tz', None) is not None:
+        df.index = df.index.tz_localize(None)
+    return df
+
+
+def _split_batch(raw: pd.DataFrame, tickers: list) -> dict:
+    """Split one multi-ticker yf.download frame into per-ticker OHLCV frames."""
+    frames = {}
+    if raw is None or raw.empty:
+        return {t: pd.DataFrame() for t in tickers}
+    if not isinstance(raw.columns, pd.MultiIndex):
+        # single-ticker chunk comes back with flat columns
+        return {tickers[0]: clean_ohlcv(raw)}
+    present = set(raw.columns.get_level_values(0))
+    for t in tickers:
+        frames[t] = clean_ohlcv(raw[t]) if t in present else pd.DataFrame()
+    return frames
+
+
+def download_bars(tickers: list, chunk_size: int = 100, **kwargs) -> dict:
+    """
+    Download daily bars for many tickers in chunked yf.download calls (one
+    chart request per symbol inside each call). kwargs go to yf.download
+    (period= or start=). Chunks that fail are left out of the result.
+    """
+    frames = {}
+    for i in range(0, len(tickers), chunk_size):
+        chunk = tickers[i:i + chunk_size]
+        with _LOCK:
+            _STATS["requests"] += len(chunk)     # yfinance issues one chart request per symbol
+            _STATS["batches"]  += 1
+        try:
+            raw = yf.download(chunk, interval="1d", auto_adjust=True, actions=False,
+                              group_by='ticker', threads=True, progress=False, **kwargs)
+        except Exception:
+            continue
+        batch = _split_batch(raw, chunk)
+        with _LOCK:
+            _STATS["bars"] += sum(len(df) for df in batch.values())
+        frames.update(batch)
+    return frames
+
+
+def download_stats() -> dict:
+    """Per-symbol requests, yf.download batches and bars so far, with an estimated byte count."""
+    with _LOCK:
+        stats = dict(_STATS)
+    stats["bytes"] = stats["bars"] * BAR_BYTES
+    return stats
+
+
+# ── Disk ──────────────────────────────────────────────────────
+def _path(ticker: str) -> str:
+    safe = "".join(c if c.isalnum() or c in "-." else "_" for c in ticker)
+    return os.path.join(STORE_DIR, f"{safe}.parquet")
+
+
+def _index_path() -> str:
+    return os.path.join(STORE_DIR, "_index.json")
+
+
+def _load_index() -> dict:
+    global _INDEX
+    if _INDEX is None:
+        try:
+            with open(_index_path()) as f:
+                _INDEX = json.load(f)
+        except Exception:
+            _INDEX = {}
+    return _INDEX
+
+
+def _save_index():
+    try:
+        os.makedirs(STORE_DIR, exist_ok=True)
+        tmp = _index_path() + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(_INDEX, f)
+        os.replace(tmp, _index_path())
+    except Exception:
+        pass
+
+
+def _read(ticker: str) -> pd.DataFrame:
+    try:
+        return pd.read_parquet(_path(ticker))
+    except Exception:
+        return pd.DataFrame()
+
+
+def _write(ticker: str, df: pd.DataFrame):
+    try:
+        os.makedirs(STORE_DIR, exist_ok=True)
+        tmp = _path(ticker) + ".tmp"
+        df.to_parquet(tmp)
+        os.replace(tmp, _path(ticker))
+    except Exception:
+        pass   # no Parquet engine / read-only disk — still return the fresh data
+
+
+def _merge(old: pd.DataFrame, new: pd.DataFrame) -> pd.DataFrame:
+    if old.empty:
+        return new
+    if new.empty:
+        return old
+    df = pd.concat([old, new])
+    return df[~df.index.duplicated(keep='last')].sort_index()
+
+
+def _readjusted(old: pd.DataFrame, new: pd.DataFrame) -> bool:
+    """True if the bars both frames share no longer agree (history re-adjusted)."""
+    common = old.index.intersection(new.index)
+    if old.empty or new.empty or not len(common):
+        return False
+    a = float(old.loc[common[0], 'Close'])
+    b = float(new.loc[common[0], 'Close'])
+    return a > 0 and abs(a - b) / a > ADJUST_TOL
+
+
+# ── Public API ────────────────────────────────────────────────
+def load_many(tickers: list, period: str = "2y", chunk_size: int = 100) -> dict:
+    """
+    Return {ticker: DataFrame} of daily bars covering `period`.
+    Fetches only what the store is missing: full history for new tickers,
+    bars since the last stored date for the rest, nothing for tickers
+    already refreshed today.
+    """
+    today  = datetime.today().date()
+    start  = today - timedelta(days=PERIOD_DAYS.get(period, 731))
+    t_key  = today.isoformat()
+    s_key  = start.isoformat()
+    tickers = list(dict.fromkeys(tickers))
+
+    with _LOCK:
+        index = _load_index()
+        stored, full, tail = {}, [], {}
+        for t in tickers:
+            meta = index.get(t, {})
+            if meta.get("since", "9999") > s_key:
+                full.append(t)
+                continue
+            stored[t] = _read(t)
+            if meta.get("checked") == t_key:
+                continue
+            if stored[t].empty:
+                full.append(t)
+            else:
+                last = stored[t].index[-1].date().isoformat()
+                tail.setdefault(last, []).append(t)
+
+    fetched = download_bars(full, chunk_size, period=period) if full else {}
+    for last, group in tail.items():
+        fetched.update(download_bars(group, chunk_size, start=last))
+
+    redo = [t for g in tail.values() for t in g
+            if t in fetched and _readjusted(stored.get(t, pd.DataFrame()), fetched[t])]
+    if redo:
+        fetched.update(download_bars(redo, chunk_size, period=period))
+
+    result = {}
+    with _LOCK:
+        index = _load_index()
+        for t in tickers:
+            old = stored.get(t, pd.DataFrame())
+            is_full = t in full or t in redo
+            if t in fetched and not (is_full and fetched[t].empty):
+                df = fetched[t] if is_full else _merge(old, fetched[t])
+                if is_full or not fetched[t].empty:
+                    _write(t, df)
+                since = s_key if is_full else index[t]["since"]
+                index[t] = {"since": since, "checked": t_key}
+            else:
+                df = old    # download failed or empty — serve what we have, retry next call
+            result[t] = df[df.index >= pd.Timestamp(start)] if not df.empty else df
+        if fetched:
+            _save_index()
+
+    return result
+
+
+def covered(tickers: list, period: str = "2y") -> set:
+    """Tickers whose stored history already spans `period` (no full download needed)."""
+    start = (datetime.today().date() - timedelta(days=PERIOD_DAYS.get(period, 731))).isoformat()
+    with _LOCK:
+        index = _load_index()
+        return {t for t in tickers if index.get(t, {}).get("since", "9999") <= start}
+
+
+def load(ticker: str, period: str = "2y") -> pd.DataFrame:
+    """Daily bars for one ticker, via the store."""
+    return load_many([ticker], period).get(ticker, pd.DataFrame())
@@ -0,0 +1,322 @@
+"""
+Replay — the live screener's filters and 0–10 score, point in time, for every
+ticker on every past trading day.
+
+calculate_indicators() scores one ticker on its latest bar. Here each of its
+inputs (RSI, %B, MACD, MAs, trend, beta, relative strength, volume analysis,
+support/resistance, chart patterns, quality filters, signal freshness, VIX
+regime) is rebuilt as a series that only uses bars up to each day, and the
+screener's own filter cascade and score (passes_filters, murphy_score) are
+applied to all days at once. The result is a
+long (date, ticker, score) table of the days each ticker would have passed
+the screener, and pick_performance() measures how the top picks did next.
+
+Differences from a live scan: institutional ownership is not known
+historically, so min_institutional and its bonus are ignored; the 2-year
+scan window and the 1-year SPY window are approximated in bars (LOOKBACK,
+SPY_RETURNS).
+"""
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+import price_store
+import chart_patterns
+from indicator_panel import _round
+from parallel import run_parallel
+from levels import LOOKBACK, support_resistance_history
+from screener import REGIME_TICKERS, get_vix_regime, passes_filters, murphy_score
+
+
+SPY_RETURNS = 250    # SPY daily returns in the live scan's 1-year benchmark window
+
+
+# ── Component series ──────────────────────────────────────────
+def _window_start(T: int) -> np.ndarray:
+    """First bar of the LOOKBACK window ending on each day."""
+    return np.maximum(np.arange(T) - LOOKBACK + 1, 0)
+
+
+def _rsi(close: pd.Series, period: int) -> np.ndarray:
+    delta = close.diff()
+    gain  = delta.clip(lower=0).ewm(com=period-1, min_periods=period).mean()
+    loss  = (-delta.clip(upper=0)).ewm(com=period-1, min_periods=period).mean()
+    return (100 - 100 / (1 + gain / loss)).to_numpy(dtype=float)
+
+
+def _beta(close: pd.Series, spy: pd.Series) -> np.ndarray:
+    """_beta(): cov(stock, SPY) / var(SPY) over the common daily returns."""
+    rets = pd.DataFrame({"s": close.pct_change(),
+                         "m": spy.pct_change().reindex(close.index)}).dropna()
+    cov  = rets["s"].rolling(SPY_RETURNS, min_periods=30).cov(rets["m"])
+    var  = rets["m"].rolling(SPY_RETURNS, min_periods=30).var(ddof=0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        beta = pd.Series(np.where(var > 0, _round((cov / var).to_numpy(), 2), 1.0), index=rets.index)
+    beta[cov.isna()] = 1.0
+    return beta.reindex(close.index).ffill().fillna(1.0).to_numpy()
+
+
+def _relative_strength(close: pd.Series, spy: pd.Series) -> np.ndarray:
+    """_relative_strength(): 63-bar stock return / |SPY return| on common dates."""
+    common = close.index.intersection(spy.index)
+    s, m   = close.loc[common], spy.loc[common]
+    s_ret  = (s / s.shift(62) - 1).to_numpy()
+    m_ret  = (m / m.shift(62) - 1).to_numpy()
+    with np.errstate(invalid='ignore', divide='ignore'):
+        rs = np.where((m_ret == 0) | np.isnan(m_ret) | np.isnan(s_ret), 1.0,
+                      _round(s_ret / np.abs(m_ret), 2))
+    out = pd.Series(rs, index=common).reindex(close.index).ffill().fillna(1.0).to_numpy(copy=True)
+    out[np.arange(len(close)) + 1 < 65] = 1.0
+    return out
+
+
+def _pattern_scores(high: np.ndarray, low: np.ndarray, c: np.ndarray, n: np.ndarray) -> tuple:
+    """(bullish strength sum, bearish strength sum) per day, from each day's last MAX_LOOK bars."""
+    look = chart_patterns.MAX_LOOK
+    pad  = lambda x: np.concatenate([np.full(look - 1, np.nan), x])
+    win  = lambda x: sliding_window_view(pad(x), look).T    # MAX_LOOK × days
+    found = chart_patterns.detect(win(high), win(low), win(c), n)
+    bull, bear = np.zeros(len(c)), np.zeros(len(c))
+    for name, kind, _ in chart_patterns.PATTERNS:
+        hit, strength = found[name]
+        val = _round(np.broadcast_to(strength, hit.shape).astype(float), 2)
+        if kind == "bullish":
+            bull = bull + np.where(hit, val, 0.0)
+        else:
+            bear = bear + np.where(hit, val, 0.0)
+    return bull, bear
+
+
+def _accumulation(c: np.ndarray, v: np.ndarray, avg20: np.ndarray) -> np.ndarray:
+    """_volume_analysis() accumulation score: up days minus down days on above-average volume, last 20 bars."""
+    out = np.zeros(len(c))
+    if len(c) < 20:
+        return out
+    up, down = c[1:] > c[:-1], c[1:] < c[:-1]
+    heavy = sliding_window_view(v[1:], 19) > avg20[19:, None]
+    out[19:] = ((sliding_window_view(up, 19) & heavy).sum(axis=1) -
+                (sliding_window_view(down, 19) & heavy).sum(axis=1))
+    return out
+
+
+def _quality_fail(close: pd.Series, c: np.ndarray, ma50_r: np.ndarray, n: np.ndarray) -> np.ndarray:
+    """_quality_filters() verdict per day (True = trap)."""
+    with np.errstate(invalid='ignore', divide='ignore'):
+        # 1. too extended above MA50
+        fail = (ma50_r > 0) & ((c - ma50_r) / ma50_r * 100 > 15)
+        # 2. sideways chop over 60 days
+        r60  = close.rolling(60)
+        rng  = ((r60.max() - r60.min()) / r60.mean() * 100).to_numpy()
+        fail |= (n >= 60) & (rng < 8)
+        # 3. bull trap: small bounce after a big drop
+        low20 = close.rolling(20).min().to_numpy()
+        peak  = close.shift(20).rolling(70).max().to_numpy()
+        drop  = (low20 - peak) / peak * 100
+        bounce = (c - low20) / low20 * 100
+        fail |= (n >= 90) & (peak > 0) & (drop < -25) & (bounce > 2) & (bounce < 12)
+        # 4. consecutive lower 5-day highs
+        rm5   = close.rolling(5).max()
+        highs = np.stack([rm5.shift(k).to_numpy() for k in range(39, -1, -6)])
+        lower = (highs[1:] < highs[:-1]).sum(axis=0)
+        fail |= (n >= 40) & (lower >= 4)
+    return fail
+
+
+# ── Per-ticker replay ─────────────────────────────────────────
+def ticker_scores(ticker: str, df: pd.DataFrame, params: dict, spy: pd.Series,
+                  regimes: pd.Series = None) -> pd.Series:
+    """
+    Score `ticker` on every day of `df` the way calculate_indicators would
+    have on that day. NaN where the filter cascade rejects it.
+    """
+    if df is None or len(df) < 60 or 'Volume' not in df.columns:
+        return pd.Series(dtype=float)
+    close = df['Close']
+    c, v  = close.to_numpy(dtype=float), df['Volume'].to_numpy(dtype=float)
+    high, low = df['High'].to_numpy(dtype=float), df['Low'].to_numpy(dtype=float)
+    T     = len(c)
+    n     = np.arange(T) - _window_start(T) + 1              # bars in each day's window
+    vol   = df['Volume']
+
+    # ── last-bar features (_scalar_features) ─────────────────────
+    rsi_period = params.get('rsi_period', 14)
+    bb_period  = params.get('bb_period', 20)
+    bb_std     = params.get('bb_std', 2.0)
+    price   = _round(c, 2)
+    avg_vol = vol.rolling(20).mean().to_numpy()
+    ma      = {w: close.rolling(w).mean().to_numpy() for w in (20, 50, 200)}
+    ma_r    = {w: np.where(n >= w, _round(ma[w], 2), np.nan) for w in ma}
+
+    rsi_raw = _rsi(close, rsi_period)
+    rsi     = np.where((n < rsi_period * 2) | np.isnan(rsi_raw), 50.0, _round(rsi_raw, 1))
+
+    mid, sd = close.rolling(bb_period).mean(), close.rolling(bb_period).std()
+    upper, lower = mid + bb_std * sd, mid - bb_std * sd
+    with np.errstate(invalid='ignore', divide='ignore'):
+        pct = ((close - lower) / (upper - lower)).to_numpy()
+    bb = np.where((n < bb_period + 2) | np.isnan(pct), 0.5, _round(pct, 3))
+
+    macd_line = close.ewm(span=12, adjust=False).mean() - close.ewm(span=26, adjust=False).mean()
+    hist      = (macd_line - macd_line.ewm(span=9, adjust=False).mean()).to_numpy()
+    macd_bull = (n >= 40) & (_round(hist, 4) > 0)
+
+    start = close.shift(20).to_numpy()
+    with np.errstate(invalid='ignore', divide='ignore'):
+        trend = np.where((n < 22) | ~(start > 0), 0.0, _round((c - start) / start * 100, 2))
+
+    # ── structure ────────────────────────────────────────────────
+    ok        = lambda x: ~np.isnan(x)
+    above_200 = ok(ma_r[200]) & (price > ma_r[200])
+    above_50  = ok(ma_r[50])  & (price > ma_r[50])
+    above_20  = ok(ma_r[20])  & (price > ma_r[20])
+    near_50   = ok(ma_r[50])  & (price >= ma_r[50] * 0.97)
+    uptrend   = ((n >= 200) & (c > c[_window_start(T)]) &
+                 (c > ma[200]) & (ma[50] > ma[200]))
+
+    beta = _beta(close, spy)
+    rs   = _relative_strength(close, spy)
+
+    # ── volume analysis ─────────────────────────────────────────
+    with np.errstate(invalid='ignore', divide='ignore'):
+        ratio20 = np.where(avg_vol > 0, _round(v / avg_vol, 2), 1.0)
+        earlier = vol.shift(10).rolling(10).mean().to_numpy()
+        rising  = (n >= 20) & (earlier > 0) & \
+                  ((vol.rolling(10).mean().to_numpy() - earlier) / earlier * 100 > 10)
+    spike     = ratio20 >= 1.5
+    res_lvl   = df['High'].shift(5).rolling(35).max().to_numpy()
+    breakout  = (n >= 45) & (res_lvl != 0) & (c > res_lvl) & (ratio20 >= 1.5)
+    diverg    = ((n >= 20) & (c > close.shift(9).to_numpy()) &
+                 (vol.rolling(5).mean().to_numpy() < vol.shift(5).rolling(10).mean().to_numpy() * 0.8))
+    accum     = _accumulation(c, v, avg_vol)
+
+    # ── levels, patterns, R/R ───────────────────────────────────
+    sup, res     = support_resistance_history(high, low, c)
+    near_support = ok(sup) & (np.abs(c - sup) / c < 0.03)
+    bull, bear   = _pattern_scores(high, low, c, n)
+    stop = np.where(ok(sup) & (sup != 0), sup, price * 0.95)
+    risk = price - stop
+    with np.errstate(invalid='ignore', divide='ignore'):
+        ratio = np.where(risk > 0, _round((res - price) / risk, 2), 0.0)
+    rr_valid = ok(res) & (res > price) & (ratio >= 1.5)
+
+    rsi_max = params.get('rsi_max', 90)
+    fresh   = pd.Series(rsi_raw).shift(4).to_numpy() > rsi_max
+
+    prio = np.zeros(T, dtype=bool)
+    if regimes is not None:
+        r = regimes.reindex(close.index, method='ffill').to_numpy()
+        prio = np.array([bool(g) and ticker in REGIME_TICKERS[g] for g in r])
+
+    # ── filter cascade and score (screener.passes_filters / murphy_score) ──
+    passes = (n >= 60) & passes_filters(
+        params, price=price, avg_vol=avg_vol, above_200=above_200, above_50=above_50,
+        near_50=near_50, above_20=above_20, rsi=rsi, uptrend=uptrend, trend_4w=trend,
+        beta=beta, quality_ok=~_quality_fail(close, c, ma_r[50], n))
+    score = murphy_score({
+        "rsi": rsi, "bb_pct": bb, "trend_4w": trend,
+        "above_200": above_200, "above_50": above_50, "above_20": above_20,
+        "uptrend": uptrend, "macd_bullish": macd_bull,
+        "vol_spike": spike, "vol_ratio": ratio20, "breakout": breakout,
+        "divergence": diverg, "vol_rising": rising, "accum": accum, "rs": rs,
+        "near_support": near_support, "bullish": bull, "bearish": bear,
+        "rr_valid": rr_valid, "fresh": fresh, "priority": prio,
+    })
+
+    return pd.Series(np.where(passes, score, np.nan), index=close.index, name=ticker)
+
+
+def _replay_item(item: tuple, params: dict, spy: pd.Series, regimes: pd.Series):
+    ticker, df = item
+    try:
+        return ticker_scores(ticker, df, params, spy, regimes)
+    except Exception:
+        return None
+
+
+# ── Universe replay ───────────────────────────────────────────
+def vix_regimes(vix_close: pd.Series) -> pd.Series:
+    """Daily VIX regime, None where there is no reading (no priority bonus)."""
+    return vix_close.map(lambda v: get_vix_regime(v) if v > 0 else None)
+
+
+def replay_scores(frames: dict, params: dict, spy: pd.Series, vix_close: pd.Series = None,
+                  start: pd.Timestamp = None, executor: str = "process",
+                  max_workers: int = None, progress_bar=None, status_text=None) -> pd.DataFrame:
+    """
+    Long (date, ticker, score) table of every day on or after `start` that a
+    ticker in `frames` passed the screener, best scores first within a day.
+    """
+    regimes = vix_regimes(vix_close) if vix_close is not None and not vix_close.empty else None
+
+    def on_done(item, res, done, total):
+        if progress_bar:
+            progress_bar.progress(done / total)
+        if status_text:
+            status_text.caption(f"Replaying {item[0]}… ({done}/{total})")
+
+    items   = [(t, df) for t, df in frames.items() if df is not None and not df.empty]
+    results = run_parallel(_replay_item, items, params, spy, regimes, executor=executor,
+                           max_workers=max_workers or 4, on_done=on_done)
+    parts = []
+    for (ticker, _), s in zip(items, results):
+        if s is None or s.empty:
+            continue
+        s = s.dropna()
+        if start is not None:
+            s = s[s.index >= start]
+        parts.append(pd.DataFrame({"date": s.index, "ticker": ticker, "score": s.to_numpy()}))
+    if not parts:
+        return pd.DataFrame(columns=["date", "ticker", "score"])
+    out = pd.concat(parts, ignore_index=True)
+    return out.sort_values(["date", "score", "ticker"], ascending=[True, False, True],
+                           kind='stable').reset_index(drop=True)
+
+
+def pick_performance(scores: pd.DataFrame, frames: dict, top_n: int = 10,
+                     horizons: tuple = (5, 20)) -> pd.DataFrame:
+    """
+    Forward returns of each day's top_n scored picks against every passing
+    ticker, per holding horizon in bars: mean return % and hit rate %.
+    """
+    rows = []
+    if scores.empty:
+        return pd.DataFrame(rows)
+    ranked = scores.assign(rank=scores.groupby("date").cumcount())
+    for h in horizons:
+        fwd = []
+        for ticker, grp in ranked.groupby("ticker", sort=False):
+            close = frames[ticker]['Close']
+            ret   = (close.shift(-h) / close - 1) * 100
+            fwd.append(pd.Series(ret.reindex(grp["date"]).to_numpy(), index=grp.index))
+        r   = pd.concat(fwd).reindex(ranked.index)
+        top = r[ranked["rank"] < top_n].dropna()
+        all_ = r.dropna()
+        rows.append({
+            "horizon":         h,
+            "top_avg_%":       round(float(top.mean()), 2) if len(top) else 0.0,
+            "top_hit_rate_%":  round(float((top > 0).mean() * 100), 1) if len(top) else 0.0,
+            "all_avg_%":       round(float(all_.mean()), 2) if len(all_) else 0.0,
+            "all_hit_rate_%":  round(float((all_ > 0).mean() * 100), 1) if len(all_) else 0.0,
+            "picks":           int(len(top)),
+        })
+    return pd.DataFrame(rows).set_index("horizon")
+
+
+def run_replay(tickers: list, params: dict, period: str = "5y", replay_days: int = 730,
+               top_n: int = 10, progress_bar=None, status_text=None) -> dict:
+    """
+    Load bars (plus SPY and ^VIX) from the price store and replay the
+    screener over the last `replay_days`.
+    Returns {scores: (date, ticker, score) DataFrame, performance: DataFrame}.
+    """
+    if status_text:
+        status_text.caption(f"Loading {period} of price history for {len(tickers)} stocks…")
+    loaded = price_store.load_many(list(tickers) + ["SPY", "^VIX"], period)
+    frames = {t: loaded[t] for t in tickers if t in loaded}
+    spy    = loaded.get("SPY", pd.DataFrame()).get('Close', pd.Series(dtype=float))
+    vix    = loaded.get("^VIX", pd.DataFrame()).get('Close', pd.Series(dtype=float))
+    start  = pd.Timestamp.today().normalize() - pd.Timedelta(days=replay_days)
+    scores = replay_scores(frames, params, spy, vix, start,
+                           progress_bar=progress_bar, status_text=status_text)
+    return {"scores": scores, "performance": pick_performance(scores, frames, top_n)}
@@ -0,0 +1,164 @@
+"""
+RSS parser — feed items parsed incrementally with xml.etree's pull parser.
+
+The body is fed in chunks and each <item> (or Atom <entry>) is turned into a
+dict as soon as its closing tag arrives, then dropped from the tree, so the
+document is never held as one string or re-scanned, and parsing stops once
+`limit` items are read. CDATA sections and entities are decoded by the XML
+parser itself, and text is unescaped once more (CDATA content often carries
+entities) so both paths agree. Feeds that are not well-formed XML fall
+back to the old regex scan.
+
+    python rss_parser.py [feed files...]    benchmark against the regex scan
+                                            (default: tests/fixtures/feeds;
+                                            --cache: the feed cache bodies)
+"""
+
+import re
+import html
+import xml.etree.ElementTree as ET
+
+
+CHUNK_SIZE = 16384
+ITEM_TAGS  = {"item", "entry"}
+DATE_TAGS  = ("pubDate", "published", "updated")
+_TAG_RE    = re.compile(r'<[^>]+>')
+
+
+def _local(tag: str) -> str:
+    return tag.rsplit('}', 1)[-1]
+
+
+def _clean(text: str) -> str:
+    """Decoded text with any markup left inside it removed."""
+    return _TAG_RE.sub('', text or '').strip()
+
+
+def _unescape(text: str) -> str:
+    """Entities the XML parser leaves in text (CDATA content, double-encoded feeds)."""
+    return html.unescape(text or '')
+
+
+def _item(elem) -> dict:
+    fields = {}
+    for child in elem:
+        name = _local(child.tag)
+        if name not in fields:
+            fields[name] = child
+    link = fields.get("link")
+    date = next((fields[t] for t in DATE_TAGS if t in fields), None)
+    return {
+        "title":     _clean(_unescape(fields["title"].text)) if "title" in fields else "",
+        "link":      _unescape(link.text or link.get("href")).strip() if link is not None else "",
+        "published": _unescape(date.text).strip() if date is not None else "",
+    }
+
+
+def _chunks(source, chunk_size: int):
+    if isinstance(source, (bytes, bytearray, str)):
+        data = source.encode() if isinstance(source, str) else bytes(source)
+        for i in range(0, len(data), chunk_size):
+            yield data[i:i + chunk_size]
+    else:
+        yield from source
+
+
+def parse_items(source, limit: int = None, chunk_size: int = CHUNK_SIZE) -> list:
+    """
+    [{"title", "link", "published"}] for the first `limit` items of an RSS or
+    Atom feed. `source` is the body (bytes/str) or an iterable of byte chunks
+    such as feed_cache.stream(), parsed as each chunk arrives.
+    """
+    if source is None:
+        return []
+    parser = ET.XMLPullParser(events=("end",))
+    chunks = _chunks(source, chunk_size)
+    items, seen = [], []
+    try:
+        for chunk in chunks:
+            seen.append(chunk)
+            parser.feed(chunk)
+            for _, elem in parser.read_events():
+                if _local(elem.tag) in ITEM_TAGS:
+                    items.append(_item(elem))
+                    elem.clear()
+                    if limit is not None and len(items) >= limit:
+                        return items
+        parser.close()
+        return items
+    except ET.ParseError:
+        body = b"".join(seen) + b"".join(chunks)
+        return regex_items(body.decode("utf-8", errors="replace"), limit)
+    finally:
+        chunks.close()                  # let a streaming source finish up (e.g. feed_cache.stream)
+
+
+def regex_items(text: str, limit: int = None) -> list:
+    """Fallback for malformed feeds: the regex scan, with CDATA and entities decoded."""
+    out = []
+    for block in re.findall(r'<(?:item|entry)\b[^>]*>(.*?)</(?:item|entry)>', text, re.DOTALL):
+        def field(tag):
+            m = re.search(rf'<{tag}\b[^>]*>(.*?)</{tag}>', block, re.DOTALL)
+            if not m:
+                return ''
+            raw = re.sub(r'<!\[CDATA\[(.*?)\]\]>', r'\1', m.group(1), flags=re.DOTALL)
+            return _unescape(raw)
+        out.append({
+            "title":     _clean(field("title")),
+            "link":      field("link").strip(),
+            "published": next((field(t).strip() for t in DATE_TAGS if field(t)), ""),
+        })
+        if limit is not None and len(out) >= limit:
+            break
+    return out
+
+
+# ── Benchmark ─────────────────────────────────────────────────
+def _legacy(text: str, limit: int) -> list:
+    """The per-fetcher regex scan this module replaced."""
+    out = []
+    for item in re.findall(r'<item>(.*?)</item>', text, re.DOTALL)[:limit]:
+        title = re.search(r'<title>(.*?)</title>', item)
+        link  = re.search(r'<link>(.*?)</link>', item)
+        pub   = re.search(r'<pubDate>(.*?)</pubDate>', item)
+        if title:
+            out.append((re.sub(r'<[^>]+>|<!\[CDATA\[|\]\]>', '', title.group(1)).strip(),
+                        link.group(1).strip() if link else '', pub.group(1) if pub else ''))
+    return out
+
+
+def _sample_feed(n: int = 100) -> bytes:
+    items = "".join(
+        f"<item><title><![CDATA[Markets & stocks: story {i} <b>update</b>]]></title>"
+        f"<link>https://example.com/news/{i}?a=1&amp;b=2</link>"
+        f"<pubDate>Mon, 06 Oct 2025 1{i % 10}:00:00 GMT</pubDate>"
+        f"<description>{'Lorem ipsum dolor sit amet. ' * 40}</description></item>"
+        for i in range(n))
+    return f'<?xml version="1.0" encoding="UTF-8"?><rss><channel>{items}</channel></rss>'.encode()
+
+
+if __name__ == "__main__":
+    import sys
+    import glob
+    import os
+    import timeit
+
+    paths = sys.argv[1:]
+    if paths == ["--cache"]:
+        import feed_cache
+        paths = sorted(glob.glob(os.path.join(feed_cache.CACHE_DIR, "*.body")))
+    elif not paths:
+        fixtures = os.path.join(os.path.dirname(os.path.abspath(__file__)), "tests", "fixtures", "feeds")
+        paths = sorted(glob.glob(os.path.join(fixtures, "*.xml")))
+    feeds = [(os.path.basename(p), open(p, "rb").read()) for p in paths] or [("synthetic", _sample_feed())]
+
+    print(f"{'feed':<44} {'KB':>6} {'limit':>5} {'regex ms':>9} {'pull ms':>8} {'items':>5}")
+    for name, body in feeds:
+        for limit in (10, None):
+            n = limit or 10 ** 9
+            reps = 50
+            t_re = timeit.timeit(lambda: _legacy(body.decode("utf-8", errors="replace"), n),
+                                 number=reps) / reps * 1000
+            t_pp = timeit.timeit(lambda: parse_items(body, limit), number=reps) / reps * 1000
+            print(f"{name[:44]:<44} {len(body) / 1024:>6.0f} {str(limit or 'all'):>5} "
+                  f"{t_re:>9.2f} {t_pp:>8.2f} {len(parse_items(body, limit)):>5}")
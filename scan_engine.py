@@ -0,0 +1,158 @@
+"""
+Scan engine — runs the screener over the stock universe in parallel.
+
+Threads by default (a scan is mostly network wait), processes on request for
+CPU-bound runs, via parallel.run_parallel: a 1,500-ticker scan never queues
+more than a few dozen futures at once, and progress is reported from the
+calling thread so Streamlit widgets can be updated safely.
+
+Two-phase mode first screens tickers that are not on disk yet on a short
+snapshot and downloads full history only for the ones that survive.
+"""
+
+import pandas as pd
+
+import price_store
+import ticker_meta
+from parallel import run_parallel, DEFAULT_WORKERS
+from indicator_panel import compute_features, feature_rows
+from chart_patterns import batch_patterns
+from screener import calculate_indicators, prefetch_ohlcv, build_scan_context
+
+
+SCAN_PERIOD     = "2y"
+SNAPSHOT_PERIOD = "3mo"
+SNAPSHOT_BARS   = 40     # RSI is only judged on snapshots at least this long
+RSI_MARGIN      = 5.0    # snapshot RSI starts its EWM late, so allow some drift
+
+
+def _scan_one(item: tuple, params: dict, ctx):
+    """item = (ticker, feature row, bars): everything a worker process needs."""
+    ticker, features, df = item
+    try:
+        return calculate_indicators(ticker, params, ctx, features, df)
+    except Exception:
+        return None
+
+
+def snapshot_prefilter(tickers: list, params: dict, period: str = SCAN_PERIOD) -> tuple:
+    """
+    Phase one of a two-phase scan. Tickers whose `period` history is not in
+    the price store get a SNAPSHOT_PERIOD download (not stored) and are
+    dropped if they already fail the price, 20-day volume or RSI filter.
+    Stored tickers and tickers without a usable snapshot pass through.
+    Returns (survivors in input order, phase-one counts).
+    """
+    tickers = list(dict.fromkeys(tickers))
+    warm    = price_store.covered(tickers, period)
+    cold    = [t for t in tickers if t not in warm]
+    snaps   = price_store.download_bars(cold, period=SNAPSHOT_PERIOD) if cold else {}
+    try:
+        feats = compute_features(snaps, params)
+    except Exception:
+        feats = pd.DataFrame()
+
+    rejected = set()
+    if not feats.empty:
+        long_ = feats['n_bars'] >= SNAPSHOT_BARS
+        bad   = ((feats['price'] < params.get('min_price', 15)) |
+                 (feats['avg_vol'] < params.get('min_volume', 200_000)) |
+                 (long_ & (feats['rsi'] > params.get('rsi_max', 90) + RSI_MARGIN)) |
+                 (long_ & (feats['rsi'] < params.get('rsi_min', 0) - RSI_MARGIN)))
+        rejected = set(feats.index[bad])
+
+    # what the rejected tickers would have cost at full length (young listings have no more)
+    days   = price_store.PERIOD_DAYS
+    scale  = days[period] / days[SNAPSHOT_PERIOD]
+    listed = pd.Timestamp.today().normalize() - pd.Timedelta(days=days[SNAPSHOT_PERIOD] - 7)
+    info = {"snapshot":      len(cold),
+            "snapshot_bars": sum(len(df) for df in snaps.values()),
+            "rejected":      len(rejected),
+            "rejected_full_bars": int(sum(len(snaps[t]) * (scale if snaps[t].index[0] <= listed else 1)
+                                          for t in rejected))}
+    return [t for t in tickers if t not in rejected], info
+
+
+def _download_summary(before: dict, phase1: dict) -> dict:
+    """
+    Requests/bytes this scan downloaded, next to an estimate for a
+    single-phase scan (no snapshots, full history for every ticker).
+    """
+    after = price_store.download_stats()
+    req   = after["requests"] - before["requests"]
+    bars  = after["bars"] - before["bars"]
+    single_bars = bars - phase1.get("snapshot_bars", 0) + phase1.get("rejected_full_bars", 0)
+    return {
+        "prefiltered":     phase1.get("rejected", 0),
+        "requests":        req,
+        "batches":         after["batches"] - before["batches"],
+        "bytes":           bars * price_store.BAR_BYTES,
+        "requests_single": req - phase1.get("snapshot", 0) + phase1.get("rejected", 0),
+        "bytes_single":    int(single_bars * price_store.BAR_BYTES),
+    }
+
+
+def run_scan(tickers: list, params: dict, progress_bar=None, status_text=None,
+             executor: str = "thread", max_workers: int = DEFAULT_WORKERS,
+             ctx=None, two_phase: bool = False, stats: dict = None) -> list:
+    """
+    Scan `tickers` in parallel.
+    Bars for the whole list are bulk-loaded first, the market context
+    (VIX, SPY) is built once and the last-bar indicators and chart patterns
+    are computed for the whole universe in one vectorized pass, so workers
+    only run the per-ticker analysis.
+    With two_phase=True, tickers not yet on disk are screened on a short
+    snapshot before any full history is downloaded. If `stats` is a dict it
+    receives the download summary (requests, estimated bytes).
+    Returns passing results sorted by score (desc), then ticker.
+    """
+    before = price_store.download_stats()
+    phase1 = {}
+    if two_phase:
+        if status_text:
+            status_text.caption(f"Pre-screening {len(tickers)} stocks on a {SNAPSHOT_PERIOD} snapshot…")
+        tickers, phase1 = snapshot_prefilter(tickers, params, SCAN_PERIOD)
+
+    ticker_meta.refresh_async(tickers)
+    if status_text:
+        status_text.caption(f"Downloading price history for {len(tickers)} stocks…")
+    frames = prefetch_ohlcv(tickers, period=SCAN_PERIOD)
+    if ctx is None:
+        ctx = build_scan_context()
+    try:
+        features = feature_rows(compute_features(frames, params))
+    except Exception:
+        features = {}
+    try:
+        for t, pats in batch_patterns(frames).items():
+            if t in features:
+                features[t]['patterns'] = pats
+    except Exception:
+        pass
+    items = [(t, features.get(t), frames.get(t)) for t in tickers]
+
+    found = []
+
+    def on_done(item, res, done, total):
+        ticker = item[0]
+        if res and res.get('passes_filter'):
+            found.append(res)
+        if progress_bar:
+            progress_bar.progress(done / total)
+        if status_text:
+            status_text.caption(f"Scanning {ticker}… ({done}/{total}) — found: {len(found)}")
+
+    run_parallel(_scan_one, items, params, ctx, executor=executor,
+                 max_workers=max_workers, on_done=on_done)
+
+    # names the background refresh stored while the scan ran; the rest keep
+    # their symbol until it reaches them (no blocking .info call here)
+    for r in found:
+        if r.get('name') == r['ticker']:
+            r['name'] = ticker_meta.get(r['ticker']).get('name') or r['name']
+    ticker_meta.flush()                 # metadata fetched during the scan, written once
+
+    found.sort(key=lambda x: (-x.get('score', 0), x.get('ticker', '')))
+    if stats is not None:
+        stats.update(_download_summary(before, phase1))
+    return found
@@ -1,8 +1,15 @@
 import yfinance as yf
 import pandas as pd
 import numpy as np
+from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 
+import price_store
+import chart_patterns
+import ticker_meta
+from levels import cluster_levels, risk_reward
+from indicator_panel import _round
+
 
 # ──────────────────────────────────────────────────────────────
 #  VIX REGIME — PRIORITY TICKERS
@@ -45,6 +52,9 @@ VIX_REGIMES = {
 }
 
 
+REGIME_TICKERS = {k: frozenset(v["tickers"]) for k, v in VIX_REGIMES.items()}
+
+
 def get_vix_regime(vix: float) -> str:
     if vix <= 0:   return "low"
     if vix < 20:   return "low"
@@ -58,37 +68,109 @@ def get_priority_tickers(vix: float) -> list:
 
 
 
+_OHLCV_CACHE = {}   # (date, period) -> {ticker: DataFrame}, filled by prefetch_ohlcv
+
+
 def _get_ohlcv(ticker: str, period: str = "1y") -> pd.DataFrame:
+    now_key = datetime.today().strftime('%Y-%m-%d')
+    batch   = _OHLCV_CACHE.get((now_key, period))
+    if batch is not None and ticker in batch:
+        return batch[ticker]
     try:
-        t  = yf.Ticker(ticker)
-        df = t.history(period=period, interval="1d", auto_adjust=True, actions=False)
-        if df is None or df.empty or 'Close' not in df.columns:
-            return pd.DataFrame()
-        cols = [c for c in ['Open','High','Low','Close','Volume'] if c in df.columns]
-        return df[cols].dropna(subset=['Close']).copy()
+        return price_store.load(ticker, period)
     except Exception:
         return pd.DataFrame()
 
 
+def prefetch_ohlcv(tickers: list, period: str = "2y") -> dict:
+    """
+    Load bars for many tickers in one pass through the price store (chunked
+    yf.download calls, one request per symbol, for whatever is missing on
+    disk) and keep them in memory for _get_ohlcv for the rest of the day.
+    Returns {ticker: DataFrame}.
+    """
+    global _OHLCV_CACHE
+    now_key = datetime.today().strftime('%Y-%m-%d')
+    frames  = dict(_OHLCV_CACHE.get((now_key, period), {}))
+    todo    = [t for t in dict.fromkeys(tickers) if t not in frames]
+    if todo:
+        try:
+            frames.update(price_store.load_many(todo, period))
+        except Exception:
+            pass
+
+    _OHLCV_CACHE = {k: v for k, v in _OHLCV_CACHE.items() if k[0] == now_key}
+    _OHLCV_CACHE[(now_key, period)] = frames
+    return frames
+
+
+# ──────────────────────────────────────────────────────────────
+#  FEATURE FRAME
+# ──────────────────────────────────────────────────────────────
+class FeatureFrame:
+    """
+    One ticker's bars plus the rolling/EWM series derived from them.
+    Each series is computed once per (kind, column, parameters) and shared
+    by every helper that needs it.
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        self.df     = df
+        self.close  = df['Close']
+        self.volume = df['Volume'] if 'Volume' in df.columns else pd.Series(dtype=float)
+        self._memo  = {}
+
+    def _get(self, key, fn):
+        if key not in self._memo:
+            self._memo[key] = fn()
+        return self._memo[key]
+
+    def col(self, col: str) -> pd.Series:
+        return self.close if col == 'Close' else self.volume if col == 'Volume' else self.df[col]
+
+    def sma(self, col: str, window: int) -> pd.Series:
+        return self._get(("sma", col, window), lambda: self.col(col).rolling(window).mean())
+
+    def std(self, col: str, window: int) -> pd.Series:
+        return self._get(("std", col, window), lambda: self.col(col).rolling(window).std())
+
+    def rolling_max(self, col: str, window: int) -> pd.Series:
+        return self._get(("max", col, window), lambda: self.col(col).rolling(window).max())
+
+    def ema(self, span: int) -> pd.Series:
+        return self._get(("ema", span), lambda: self.close.ewm(span=span, adjust=False).mean())
+
+    def rsi(self, period: int = 14) -> pd.Series:
+        def calc():
+            delta    = self.close.diff()
+            avg_gain = delta.clip(lower=0).ewm(com=period-1, min_periods=period).mean()
+            avg_loss = (-delta.clip(upper=0)).ewm(com=period-1, min_periods=period).mean()
+            rs = avg_gain / avg_loss
+            return 100 - (100 / (1 + rs))
+        return self._get(("rsi", period), calc)
+
+    def returns(self) -> pd.Series:
+        return self._get(("returns",), lambda: self.close.pct_change().dropna())
+
+    def last(self, series: pd.Series) -> float:
+        return float(series.iloc[-1])
+
+
 # ──────────────────────────────────────────────────────────────
 #  INDICATORS
 # ──────────────────────────────────────────────────────────────
-def _rsi(close: pd.Series, period: int = 14) -> float:
-    if len(close) < period * 2:
+def _rsi(ff: FeatureFrame, period: int = 14) -> float:
+    if len(ff.close) < period * 2:
         return 50.0
-    delta    = close.diff()
-    avg_gain = delta.clip(lower=0).ewm(com=period-1, min_periods=period).mean()
-    avg_loss = (-delta.clip(upper=0)).ewm(com=period-1, min_periods=period).mean()
-    rs  = avg_gain / avg_loss
-    rsi = 100 - (100 / (1 + rs))
-    val = float(rsi.iloc[-1])
+    val = ff.last(ff.rsi(period))
     return round(val, 1) if not np.isnan(val) else 50.0
 
 
-def _bb(close: pd.Series, period: int = 20, std_dev: float = 2.0):
+def _bb(ff: FeatureFrame, period: int = 20, std_dev: float = 2.0):
+    close = ff.close
     if len(close) < period + 2:
         return 0.5, None, None
-    mid, sigma = close.rolling(period).mean(), close.rolling(period).std()
+    mid, sigma = ff.sma('Close', period), ff.std('Close', period)
     upper, lower = mid + std_dev * sigma, mid - std_dev * sigma
     pct = (close - lower) / (upper - lower)
     val = float(pct.iloc[-1])
@@ -98,12 +180,10 @@ def _bb(close: pd.Series, period: int = 20, std_dev: float = 2.0):
             round(l,2)   if not np.isnan(l)   else None)
 
 
-def _macd(close: pd.Series, fast=12, slow=26, signal=9):
-    if len(close) < slow + signal + 5:
+def _macd(ff: FeatureFrame, fast=12, slow=26, signal=9):
+    if len(ff.close) < slow + signal + 5:
         return 0.0, 0.0, 0.0
-    ema_fast   = close.ewm(span=fast, adjust=False).mean()
-    ema_slow   = close.ewm(span=slow, adjust=False).mean()
-    macd_line  = ema_fast - ema_slow
+    macd_line  = ff.ema(fast) - ff.ema(slow)
     signal_line= macd_line.ewm(span=signal, adjust=False).mean()
     hist       = macd_line - signal_line
     return (round(float(macd_line.iloc[-1]),4),
@@ -119,18 +199,46 @@ def _trend_pct(close: pd.Series, days: int = 20) -> float:
     return round((end-start)/start*100, 2) if start > 0 else 0.0
 
 
-def _uptrend_52w(close: pd.Series) -> bool:
+def _scalar_features(ff: FeatureFrame, params: dict) -> dict:
+    """
+    Last-bar indicators for one ticker — the per-ticker counterpart of
+    indicator_panel.compute_features(), same keys and values.
+    """
+    close, volume = ff.close, ff.volume
+    bb_pct, bb_upper, bb_lower = _bb(ff, params.get('bb_period',20), params.get('bb_std',2.0))
+    macd_line, macd_signal, macd_hist = _macd(ff)
+    f = {
+        "price":       round(float(close.iloc[-1]), 2),
+        "n_bars":      len(close),
+        "rsi":         _rsi(ff, params.get('rsi_period', 14)),
+        "bb_pct":      bb_pct,
+        "bb_upper":    bb_upper,
+        "bb_lower":    bb_lower,
+        "macd_line":   macd_line,
+        "macd_signal": macd_signal,
+        "macd_hist":   macd_hist,
+        "trend_4w":    _trend_pct(close, 20),
+        "avg_vol":     ff.last(ff.sma('Volume', 20)) if not volume.empty else 0,
+        "avg_vol_50":  ff.last(ff.sma('Volume', 50)) if not volume.empty else 0,
+    }
+    for w in (20, 50, 200):
+        f[f"ma{w}"] = round(ff.last(ff.sma('Close', w)), 2) if len(close) >= w else None
+    return f
+
+
+def _uptrend_52w(ff: FeatureFrame) -> bool:
     """
     Murphy: true uptrend = price is higher now than 52 weeks ago
     AND the 50-day MA is above the 200-day MA (golden cross zone)
     AND price is above the 200-day MA.
     """
+    close = ff.close
     if len(close) < 200:
         return False
     price   = float(close.iloc[-1])
     price_52w_ago = float(close.iloc[0])   # ~252 trading days, use first available
-    ma50    = float(close.rolling(50).mean().iloc[-1])
-    ma200   = float(close.rolling(200).mean().iloc[-1])
+    ma50    = ff.last(ff.sma('Close', 50))
+    ma200   = ff.last(ff.sma('Close', 200))
     return (price > price_52w_ago and   # higher than a year ago
             price > ma200 and            # above long-term trend
             ma50 > ma200)                # golden cross
@@ -155,14 +263,15 @@ def _relative_strength(close: pd.Series, spy_close: pd.Series) -> float:
         return 1.0
 
 
-def _beta(close: pd.Series, spy_close: pd.Series) -> float:
+def _beta(ff: FeatureFrame, spy_close: pd.Series) -> float:
     try:
-        common = close.pct_change().dropna().index.intersection(
-                 spy_close.pct_change().dropna().index)
+        stock_ret = ff.returns()
+        spy_ret   = spy_close.pct_change().dropna()
+        common = stock_ret.index.intersection(spy_ret.index)
         if len(common) < 30:
             return 1.0
-        s   = close.pct_change().dropna().loc[common].values.astype(float)
-        m   = spy_close.pct_change().dropna().loc[common].values.astype(float)
+        s   = stock_ret.loc[common].values.astype(float)
+        m   = spy_ret.loc[common].values.astype(float)
         cov = np.cov(s, m)[0][1]
         var = np.var(m)
         return round(float(cov/var), 2) if var > 0 else 1.0
@@ -170,41 +279,32 @@ def _beta(close: pd.Series, spy_close: pd.Series) -> float:
         return 1.0
 
 
+def _local_extrema(series: pd.Series, window: int, kind: str = "max") -> np.ndarray:
+    """
+    Values of `series` that are the max (or min) of the centered
+    2*window+1 bar neighbourhood around them. The first and last `window`
+    bars never qualify (their neighbourhood is incomplete).
+    """
+    roll = series.rolling(2 * window + 1, center=True, min_periods=1)
+    ext  = roll.max() if kind == "max" else roll.min()
+    vals = series.to_numpy(dtype=float)
+    hit  = vals == ext.to_numpy(dtype=float)
+    hit[:window] = False
+    hit[max(len(vals) - window, 0):] = False
+    return vals[hit]
+
+
 def _support_resistance(df: pd.DataFrame, window: int = 10, n: int = 3):
     """
     Find key static support/resistance levels.
     Returns (support, resistance, near_support).
     """
     try:
-        close  = df['Close']
-        high   = df['High']
-        low    = df['Low']
-        price  = float(close.iloc[-1])
-
-        # Local highs and lows
-        local_highs = []
-        local_lows  = []
-        for i in range(window, len(close)-window):
-            if high.iloc[i] == high.iloc[i-window:i+window+1].max():
-                local_highs.append(float(high.iloc[i]))
-            if low.iloc[i] == low.iloc[i-window:i+window+1].min():
-                local_lows.append(float(low.iloc[i]))
-
-        # Cluster nearby levels (within 2%)
-        def cluster(levels, pct=0.02):
-            if not levels:
-                return []
-            levels = sorted(levels)
-            clusters = [[levels[0]]]
-            for lvl in levels[1:]:
-                if abs(lvl - clusters[-1][-1]) / clusters[-1][-1] < pct:
-                    clusters[-1].append(lvl)
-                else:
-                    clusters.append([lvl])
-            return [round(np.mean(c), 2) for c in clusters if len(c) >= 2]
+        price  = float(df['Close'].iloc[-1])
 
-        supports    = cluster(local_lows)
-        resistances = cluster(local_highs)
+        # Local highs and lows, clustered within 2%
+        supports    = cluster_levels(_local_extrema(df['Low'],  window, "min"))
+        resistances = cluster_levels(_local_extrema(df['High'], window, "max"))
 
         # Nearest support below price
         sup  = max([s for s in supports    if s < price], default=None)
@@ -240,7 +340,7 @@ def _fibonacci_levels(close: pd.Series) -> dict:
         return {}
 
 
-def _volume_analysis(df: pd.DataFrame, close: pd.Series) -> dict:
+def _volume_analysis(ff: FeatureFrame) -> dict:
     """
     Full Murphy volume analysis:
     1. Volume spike vs 20-day average (institutional buying signal)
@@ -250,17 +350,18 @@ def _volume_analysis(df: pd.DataFrame, close: pd.Series) -> dict:
     Returns detailed dict
     """
     try:
+        df, close = ff.df, ff.close
         if 'Volume' not in df.columns:
             return {"ratio": 1.0, "spike": False, "breakout_confirmed": False,
                     "trend": "neutral", "divergence": False, "vol_ratio_20": 1.0}
 
-        volume = df['Volume']
+        volume = ff.volume
         n      = len(close)
         price  = float(close.iloc[-1])
 
         # ── 1. Volume ratio vs 20-day avg ─────────────────────────
-        avg_20 = float(volume.rolling(20).mean().iloc[-1])
-        avg_50 = float(volume.rolling(50).mean().iloc[-1]) if n >= 50 else avg_20
+        avg_20 = ff.last(ff.sma('Volume', 20))
+        avg_50 = ff.last(ff.sma('Volume', 50)) if n >= 50 else avg_20
         today  = float(volume.iloc[-1])
         ratio_20 = round(today / avg_20, 2) if avg_20 > 0 else 1.0
         ratio_50 = round(today / avg_50, 2) if avg_50 > 0 else 1.0
@@ -357,178 +458,7 @@ def _chart_patterns(df: pd.DataFrame) -> list:
     BEARISH: Double Top (M), H&S Top, Descending Triangle, Rising Wedge
     Returns list of {"name": str, "type": "bullish"|"bearish", "strength": float}
     """
-    patterns = []
-    try:
-        close = df['Close']
-        low   = df['Low']
-        high  = df['High']
-        vol   = df['Volume'] if 'Volume' in df.columns else pd.Series(dtype=float)
-        n     = len(close)
-        if n < 50:
-            return patterns
-        price = float(close.iloc[-1])
-
-        # ────────────────────────────────────────────────
-        # BULLISH PATTERNS
-        # ────────────────────────────────────────────────
-
-        # 1. Double Bottom (W) — two similar lows, bounce in between, right side breaks neckline
-        if n >= 60:
-            seg = close.iloc[-60:]
-            half = len(seg) // 2
-            low1 = float(seg.iloc[:half].min())
-            low2 = float(seg.iloc[half:].min())
-            neckline = float(seg.iloc[half//2:half+half//2].max())
-            low_diff = abs(low1 - low2) / ((low1 + low2) / 2)
-            if (low_diff < 0.04 and
-                neckline > max(low1, low2) * 1.02 and
-                price >= neckline * 0.98):
-                strength = 1.0 - low_diff * 5
-                patterns.append({"name": "Double Bottom (W)", "type": "bullish", "strength": round(strength, 2)})
-
-        # 2. Inverse Head & Shoulders (bullish reversal)
-        if n >= 80:
-            seg = close.iloc[-80:]
-            q = len(seg) // 4
-            ls = float(seg.iloc[:q].min())          # left shoulder
-            hd = float(seg.iloc[q:2*q].min())       # head (deepest)
-            rs = float(seg.iloc[2*q:3*q].min())     # right shoulder
-            neckline = float(seg.iloc[q//2:q + q//2].max())
-            if (hd < ls and hd < rs and             # head is lowest
-                abs(ls - rs) / ((ls + rs) / 2) < 0.06 and  # shoulders similar
-                price >= neckline * 0.97):          # price near/above neckline
-                patterns.append({"name": "Inv. Head & Shoulders", "type": "bullish", "strength": 0.9})
-
-        # 3. Ascending Triangle — flat resistance, rising lows
-        if n >= 40:
-            h40 = high.iloc[-40:]
-            l40 = low.iloc[-40:]
-            res_range = (h40.max() - h40.min()) / h40.mean()
-            x = np.arange(len(l40))
-            slope = np.polyfit(x, l40.values, 1)[0]
-            if res_range < 0.04 and slope > 0:
-                patterns.append({"name": "Ascending Triangle", "type": "bullish", "strength": 0.8})
-
-        # 4. Cup & Handle — rounded bottom then small consolidation
-        if n >= 90:
-            cup = close.iloc[-90:-15]
-            handle = close.iloc[-15:]
-            cup_low = float(cup.min())
-            cup_high_l = float(cup.iloc[:15].mean())
-            cup_high_r = float(cup.iloc[-15:].mean())
-            handle_range = (handle.max() - handle.min()) / handle.mean()
-            if (cup_high_l > cup_low * 1.05 and     # meaningful dip
-                cup_high_r > cup_low * 1.05 and     # recovered
-                abs(cup_high_l - cup_high_r) / cup_high_l < 0.05 and  # symmetric
-                handle_range < 0.06 and             # tight handle
-                price > float(cup.iloc[-1]) * 0.98):
-                patterns.append({"name": "Cup & Handle", "type": "bullish", "strength": 0.85})
-
-        # 5. Falling Wedge (bullish) — lower highs AND lower lows but narrowing
-        if n >= 40:
-            h40 = high.iloc[-40:]
-            l40 = low.iloc[-40:]
-            x = np.arange(40)
-            slope_h = np.polyfit(x, h40.values, 1)[0]
-            slope_l = np.polyfit(x, l40.values, 1)[0]
-            if slope_h < 0 and slope_l < 0 and slope_l > slope_h:  # both down, lows falling less
-                wedge_width_start = float(h40.iloc[0] - l40.iloc[0])
-                wedge_width_end   = float(h40.iloc[-1] - l40.iloc[-1])
-                if wedge_width_end < wedge_width_start * 0.6:  # narrowing by 40%+
-                    patterns.append({"name": "Falling Wedge", "type": "bullish", "strength": 0.75})
-
-        # 6. Bull Flag — strong up move then tight sideways/down consolidation
-        if n >= 30:
-            pole = close.iloc[-30:-10]
-            flag = close.iloc[-10:]
-            pole_gain = (float(pole.iloc[-1]) - float(pole.iloc[0])) / float(pole.iloc[0]) * 100
-            flag_range = (flag.max() - flag.min()) / flag.mean() * 100
-            flag_slope = np.polyfit(np.arange(10), flag.values, 1)[0]
-            if pole_gain > 8 and flag_range < 5 and flag_slope <= 0:
-                patterns.append({"name": "Bull Flag", "type": "bullish", "strength": 0.8})
-
-        # ────────────────────────────────────────────────
-        # BEARISH PATTERNS
-        # ────────────────────────────────────────────────
-
-        # 7. Double Top (M) — two similar highs with a dip, warns of reversal
-        if n >= 60:
-            seg = close.iloc[-60:]
-            half = len(seg) // 2
-            hi1 = float(seg.iloc[:half].max())
-            hi2 = float(seg.iloc[half:].max())
-            mid_low = float(seg.iloc[half//2:half+half//2].min())
-            hi_diff = abs(hi1 - hi2) / ((hi1 + hi2) / 2)
-            if (hi_diff < 0.03 and
-                mid_low < min(hi1, hi2) * 0.97 and
-                price <= mid_low * 1.02):
-                patterns.append({"name": "Double Top (M) ⚠️", "type": "bearish", "strength": 0.85})
-
-        # 8. Head & Shoulders Top (bearish)
-        if n >= 80:
-            seg = close.iloc[-80:]
-            q = len(seg) // 4
-            ls = float(seg.iloc[:q].max())
-            hd = float(seg.iloc[q:2*q].max())
-            rs = float(seg.iloc[2*q:3*q].max())
-            neckline = float(seg.iloc[q//2:q + q//2].min())
-            if (hd > ls and hd > rs and
-                abs(ls - rs) / ((ls + rs) / 2) < 0.06 and
-                price <= neckline * 1.02):
-                patterns.append({"name": "H&S Top ⚠️", "type": "bearish", "strength": 0.9})
-
-        # 9. Descending Triangle — flat support, falling highs = bearish
-        if n >= 40:
-            h40 = high.iloc[-40:]
-            l40 = low.iloc[-40:]
-            sup_range = (l40.max() - l40.min()) / l40.mean()
-            x = np.arange(40)
-            slope_h = np.polyfit(x, h40.values, 1)[0]
-            if sup_range < 0.04 and slope_h < 0:
-                patterns.append({"name": "Descending Triangle ⚠️", "type": "bearish", "strength": 0.75})
-
-        # 10. Rising Wedge (bearish) — both highs and lows rising but narrowing
-        if n >= 40:
-            h40 = high.iloc[-40:]
-            l40 = low.iloc[-40:]
-            x = np.arange(40)
-            slope_h = np.polyfit(x, h40.values, 1)[0]
-            slope_l = np.polyfit(x, l40.values, 1)[0]
-            if slope_h > 0 and slope_l > 0 and slope_h < slope_l:  # both up, highs rising less
-                wedge_width_start = float(h40.iloc[0] - l40.iloc[0])
-                wedge_width_end   = float(h40.iloc[-1] - l40.iloc[-1])
-                if wedge_width_end < wedge_width_start * 0.6:
-                    patterns.append({"name": "Rising Wedge ⚠️", "type": "bearish", "strength": 0.7})
-
-    except Exception:
-        pass
-    return patterns
-
-
-
-def _risk_reward(price: float, support: float, resistance: float,
-                 stop_pct: float = 0.05) -> dict:
-    """
-    Calculate Risk/Reward ratio.
-    Stop loss = support or price * (1 - stop_pct).
-    Target    = resistance.
-    Murphy rule: need at least 1:3 ratio.
-    """
-    try:
-        stop_loss = support if support else price * (1 - stop_pct)
-        if resistance is None or resistance <= price:
-            return {"ratio": 0, "valid": False, "stop": round(stop_loss,2), "target": None}
-        risk    = price - stop_loss
-        reward  = resistance - price
-        ratio   = round(reward / risk, 2) if risk > 0 else 0
-        return {
-            "ratio":  ratio,
-            "valid":  ratio >= 1.5,          # lowered from 3 for more opportunities
-            "stop":   round(stop_loss, 2),
-            "target": round(resistance, 2),
-        }
-    except Exception:
-        return {"ratio": 0, "valid": False, "stop": None, "target": None}
+    return chart_patterns.frame_patterns(df)
 
 
 def _generate_summary(ticker, price, rsi, macd_bullish, trend_4w, above_200,
@@ -577,7 +507,7 @@ def _generate_summary(ticker, price, rsi, macd_bullish, trend_4w, above_200,
 # ──────────────────────────────────────────────────────────────
 #  DEBUG
 # ──────────────────────────────────────────────────────────────
-def _quality_filters(close: pd.Series, ma50: float) -> dict:
+def _quality_filters(ff: FeatureFrame, ma50: float) -> dict:
     """
     Advanced quality filters to avoid traps:
     1. MA50 distance — reject if price drifted too far above MA50
@@ -589,6 +519,7 @@ def _quality_filters(close: pd.Series, ma50: float) -> dict:
     passes  = True
 
     try:
+        close = ff.close
         price = float(close.iloc[-1])
         n = len(close)
 
@@ -622,7 +553,7 @@ def _quality_filters(close: pd.Series, ma50: float) -> dict:
 
         # ── 4. Consecutive lower highs (downtrend structure) ──────────
         if n >= 40:
-            highs = close.rolling(5).max().iloc[-40:]
+            highs = ff.rolling_max('Close', 5).iloc[-40:]
             # Count how many of last 6 5-day highs are lower than the previous
             h_vals = highs.iloc[::6].values
             lower_highs = sum(1 for i in range(1, len(h_vals)) if h_vals[i] < h_vals[i-1])
@@ -636,38 +567,6 @@ def _quality_filters(close: pd.Series, ma50: float) -> dict:
     return {"passes": passes, "reasons": reasons}
 
 
-
-    try:
-        df = _get_ohlcv(ticker, period="2y")
-        if df.empty or len(df) < 50:
-            return f"{ticker}: ❌ No data ({len(df)} rows)"
-        close = df['Close']
-        price = round(float(close.iloc[-1]), 2)
-        if price < params.get('min_price', 15):
-            return f"{ticker}: ❌ Price ${price} < min"
-        avg_vol = float(df['Volume'].rolling(20).mean().iloc[-1])
-        if avg_vol < params.get('min_volume', 200_000):
-            return f"{ticker}: ❌ Volume {avg_vol:,.0f} too low"
-        ma50  = float(close.rolling(50).mean().iloc[-1])  if len(close)>=50  else None
-        ma200 = float(close.rolling(200).mean().iloc[-1]) if len(close)>=200 else None
-        if params.get('require_above_200') and (not ma200 or price < ma200):
-            return f"{ticker}: ❌ Below MA200 (${price} vs ${round(ma200,2) if ma200 else 'N/A'})"
-        if params.get('require_above_50') and (not ma50 or price < ma50*0.97):
-            return f"{ticker}: ❌ Below MA50"
-        rsi = _rsi(close, params.get('rsi_period',14))
-        rsi_min, rsi_max = params.get('rsi_min',0), params.get('rsi_max',90)
-        if rsi > rsi_max or rsi < rsi_min:
-            return f"{ticker}: ❌ RSI={rsi} not in [{rsi_min}–{rsi_max}]"
-        uptrend = _uptrend_52w(close)
-        if params.get('require_uptrend_52w') and not uptrend:
-            return f"{ticker}: ❌ Not in 52-week uptrend"
-        trend = _trend_pct(close, 20)
-        return (f"{ticker}: ✅ PASSES — Price=${price}, RSI={rsi}, "
-                f"52W-Uptrend={'✓' if uptrend else '✗'}, Trend4W={trend}%")
-    except Exception as e:
-        return f"{ticker}: ❌ Exception: {e}"
-
-
 # ──────────────────────────────────────────────────────────────
 #  MAIN SCREENER
 # ──────────────────────────────────────────────────────────────
@@ -687,38 +586,74 @@ def _get_spy() -> pd.Series:
     return s
 
 
+def _get_vix() -> float:
+    """Latest ^VIX close, 0.0 if unavailable."""
+    try:
+        vix_hist = yf.Ticker("^VIX").history(period="2d", interval="1d", actions=False)
+        if not vix_hist.empty:
+            return float(vix_hist['Close'].iloc[-1])
+    except Exception:
+        pass
+    return 0.0
+
+
+@dataclass(frozen=True)
+class ScanContext:
+    """Market state computed once per scan and shared by every ticker evaluation."""
+    vix:              float
+    vix_regime:       str
+    priority_tickers: frozenset = field(repr=False)
+    spy_close:        pd.Series = field(repr=False)
+    scan_date:        str
+
+
+def build_scan_context() -> ScanContext:
+    """Fetch VIX and SPY once and resolve the VIX regime for this scan."""
+    vix    = _get_vix()
+    regime = get_vix_regime(vix)
+    return ScanContext(
+        vix              = vix,
+        vix_regime       = regime,
+        # no VIX reading → no priority bonus for anyone
+        priority_tickers = REGIME_TICKERS[regime] if vix > 0 else frozenset(),
+        spy_close        = _get_spy(),
+        scan_date        = datetime.today().strftime('%Y-%m-%d'),
+    )
+
+
 def debug_ticker(ticker: str, params: dict) -> str:
     """Explains exactly why a ticker passed or failed all filters."""
     try:
         df = _get_ohlcv(ticker, period="2y")
         if df.empty or len(df) < 50:
             return f"{ticker}: ❌ No data ({len(df)} rows)"
-        close = df['Close']
+        ff    = FeatureFrame(df)
+        close = ff.close
         price = round(float(close.iloc[-1]), 2)
         if price < params.get('min_price', 15):
             return f"{ticker}: ❌ Price ${price} < min ${params.get('min_price')}"
-        avg_vol = float(df['Volume'].rolling(20).mean().iloc[-1]) if 'Volume' in df.columns else 0
+        avg_vol = ff.last(ff.sma('Volume', 20)) if 'Volume' in df.columns else 0
         if avg_vol < params.get('min_volume', 200_000):
             return f"{ticker}: ❌ Volume {avg_vol:,.0f} too low"
-        ma50  = float(close.rolling(50).mean().iloc[-1])  if len(close) >= 50  else None
-        ma200 = float(close.rolling(200).mean().iloc[-1]) if len(close) >= 200 else None
+        ma50  = ff.last(ff.sma('Close', 50))  if len(close) >= 50  else None
+        ma200 = ff.last(ff.sma('Close', 200)) if len(close) >= 200 else None
         if params.get('require_above_200') and (not ma200 or price < ma200):
             return f"{ticker}: ❌ Below MA200 (${price} vs ${round(ma200,2) if ma200 else 'N/A'})"
         if params.get('require_above_50') and (not ma50 or price < ma50*0.97):
             return f"{ticker}: ❌ Below MA50 (${price} vs ${round(ma50,2) if ma50 else 'N/A'})"
-        rsi = _rsi(close, params.get('rsi_period', 14))
+        rsi = _rsi(ff, params.get('rsi_period', 14))
         rsi_min, rsi_max = params.get('rsi_min', 0), params.get('rsi_max', 90)
         if rsi > rsi_max or rsi < rsi_min:
             return f"{ticker}: ❌ RSI={rsi} not in [{rsi_min}–{rsi_max}]"
-        uptrend = _uptrend_52w(close)
+        uptrend = _uptrend_52w(ff)
         if params.get('require_uptrend_52w') and not uptrend:
             return f"{ticker}: ❌ Not in 52-week uptrend"
-        qf = _quality_filters(close, ma50)
+        qf = _quality_filters(ff, ma50)
         if not qf["passes"] and params.get('apply_quality_filter', True):
             return f"{ticker}: ❌ Quality filter: {' | '.join(qf['reasons'])}"
         trend = _trend_pct(close, 20)
         vix_regime = get_vix_regime(0)
-        is_priority = ticker in VIX_REGIMES[vix_regime]["tickers"]
+        is_priority = ticker in REGIME_TICKERS[vix_regime]
         return (f"{ticker}: ✅ PASSES — Price=${price}, RSI={rsi}, "
                 f"52W={'✓' if uptrend else '✗'}, Trend4W={trend}%, "
                 f"VIX-Priority={'⭐' if is_priority else '—'}")
@@ -726,29 +661,114 @@ def debug_ticker(ticker: str, params: dict) -> str:
         return f"{ticker}: ❌ Exception: {e}"
 
 
-def calculate_indicators(ticker: str, params: dict):
+# ── Filters and score (shared with replay) ────────────────────
+def _pts(conds: list, pts: list, default: float = 0.0):
+    """Points for the first true condition (per element on arrays)."""
+    return np.select(conds, pts, default)
+
+
+def passes_filters(params: dict, **sig):
+    """
+    The screener's filter cascade over whichever signals are given, as
+    scalars (one ticker today) or arrays (replay, every day): price,
+    avg_vol, above_200, above_50, near_50, above_20, rsi, uptrend,
+    trend_4w, beta, quality_ok. True where every gate that applies passes.
+    """
+    ok = np.True_
+    with np.errstate(invalid='ignore'):
+        if 'price' in sig:
+            ok = ok & (sig['price'] >= params.get('min_price', 15))
+        if 'avg_vol' in sig:
+            ok = ok & (sig['avg_vol'] >= params.get('min_volume', 200_000))
+        if params.get('require_above_200') and 'above_200' in sig:
+            ok = ok & sig['above_200']
+        if params.get('require_above_50') and 'above_50' in sig:
+            ok = ok & (sig['above_50'] | sig['near_50'])
+        if params.get('require_above_20') and 'above_20' in sig:
+            ok = ok & sig['above_20']
+        if 'rsi' in sig:
+            ok = ok & (sig['rsi'] <= params.get('rsi_max', 90)) & (sig['rsi'] >= params.get('rsi_min', 0))
+        if params.get('require_uptrend_52w', True) and 'uptrend' in sig:
+            ok = ok & sig['uptrend']
+        if 'trend_4w' in sig:
+            ok = ok & (sig['trend_4w'] >= -15.0)
+        min_beta = params.get('min_beta', 0.5)
+        if min_beta > 0 and 'beta' in sig:
+            ok = ok & (sig['beta'] >= min_beta)
+        if params.get('apply_quality_filter', True) and 'quality_ok' in sig:
+            ok = ok & sig['quality_ok']
+    return ok
+
+
+def murphy_score(sig: dict, inst_pct: float = None):
+    """
+    The 0–10 score from the signals of a ticker that passed the filters,
+    as a float (scalars) or an array (per-day replay). Points are added in
+    one fixed order so both paths round identically.
+    """
+    score = _pts([sig['rsi'] < 20, sig['rsi'] < 25, sig['rsi'] < 30, sig['rsi'] < 35,
+                  sig['rsi'] < 40, sig['rsi'] < 50], [4.0, 3.0, 2.5, 2.0, 1.5, 1.0], 0.5)
+    score = score + _pts([sig['bb_pct'] < 0.05, sig['bb_pct'] < 0.10, sig['bb_pct'] < 0.20,
+                          sig['bb_pct'] < 0.35, sig['bb_pct'] < 0.50], [3.0, 2.5, 2.0, 1.5, 0.5])
+    score = score + _pts([sig['trend_4w'] > 5, sig['trend_4w'] > 0, sig['trend_4w'] > -5],
+                         [1.5, 1.0, 0.3])
+
+    # MA, 52w uptrend (big bonus), MACD
+    for key, pts in (('above_200', 0.5), ('above_50', 0.5), ('above_20', 0.3),
+                     ('uptrend', 1.0), ('macd_bullish', 0.5)):
+        score = score + np.where(sig[key], pts, 0.0)
+
+    # Volume — Murphy: volume must confirm the move; divergence is a warning
+    score = score + _pts([sig['vol_spike'], sig['vol_ratio'] > 1.5], [0.7, 0.3])
+    for cond, pts in ((sig['breakout'], 1.0), (sig['divergence'], -0.5),
+                      (sig['vol_rising'], 0.3), (sig['accum'] >= 3, 0.4)):
+        score = score + np.where(cond, pts, 0.0)
+
+    # Relative strength, support, chart patterns (bullish adds, bearish subtracts)
+    score = score + _pts([sig['rs'] > 1.5, sig['rs'] > 1.0], [1.0, 0.5])
+    score = score + np.where(sig['near_support'], 0.5, 0.0)
+    score = score + np.where(sig['bullish'] > 0, np.minimum(1.0, sig['bullish']), 0.0)
+    score = score - np.where(sig['bearish'] > 0, np.minimum(2.0, sig['bearish']), 0.0)
+
+    # Good R/R, fresh signal, VIX regime priority
+    for key, pts in (('rr_valid', 0.5), ('fresh', 0.5), ('priority', 1.0)):
+        score = score + np.where(sig[key], pts, 0.0)
+
+    # Institutional
+    if inst_pct:
+        if   inst_pct >= 60: score = score + 1.0
+        elif inst_pct >= 40: score = score + 0.7
+        elif inst_pct >= 30: score = score + 0.5
+
+    score = np.minimum(10.0, score)
+    return _round(score, 1) if np.ndim(score) else round(float(score), 1)
+
+
+def calculate_indicators(ticker: str, params: dict, ctx: ScanContext = None,
+                         features: dict = None, df: pd.DataFrame = None):
+    """
+    Full Murphy evaluation of one ticker. `features` is this ticker's row
+    from indicator_panel.compute_features(); without it the last-bar
+    indicators are computed here. `df` is its 2y bars (default: the day's
+    OHLCV cache / price store).
+    """
     try:
-        df = _get_ohlcv(ticker, period="2y")   # 2 years for 52w uptrend check
+        if ctx is None:
+            ctx = build_scan_context()
+        if df is None:
+            df = _get_ohlcv(ticker, period="2y")   # 2 years for 52w uptrend check
         if df.empty or len(df) < 60:
             return None
 
-        close  = df['Close']
-        volume = df['Volume'] if 'Volume' in df.columns else pd.Series(dtype=float)
-        price  = round(float(close.iloc[-1]), 2)
+        ff     = FeatureFrame(df)
+        close  = ff.close
+        f      = features or _scalar_features(ff, params)
+        price  = f['price']
 
         # ── Filters ──────────────────────────────────────────────────
 
-        if price < params.get('min_price', 15):
-            return None
-
-        avg_vol    = float(volume.rolling(20).mean().iloc[-1]) if not volume.empty else 0
-        avg_vol_50 = float(volume.rolling(50).mean().iloc[-1]) if not volume.empty else 0
-        if np.isnan(avg_vol) or avg_vol < params.get('min_volume', 200_000):
-            return None
-
-        ma20  = round(float(close.rolling(20).mean().iloc[-1]),2)  if len(close)>=20  else None
-        ma50  = round(float(close.rolling(50).mean().iloc[-1]),2)  if len(close)>=50  else None
-        ma200 = round(float(close.rolling(200).mean().iloc[-1]),2) if len(close)>=200 else None
+        avg_vol = f['avg_vol'] if f['avg_vol'] is not None else np.nan
+        ma20, ma50, ma200 = f['ma20'], f['ma50'], f['ma200']
 
         def ok(v): return v is not None and not np.isnan(v)
 
@@ -757,46 +777,34 @@ def calculate_indicators(ticker: str, params: dict):
         above_20  = ok(ma20)  and price > ma20
         near_50   = ok(ma50)  and price >= ma50 * 0.97
 
-        if params.get('require_above_200') and not above_200:
-            return None
-        if params.get('require_above_50') and not (above_50 or near_50):
-            return None
-        if params.get('require_above_20') and not above_20:
-            return None
-
         rsi_period  = params.get('rsi_period', 14)
         rsi_max     = params.get('rsi_max', 90)
-        rsi_min     = params.get('rsi_min', 0)
-        current_rsi = _rsi(close, rsi_period)
-        if current_rsi > rsi_max or current_rsi < rsi_min:
+        current_rsi = f['rsi']
+        if not passes_filters(params, price=price, avg_vol=avg_vol, above_200=above_200,
+                              above_50=above_50, near_50=near_50, above_20=above_20,
+                              rsi=current_rsi):
             return None
 
         # 52-week uptrend filter
-        uptrend_52w = _uptrend_52w(close)
-        if params.get('require_uptrend_52w', True) and not uptrend_52w:
-            return None
-
-        trend_4w = _trend_pct(close, 20)
-        if trend_4w < -15.0:
+        uptrend_52w = _uptrend_52w(ff)
+        trend_4w    = f['trend_4w']
+        if not passes_filters(params, uptrend=uptrend_52w, trend_4w=trend_4w):
             return None
 
         # ── Calculated Metrics (no filter) ───────────────────────────
 
-        bb_pct, bb_upper_v, bb_lower_v = _bb(
-            close, params.get('bb_period',20), params.get('bb_std',2.0))
+        bb_pct, bb_upper_v, bb_lower_v = f['bb_pct'], f['bb_upper'], f['bb_lower']
 
-        macd_line, macd_signal, macd_hist = _macd(close)
+        macd_line, macd_signal, macd_hist = f['macd_line'], f['macd_signal'], f['macd_hist']
         macd_bullish = macd_hist > 0
 
-        spy_close = _get_spy()
-        beta = _beta(close, spy_close)
-
-        min_beta = params.get('min_beta', 0.5)
-        if min_beta > 0 and beta < min_beta:
+        spy_close = ctx.spy_close
+        beta = _beta(ff, spy_close)
+        if not passes_filters(params, beta=beta):
             return None
 
         rs  = _relative_strength(close, spy_close)
-        va  = _volume_analysis(df, close)   # full Murphy volume analysis
+        va  = _volume_analysis(ff)   # full Murphy volume analysis
         vol_ratio = va["ratio_20"]
         vol_spike = va["spike"]
         breakout_confirmed = va["breakout_confirmed"]
@@ -807,47 +815,30 @@ def calculate_indicators(ticker: str, params: dict):
 
         support, resistance, near_support = _support_resistance(df)
         fib      = _fibonacci_levels(close)
-        patterns = _chart_patterns(df)
-        rr       = _risk_reward(price, support, resistance)
+        patterns = f['patterns'] if 'patterns' in f else _chart_patterns(df)
+        rr       = risk_reward(price, support, resistance)
 
         # ── Quality trap filter ───────────────────────────────────────
-        qf = _quality_filters(close, ma50)
-        if not qf["passes"] and params.get('apply_quality_filter', True):
+        qf = _quality_filters(ff, ma50)
+        if not passes_filters(params, quality_ok=qf["passes"]):
             return None
 
         # ── VIX regime bonus/tag ──────────────────────────────────────
-        current_vix = 0.0
-        vix_regime  = "low"
-        is_priority = False
-        try:
-            vix_hist = yf.Ticker("^VIX").history(period="2d", interval="1d", actions=False)
-            if not vix_hist.empty:
-                current_vix = float(vix_hist['Close'].iloc[-1])
-                vix_regime  = get_vix_regime(current_vix)
-                is_priority = ticker in VIX_REGIMES[vix_regime]["tickers"]
-        except Exception:
-            pass
+        vix_regime  = ctx.vix_regime
+        is_priority = ticker in ctx.priority_tickers
 
-        # Institutional (only if requested)
+        # Institutional (only if requested) — from the metadata cache
         inst_pct = None
         min_inst = params.get('min_institutional', 0)
         if min_inst > 0:
-            try:
-                info = yf.Ticker(ticker).info
-                raw  = info.get('heldPercentInstitutions')
-                if raw is not None:
-                    inst_pct = round(float(raw)*100, 1)
-                    if inst_pct < min_inst:
-                        return None
-            except Exception:
-                pass
+            inst_pct = ticker_meta.get(ticker, fetch_missing=True).get('inst_pct')
+            if inst_pct is not None and inst_pct < min_inst:
+                return None
 
         # Signal freshness
         signal_is_fresh = True
         try:
-            g = close.diff().clip(lower=0).ewm(com=rsi_period-1, min_periods=rsi_period).mean()
-            l = (-close.diff().clip(upper=0)).ewm(com=rsi_period-1, min_periods=rsi_period).mean()
-            rsi_ser = 100 - (100/(1+g/l))
+            rsi_ser = ff.rsi(rsi_period)
             if len(rsi_ser) > 5:
                 prev = float(rsi_ser.iloc[-5])
                 signal_is_fresh = (not np.isnan(prev)) and prev > rsi_max
@@ -855,86 +846,22 @@ def calculate_indicators(ticker: str, params: dict):
             signal_is_fresh = True
 
         # ── Score ─────────────────────────────────────────────────────
-        score = 0.0
-
-        # RSI
-        if   current_rsi < 20: score += 4.0
-        elif current_rsi < 25: score += 3.0
-        elif current_rsi < 30: score += 2.5
-        elif current_rsi < 35: score += 2.0
-        elif current_rsi < 40: score += 1.5
-        elif current_rsi < 50: score += 1.0
-        else:                  score += 0.5
-
-        # BB
-        if   bb_pct < 0.05: score += 3.0
-        elif bb_pct < 0.10: score += 2.5
-        elif bb_pct < 0.20: score += 2.0
-        elif bb_pct < 0.35: score += 1.5
-        elif bb_pct < 0.50: score += 0.5
-
-        # Trend
-        if   trend_4w >  5: score += 1.5
-        elif trend_4w >  0: score += 1.0
-        elif trend_4w > -5: score += 0.3
-
-        # MA
-        if above_200:   score += 0.5
-        if above_50:    score += 0.5
-        if above_20:    score += 0.3
-        if uptrend_52w: score += 1.0   # big bonus for true 52w uptrend
-
-        # MACD
-        if macd_bullish: score += 0.5
-
-        # Volume scoring — Murphy: volume must confirm the move
-        if vol_spike:         score += 0.7
-        elif vol_ratio > 1.5: score += 0.3
-        if breakout_confirmed: score += 1.0   # confirmed breakout = major bonus
-        if vol_divergence:     score -= 0.5   # divergence = warning, reduce score
-        if vol_trend == "rising": score += 0.3
-        if accum_score >= 3:   score += 0.4   # accumulation pattern
-
-        # Relative strength
-        if   rs > 1.5: score += 1.0
-        elif rs > 1.0: score += 0.5
-
-        # Near support
-        if near_support: score += 0.5
-
-        # Chart patterns
-        # Chart patterns — bullish adds score, bearish subtracts
-        bullish_patterns = [p for p in patterns if isinstance(p, dict) and p.get('type') == 'bullish']
-        bearish_patterns = [p for p in patterns if isinstance(p, dict) and p.get('type') == 'bearish']
-        if bullish_patterns:
-            score += min(1.0, sum(p.get('strength', 0.5) for p in bullish_patterns))
-        if bearish_patterns:
-            score -= min(2.0, sum(p.get('strength', 0.5) for p in bearish_patterns))
-
-        # Good R/R ratio
-        if rr.get('valid'): score += 0.5
-
-        # Fresh signal
-        if signal_is_fresh: score += 0.5
-
-        # VIX regime priority bonus
-        if is_priority:     score += 1.0
-
-        # Institutional
-        if inst_pct:
-            if   inst_pct >= 60: score += 1.0
-            elif inst_pct >= 40: score += 0.7
-            elif inst_pct >= 30: score += 0.5
-
-        score = round(min(10.0, score), 1)
+        strength = lambda kind: sum(p.get('strength', 0.5) for p in patterns
+                                    if isinstance(p, dict) and p.get('type') == kind)
+        score = murphy_score({
+            "rsi": current_rsi, "bb_pct": bb_pct, "trend_4w": trend_4w,
+            "above_200": above_200, "above_50": above_50, "above_20": above_20,
+            "uptrend": uptrend_52w, "macd_bullish": macd_bullish,
+            "vol_spike": vol_spike, "vol_ratio": vol_ratio, "breakout": breakout_confirmed,
+            "divergence": vol_divergence, "vol_rising": vol_trend == "rising",
+            "accum": accum_score, "rs": rs, "near_support": near_support,
+            "bullish": strength('bullish'), "bearish": strength('bearish'),
+            "rr_valid": bool(rr.get('valid')), "fresh": signal_is_fresh,
+            "priority": is_priority,
+        }, inst_pct)
 
         # ── Name ──────────────────────────────────────────────────────
-        name = ticker
-        try:
-            fi   = yf.Ticker(ticker).fast_info
-            name = getattr(fi, 'company_name', None) or ticker
-        except Exception:
-            pass
+        name = ticker_meta.get(ticker).get('name') or ticker
 
         # ── AI Summary ────────────────────────────────────────────────
         summary = _generate_summary(
@@ -984,7 +911,7 @@ def calculate_indicators(ticker: str, params: dict):
             "rr_target":        rr.get("target"),
             "institutional_pct":inst_pct,
             "signal_fresh":     signal_is_fresh,
-            "signal_date":      datetime.today().strftime('%Y-%m-%d'),
+            "signal_date":      ctx.scan_date,
             "vix_regime":       vix_regime,
             "vix_priority":     is_priority,
             "quality_ok":       qf["passes"],
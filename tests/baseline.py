@@ -0,0 +1,625 @@
+"""
+Reference implementations from the baseline tree, kept as test oracles for
+the vectorized rewrites. Copied as they were, except that _backtest_one
+takes its bars and cutoff instead of downloading them, the backtester's
+RSI is renamed _bt_rsi, and _detect_themes_fast takes the playbooks.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+# ── screener ──────────────────────────────────────────────────
+def _rsi(close: pd.Series, period: int = 14) -> float:
+    if len(close) < period * 2:
+        return 50.0
+    delta    = close.diff()
+    avg_gain = delta.clip(lower=0).ewm(com=period-1, min_periods=period).mean()
+    avg_loss = (-delta.clip(upper=0)).ewm(com=period-1, min_periods=period).mean()
+    rs  = avg_gain / avg_loss
+    rsi = 100 - (100 / (1 + rs))
+    val = float(rsi.iloc[-1])
+    return round(val, 1) if not np.isnan(val) else 50.0
+
+
+def _bb(close: pd.Series, period: int = 20, std_dev: float = 2.0):
+    if len(close) < period + 2:
+        return 0.5, None, None
+    mid, sigma = close.rolling(period).mean(), close.rolling(period).std()
+    upper, lower = mid + std_dev * sigma, mid - std_dev * sigma
+    pct = (close - lower) / (upper - lower)
+    val = float(pct.iloc[-1])
+    u, l = float(upper.iloc[-1]), float(lower.iloc[-1])
+    return (round(val,3) if not np.isnan(val) else 0.5,
+            round(u,2)   if not np.isnan(u)   else None,
+            round(l,2)   if not np.isnan(l)   else None)
+
+
+def _macd(close: pd.Series, fast=12, slow=26, signal=9):
+    if len(close) < slow + signal + 5:
+        return 0.0, 0.0, 0.0
+    ema_fast   = close.ewm(span=fast, adjust=False).mean()
+    ema_slow   = close.ewm(span=slow, adjust=False).mean()
+    macd_line  = ema_fast - ema_slow
+    signal_line= macd_line.ewm(span=signal, adjust=False).mean()
+    hist       = macd_line - signal_line
+    return (round(float(macd_line.iloc[-1]),4),
+            round(float(signal_line.iloc[-1]),4),
+            round(float(hist.iloc[-1]),4))
+
+
+def _trend_pct(close: pd.Series, days: int = 20) -> float:
+    if len(close) < days + 2:
+        return 0.0
+    start = float(close.iloc[-days-1])
+    end   = float(close.iloc[-1])
+    return round((end-start)/start*100, 2) if start > 0 else 0.0
+
+
+def _uptrend_52w(close: pd.Series) -> bool:
+    """
+    Murphy: true uptrend = price is higher now than 52 weeks ago
+    AND the 50-day MA is above the 200-day MA (golden cross zone)
+    AND price is above the 200-day MA.
+    """
+    if len(close) < 200:
+        return False
+    price   = float(close.iloc[-1])
+    price_52w_ago = float(close.iloc[0])   # ~252 trading days, use first available
+    ma50    = float(close.rolling(50).mean().iloc[-1])
+    ma200   = float(close.rolling(200).mean().iloc[-1])
+    return (price > price_52w_ago and   # higher than a year ago
+            price > ma200 and            # above long-term trend
+            ma50 > ma200)                # golden cross
+
+
+def _volume_analysis(df: pd.DataFrame, close: pd.Series) -> dict:
+    """
+    Full Murphy volume analysis:
+    1. Volume spike vs 20-day average (institutional buying signal)
+    2. Volume trend — is volume growing or shrinking?
+    3. Breakout confirmation — did a resistance break happen WITH high volume?
+    4. Volume divergence — price up but volume down = weak move warning
+    Returns detailed dict
+    """
+    try:
+        if 'Volume' not in df.columns:
+            return {"ratio": 1.0, "spike": False, "breakout_confirmed": False,
+                    "trend": "neutral", "divergence": False, "vol_ratio_20": 1.0}
+
+        volume = df['Volume']
+        n      = len(close)
+        price  = float(close.iloc[-1])
+
+        # ── 1. Volume ratio vs 20-day avg ─────────────────────────
+        avg_20 = float(volume.rolling(20).mean().iloc[-1])
+        avg_50 = float(volume.rolling(50).mean().iloc[-1]) if n >= 50 else avg_20
+        today  = float(volume.iloc[-1])
+        ratio_20 = round(today / avg_20, 2) if avg_20 > 0 else 1.0
+        ratio_50 = round(today / avg_50, 2) if avg_50 > 0 else 1.0
+        is_spike = ratio_20 >= 1.5   # Murphy: 1.5x avg = meaningful
+
+        # ── 2. Volume trend (is participation growing?) ───────────
+        if n >= 20:
+            recent_avg  = float(volume.iloc[-10:].mean())
+            earlier_avg = float(volume.iloc[-20:-10].mean())
+            if earlier_avg > 0:
+                vol_trend_pct = (recent_avg - earlier_avg) / earlier_avg * 100
+                if vol_trend_pct > 10:
+                    vol_trend = "rising"    # increasing participation
+                elif vol_trend_pct < -10:
+                    vol_trend = "falling"   # declining participation
+                else:
+                    vol_trend = "neutral"
+            else:
+                vol_trend = "neutral"
+        else:
+            vol_trend = "neutral"
+
+        # ── 3. Breakout confirmation ──────────────────────────────
+        # Murphy's rule: price breaks resistance + volume > 1.5x avg = CONFIRMED breakout
+        breakout_confirmed = False
+        breakout_level     = None
+        if n >= 40:
+            # Find recent resistance (highest high in last 20-40 days, excluding last 5)
+            resistance = float(df['High'].iloc[-40:-5].max()) if n >= 45 else None
+            if resistance and price > resistance:
+                # Price broke above resistance — was there volume?
+                breakout_confirmed = ratio_20 >= 1.5
+                breakout_level     = round(resistance, 2)
+
+        # ── 4. Volume divergence (bearish warning) ────────────────
+        # Price making higher highs but volume making lower highs = distribution
+        divergence = False
+        if n >= 20:
+            price_up     = float(close.iloc[-1]) > float(close.iloc[-10])
+            vol_down     = float(volume.iloc[-5:].mean()) < float(volume.iloc[-15:-5].mean()) * 0.8
+            if price_up and vol_down:
+                divergence = True   # weak hands pushing price, institutions not buying
+
+        # ── 5. Accumulation/Distribution (simplified) ────────────
+        # On days price closes UP with above avg volume = accumulation
+        if n >= 20:
+            last20_close  = close.iloc[-20:]
+            last20_vol    = volume.iloc[-20:]
+            avg_vol_20    = last20_vol.mean()
+            accum_days    = sum(1 for i in range(1, len(last20_close))
+                               if last20_close.iloc[i] > last20_close.iloc[i-1]
+                               and last20_vol.iloc[i] > avg_vol_20)
+            distrib_days  = sum(1 for i in range(1, len(last20_close))
+                               if last20_close.iloc[i] < last20_close.iloc[i-1]
+                               and last20_vol.iloc[i] > avg_vol_20)
+            accum_score   = accum_days - distrib_days  # positive = accumulation
+        else:
+            accum_score = 0
+
+        return {
+            "ratio_20":           ratio_20,
+            "ratio_50":           ratio_50,
+            "spike":              is_spike,
+            "vol_trend":          vol_trend,
+            "breakout_confirmed": breakout_confirmed,
+            "breakout_level":     breakout_level,
+            "divergence":         divergence,
+            "accum_score":        accum_score,
+            "avg_20":             round(avg_20, 0),
+            "today_vol":          round(today, 0),
+        }
+    except Exception:
+        return {"ratio_20": 1.0, "spike": False, "breakout_confirmed": False,
+                "vol_trend": "neutral", "divergence": False, "accum_score": 0}
+
+
+def _support_resistance(df: pd.DataFrame, window: int = 10, n: int = 3):
+    """
+    Find key static support/resistance levels.
+    Returns (support, resistance, near_support).
+    """
+    try:
+        close  = df['Close']
+        high   = df['High']
+        low    = df['Low']
+        price  = float(close.iloc[-1])
+
+        # Local highs and lows
+        local_highs = []
+        local_lows  = []
+        for i in range(window, len(close)-window):
+            if high.iloc[i] == high.iloc[i-window:i+window+1].max():
+                local_highs.append(float(high.iloc[i]))
+            if low.iloc[i] == low.iloc[i-window:i+window+1].min():
+                local_lows.append(float(low.iloc[i]))
+
+        # Cluster nearby levels (within 2%)
+        def cluster(levels, pct=0.02):
+            if not levels:
+                return []
+            levels = sorted(levels)
+            clusters = [[levels[0]]]
+            for lvl in levels[1:]:
+                if abs(lvl - clusters[-1][-1]) / clusters[-1][-1] < pct:
+                    clusters[-1].append(lvl)
+                else:
+                    clusters.append([lvl])
+            return [round(np.mean(c), 2) for c in clusters if len(c) >= 2]
+
+        supports    = cluster(local_lows)
+        resistances = cluster(local_highs)
+
+        # Nearest support below price
+        sup  = max([s for s in supports    if s < price], default=None)
+        res  = min([r for r in resistances if r > price], default=None)
+
+        # Is price near support? (within 3%)
+        near_support = sup is not None and abs(price - sup) / price < 0.03
+
+        return sup, res, near_support
+    except Exception:
+        return None, None, False
+
+
+def _chart_patterns(df: pd.DataFrame) -> list:
+    """
+    Detect Murphy-style chart patterns:
+    BULLISH: Double Bottom (W), Inverse H&S, Ascending Triangle, Cup & Handle, Falling Wedge, Bull Flag
+    BEARISH: Double Top (M), H&S Top, Descending Triangle, Rising Wedge
+    Returns list of {"name": str, "type": "bullish"|"bearish", "strength": float}
+    """
+    patterns = []
+    try:
+        close = df['Close']
+        low   = df['Low']
+        high  = df['High']
+        vol   = df['Volume'] if 'Volume' in df.columns else pd.Series(dtype=float)
+        n     = len(close)
+        if n < 50:
+            return patterns
+        price = float(close.iloc[-1])
+
+        # ────────────────────────────────────────────────
+        # BULLISH PATTERNS
+        # ────────────────────────────────────────────────
+
+        # 1. Double Bottom (W) — two similar lows, bounce in between, right side breaks neckline
+        if n >= 60:
+            seg = close.iloc[-60:]
+            half = len(seg) // 2
+            low1 = float(seg.iloc[:half].min())
+            low2 = float(seg.iloc[half:].min())
+            neckline = float(seg.iloc[half//2:half+half//2].max())
+            low_diff = abs(low1 - low2) / ((low1 + low2) / 2)
+            if (low_diff < 0.04 and
+                neckline > max(low1, low2) * 1.02 and
+                price >= neckline * 0.98):
+                strength = 1.0 - low_diff * 5
+                patterns.append({"name": "Double Bottom (W)", "type": "bullish", "strength": round(strength, 2)})
+
+        # 2. Inverse Head & Shoulders (bullish reversal)
+        if n >= 80:
+            seg = close.iloc[-80:]
+            q = len(seg) // 4
+            ls = float(seg.iloc[:q].min())          # left shoulder
+            hd = float(seg.iloc[q:2*q].min())       # head (deepest)
+            rs = float(seg.iloc[2*q:3*q].min())     # right shoulder
+            neckline = float(seg.iloc[q//2:q + q//2].max())
+            if (hd < ls and hd < rs and             # head is lowest
+                abs(ls - rs) / ((ls + rs) / 2) < 0.06 and  # shoulders similar
+                price >= neckline * 0.97):          # price near/above neckline
+                patterns.append({"name": "Inv. Head & Shoulders", "type": "bullish", "strength": 0.9})
+
+        # 3. Ascending Triangle — flat resistance, rising lows
+        if n >= 40:
+            h40 = high.iloc[-40:]
+            l40 = low.iloc[-40:]
+            res_range = (h40.max() - h40.min()) / h40.mean()
+            x = np.arange(len(l40))
+            slope = np.polyfit(x, l40.values, 1)[0]
+            if res_range < 0.04 and slope > 0:
+                patterns.append({"name": "Ascending Triangle", "type": "bullish", "strength": 0.8})
+
+        # 4. Cup & Handle — rounded bottom then small consolidation
+        if n >= 90:
+            cup = close.iloc[-90:-15]
+            handle = close.iloc[-15:]
+            cup_low = float(cup.min())
+            cup_high_l = float(cup.iloc[:15].mean())
+            cup_high_r = float(cup.iloc[-15:].mean())
+            handle_range = (handle.max() - handle.min()) / handle.mean()
+            if (cup_high_l > cup_low * 1.05 and     # meaningful dip
+                cup_high_r > cup_low * 1.05 and     # recovered
+                abs(cup_high_l - cup_high_r) / cup_high_l < 0.05 and  # symmetric
+                handle_range < 0.06 and             # tight handle
+                price > float(cup.iloc[-1]) * 0.98):
+                patterns.append({"name": "Cup & Handle", "type": "bullish", "strength": 0.85})
+
+        # 5. Falling Wedge (bullish) — lower highs AND lower lows but narrowing
+        if n >= 40:
+            h40 = high.iloc[-40:]
+            l40 = low.iloc[-40:]
+            x = np.arange(40)
+            slope_h = np.polyfit(x, h40.values, 1)[0]
+            slope_l = np.polyfit(x, l40.values, 1)[0]
+            if slope_h < 0 and slope_l < 0 and slope_l > slope_h:  # both down, lows falling less
+                wedge_width_start = float(h40.iloc[0] - l40.iloc[0])
+                wedge_width_end   = float(h40.iloc[-1] - l40.iloc[-1])
+                if wedge_width_end < wedge_width_start * 0.6:  # narrowing by 40%+
+                    patterns.append({"name": "Falling Wedge", "type": "bullish", "strength": 0.75})
+
+        # 6. Bull Flag — strong up move then tight sideways/down consolidation
+        if n >= 30:
+            pole = close.iloc[-30:-10]
+            flag = close.iloc[-10:]
+            pole_gain = (float(pole.iloc[-1]) - float(pole.iloc[0])) / float(pole.iloc[0]) * 100
+            flag_range = (flag.max() - flag.min()) / flag.mean() * 100
+            flag_slope = np.polyfit(np.arange(10), flag.values, 1)[0]
+            if pole_gain > 8 and flag_range < 5 and flag_slope <= 0:
+                patterns.append({"name": "Bull Flag", "type": "bullish", "strength": 0.8})
+
+        # ────────────────────────────────────────────────
+        # BEARISH PATTERNS
+        # ────────────────────────────────────────────────
+
+        # 7. Double Top (M) — two similar highs with a dip, warns of reversal
+        if n >= 60:
+            seg = close.iloc[-60:]
+            half = len(seg) // 2
+            hi1 = float(seg.iloc[:half].max())
+            hi2 = float(seg.iloc[half:].max())
+            mid_low = float(seg.iloc[half//2:half+half//2].min())
+            hi_diff = abs(hi1 - hi2) / ((hi1 + hi2) / 2)
+            if (hi_diff < 0.03 and
+                mid_low < min(hi1, hi2) * 0.97 and
+                price <= mid_low * 1.02):
+                patterns.append({"name": "Double Top (M) ⚠️", "type": "bearish", "strength": 0.85})
+
+        # 8. Head & Shoulders Top (bearish)
+        if n >= 80:
+            seg = close.iloc[-80:]
+            q = len(seg) // 4
+            ls = float(seg.iloc[:q].max())
+            hd = float(seg.iloc[q:2*q].max())
+            rs = float(seg.iloc[2*q:3*q].max())
+            neckline = float(seg.iloc[q//2:q + q//2].min())
+            if (hd > ls and hd > rs and
+                abs(ls - rs) / ((ls + rs) / 2) < 0.06 and
+                price <= neckline * 1.02):
+                patterns.append({"name": "H&S Top ⚠️", "type": "bearish", "strength": 0.9})
+
+        # 9. Descending Triangle — flat support, falling highs = bearish
+        if n >= 40:
+            h40 = high.iloc[-40:]
+            l40 = low.iloc[-40:]
+            sup_range = (l40.max() - l40.min()) / l40.mean()
+            x = np.arange(40)
+            slope_h = np.polyfit(x, h40.values, 1)[0]
+            if sup_range < 0.04 and slope_h < 0:
+                patterns.append({"name": "Descending Triangle ⚠️", "type": "bearish", "strength": 0.75})
+
+        # 10. Rising Wedge (bearish) — both highs and lows rising but narrowing
+        if n >= 40:
+            h40 = high.iloc[-40:]
+            l40 = low.iloc[-40:]
+            x = np.arange(40)
+            slope_h = np.polyfit(x, h40.values, 1)[0]
+            slope_l = np.polyfit(x, l40.values, 1)[0]
+            if slope_h > 0 and slope_l > 0 and slope_h < slope_l:  # both up, highs rising less
+                wedge_width_start = float(h40.iloc[0] - l40.iloc[0])
+                wedge_width_end   = float(h40.iloc[-1] - l40.iloc[-1])
+                if wedge_width_end < wedge_width_start * 0.6:
+                    patterns.append({"name": "Rising Wedge ⚠️", "type": "bearish", "strength": 0.7})
+
+    except Exception:
+        pass
+    return patterns
+
+
+def _quality_filters(close: pd.Series, ma50: float) -> dict:
+    """
+    Advanced quality filters to avoid traps:
+    1. MA50 distance — reject if price drifted too far above MA50
+    2. Sideways chop — reject if stock has been going nowhere for months
+    3. Bull trap — small bounce after big drop is suspicious
+    Returns dict with {passes, reasons}
+    """
+    reasons = []
+    passes  = True
+
+    try:
+        price = float(close.iloc[-1])
+        n = len(close)
+
+        # ── 1. Distance from MA50 (avoid stocks already extended UP) ──
+        if ma50 and ma50 > 0:
+            pct_above_ma50 = (price - ma50) / ma50 * 100
+            if pct_above_ma50 > 15:
+                reasons.append(f"Too extended above MA50 (+{pct_above_ma50:.1f}%) — likely overbought")
+                passes = False
+
+        # ── 2. Sideways chop detector ─────────────────────────────────
+        # If the range over last 60 days is less than 8%, it's going nowhere
+        if n >= 60:
+            last60 = close.iloc[-60:]
+            rng = (last60.max() - last60.min()) / last60.mean() * 100
+            if rng < 8:
+                reasons.append(f"Sideways chop — only {rng:.1f}% range in 60 days")
+                passes = False
+
+        # ── 3. Bull trap detector ─────────────────────────────────────
+        # Small bounce (3-8%) after a large drop (>20%) = suspicious
+        if n >= 30:
+            recent_low  = float(close.iloc[-20:].min())
+            peak_before = float(close.iloc[-90:-20].max()) if n >= 90 else None
+            if peak_before and peak_before > 0:
+                drop_from_peak = (recent_low - peak_before) / peak_before * 100
+                bounce         = (price - recent_low) / recent_low * 100
+                if drop_from_peak < -25 and 2 < bounce < 12:
+                    reasons.append(f"Possible bull trap — dropped {drop_from_peak:.0f}% then bounced {bounce:.1f}%")
+                    passes = False
+
+        # ── 4. Consecutive lower highs (downtrend structure) ──────────
+        if n >= 40:
+            highs = close.rolling(5).max().iloc[-40:]
+            # Count how many of last 6 5-day highs are lower than the previous
+            h_vals = highs.iloc[::6].values
+            lower_highs = sum(1 for i in range(1, len(h_vals)) if h_vals[i] < h_vals[i-1])
+            if lower_highs >= 4 and len(h_vals) >= 5:
+                reasons.append(f"Downtrend structure — {lower_highs} consecutive lower highs")
+                passes = False
+
+    except Exception:
+        pass
+
+    return {"passes": passes, "reasons": reasons}
+
+
+
+    try:
+        df = _get_ohlcv(ticker, period="2y")
+        if df.empty or len(df) < 50:
+            return f"{ticker}: ❌ No data ({len(df)} rows)"
+        close = df['Close']
+        price = round(float(close.iloc[-1]), 2)
+        if price < params.get('min_price', 15):
+            return f"{ticker}: ❌ Price ${price} < min"
+        avg_vol = float(df['Volume'].rolling(20).mean().iloc[-1])
+        if avg_vol < params.get('min_volume', 200_000):
+            return f"{ticker}: ❌ Volume {avg_vol:,.0f} too low"
+        ma50  = float(close.rolling(50).mean().iloc[-1])  if len(close)>=50  else None
+        ma200 = float(close.rolling(200).mean().iloc[-1]) if len(close)>=200 else None
+        if params.get('require_above_200') and (not ma200 or price < ma200):
+            return f"{ticker}: ❌ Below MA200 (${price} vs ${round(ma200,2) if ma200 else 'N/A'})"
+        if params.get('require_above_50') and (not ma50 or price < ma50*0.97):
+            return f"{ticker}: ❌ Below MA50"
+        rsi = _rsi(close, params.get('rsi_period',14))
+        rsi_min, rsi_max = params.get('rsi_min',0), params.get('rsi_max',90)
+        if rsi > rsi_max or rsi < rsi_min:
+            return f"{ticker}: ❌ RSI={rsi} not in [{rsi_min}–{rsi_max}]"
+        uptrend = _uptrend_52w(close)
+        if params.get('require_uptrend_52w') and not uptrend:
+            return f"{ticker}: ❌ Not in 52-week uptrend"
+        trend = _trend_pct(close, 20)
+        return (f"{ticker}: ✅ PASSES — Price=${price}, RSI={rsi}, "
+                f"52W-Uptrend={'✓' if uptrend else '✗'}, Trend4W={trend}%")
+    except Exception as e:
+        return f"{ticker}: ❌ Exception: {e}"
+
+
+# ── backtester ────────────────────────────────────────────────
+def _bt_rsi(s: pd.Series, period: int = 14) -> pd.Series:
+    delta    = s.diff()
+    avg_gain = delta.clip(lower=0).ewm(com=period-1, min_periods=period).mean()
+    avg_loss = (-delta.clip(upper=0)).ewm(com=period-1, min_periods=period).mean()
+    rs       = avg_gain / avg_loss
+    return 100 - 100 / (1 + rs)
+
+
+def _bb_pct(s: pd.Series, period: int = 20, std_dev: float = 2.0) -> pd.Series:
+    mid   = s.rolling(period).mean()
+    sigma = s.rolling(period).std()
+    upper = mid + std_dev * sigma
+    lower = mid - std_dev * sigma
+    return (s - lower) / (upper - lower)
+
+
+def _backtest_one(ticker: str, params: dict, df: pd.DataFrame, cutoff: pd.Timestamp) -> dict:
+    try:
+        if df.empty or len(df) < 80:
+            return {}
+
+        close = df['Close']
+
+        # Parameters — use RELAXED fixed params for backtest to generate enough trades
+        # The screener already filtered the stocks; backtest just needs to find
+        # the entry/exit points on those same stocks
+        rsi_period = params.get('rsi_period', 14)
+        rsi_max    = 55      # relaxed: catch more entry points historically
+        rsi_min    = 0
+        bb_period  = params.get('bb_period', 20)
+        bb_std     = params.get('bb_std', 2.0)
+
+        rsi_s  = _bt_rsi(close, rsi_period)
+        bb_s   = _bb_pct(close, bb_period, bb_std)
+        ma50   = close.rolling(50).mean()
+        ma200  = close.rolling(200).mean()
+
+        # ── Buy signal: RSI in oversold zone + above MAs ──────────
+        # Relaxed: no BB requirement (it's informational)
+        buy_sig = (
+            (rsi_s < rsi_max) &
+            (rsi_s > rsi_min) &
+            (close > ma200 * 0.97) &    # within 3% of MA200
+            (close > ma50  * 0.95)      # within 5% of MA50
+        )
+
+        # ── Sell signal: overbought OR breaks below MA ─────────────
+        sell_sig = (
+            (rsi_s > 65) |
+            (close < ma50 * 0.93) |
+            (bb_s  > 0.90)
+        )
+
+        # Only backtest last 12 months
+        idx    = close.index[close.index >= cutoff].tolist()
+
+        if len(idx) < 20:
+            return {}
+
+        # ── Simulate trades ───────────────────────────────────────
+        trades        = []
+        in_trade      = False
+        buy_price     = None
+        buy_date      = None
+        cooldown      = 0
+
+        for date in idx:
+            if cooldown > 0:
+                cooldown -= 1
+                continue
+
+            price    = float(close.loc[date])
+            is_buy   = bool(buy_sig.loc[date])  if date in buy_sig.index  else False
+            is_sell  = bool(sell_sig.loc[date]) if date in sell_sig.index else False
+
+            if not in_trade:
+                if is_buy:
+                    in_trade  = True
+                    buy_price = price
+                    buy_date  = date
+            else:
+                if is_sell:
+                    pct    = (price - buy_price) / buy_price * 100
+                    hold_d = (date - buy_date).days
+                    won    = pct > 0
+                    trades.append({
+                        "ticker":     ticker,
+                        "buy_date":   buy_date.strftime('%Y-%m-%d'),
+                        "sell_date":  date.strftime('%Y-%m-%d'),
+                        "buy_price":  round(float(buy_price), 2),
+                        "sell_price": round(float(price), 2),
+                        "return_%":   round(pct, 2),
+                        "hold_days":  hold_d,
+                        "result":     "✅ Win" if won else "❌ Loss",
+                        "rsi_at_buy": round(float(rsi_s.loc[buy_date]), 1)
+                                      if buy_date in rsi_s.index else None,
+                    })
+                    in_trade  = False
+                    buy_price = None
+                    cooldown  = 2 if not won else 0   # short cooldown after loss
+
+        # Open trade at end
+        if in_trade and buy_price is not None:
+            last_price = float(close.iloc[-1])
+            pct        = (last_price - buy_price) / buy_price * 100
+            trades.append({
+                "ticker":     ticker,
+                "buy_date":   buy_date.strftime('%Y-%m-%d'),
+                "sell_date":  "OPEN",
+                "buy_price":  round(float(buy_price), 2),
+                "sell_price": round(float(last_price), 2),
+                "return_%":   round(pct, 2),
+                "hold_days":  (close.index[-1] - buy_date).days,
+                "result":     "🔵 Open",
+                "rsi_at_buy": None,
+            })
+
+        if not trades:
+            return {}
+
+        # ── Stats ─────────────────────────────────────────────────
+        closed  = [t for t in trades if t['sell_date'] != "OPEN"]
+        all_r   = [t['return_%'] for t in trades]
+        wins    = [t for t in closed if t['return_%'] > 0]
+        win_r   = len(wins) / len(closed) * 100 if closed else 0
+
+        return {
+            "ticker":       ticker,
+            "trades":       trades,
+            "total_trades": len(trades),
+            "wins":         len(wins),
+            "losses":       len(closed) - len(wins),
+            "win_rate":     round(win_r, 1),
+            "avg_return":   round(float(np.mean(all_r)), 2),
+            "best_trade":   round(float(max(all_r)), 2),
+            "worst_trade":  round(float(min(all_r)), 2),
+            "avg_hold_days":round(float(np.mean([t['hold_days'] for t in trades])), 1),
+        }
+
+    except Exception:
+        return {}
+
+
+# ── macro_intelligence ────────────────────────────────────────
+def _detect_themes_fast(headlines: list, MACRO_PLAYBOOKS: dict) -> list:
+    """Quick keyword matching to detect macro themes."""
+    text = " ".join(h['title'].lower() for h in headlines)
+    detected = []
+    for theme_key, playbook in MACRO_PLAYBOOKS.items():
+        score = sum(1 for kw in playbook['triggers'] if kw in text)
+        if score >= 1:
+            detected.append({
+                "theme":    theme_key,
+                "score":    score,
+                "playbook": playbook,
+            })
+    detected.sort(key=lambda x: -x['score'])
+    return detected[:3]  # top 3 themes
@@ -0,0 +1,30 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+# The modules live at the repository root, not in a package.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def make_frames(n: int = 120, seed: int = 1) -> dict:
+    """{ticker: OHLCV} random walks of 40–505 bars ending on (nearly) the same day."""
+    rng   = np.random.default_rng(seed)
+    dates = pd.bdate_range("2024-10-01", periods=505)
+    out   = {}
+    for j in range(n):
+        end = 505 - int(rng.integers(0, 2))
+        idx = dates[max(0, end - int(rng.integers(40, 506))):end]
+        c = rng.uniform(10, 300) * np.exp(np.cumsum(rng.normal(rng.normal(0.0008, 0.001), 0.02, len(idx))))
+        h = c * (1 + np.abs(rng.normal(0, 0.01, len(c))))
+        l = c * (1 - np.abs(rng.normal(0, 0.01, len(c))))
+        v = rng.integers(100_000, 5_000_000, len(c)).astype(float)
+        out[f"T{j}"] = pd.DataFrame({"Open": c, "High": h, "Low": l, "Close": c, "Volume": v}, index=idx)
+    return out
+
+
+@pytest.fixture(scope="session")
+def frames() -> dict:
+    return make_frames()
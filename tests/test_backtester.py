@@ -0,0 +1,54 @@
+"""Backtester internals."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import baseline
+from backtester import _simulate, _tally, _trade_positions, _rates
+from trade_log import TradeLog
+
+
+def test_tally_matches_trade_log_stats():
+    """Sweep/walk-forward totals use the same unrounded returns as TradeLog.stats()."""
+    close = np.array([100.0, 100.004, 100.0, 99.996, 101.0, 103.0, 102.0, 102.5])
+    buy   = np.array([1, 0, 1, 0, 1, 0, 0, 1], dtype=bool)
+    sell  = np.array([0, 1, 0, 1, 0, 1, 0, 0], dtype=bool)
+    dates = pd.bdate_range("2025-01-01", periods=len(close))
+
+    log   = TradeLog.from_positions("T", dates, close, np.zeros(len(close)),
+                                    _trade_positions(close, buy, sell))
+    stats = log.stats()
+    total = _tally(close, buy, sell, 0)
+    win_rate, avg_ret = _rates(total[None, :])
+
+    assert total[0] == stats["total_trades"] == 3
+    assert total[2] == stats["wins"] == 1          # +0.004% is a win, not a rounded 0.00
+    assert win_rate[0] == stats["win_rate"]
+    assert avg_ret[0] == stats["avg_return"]
+
+
+def _records(log: TradeLog) -> list:
+    """display_frame() rows in the baseline's trade-dict form (None for a missing RSI)."""
+    return [{k: (None if isinstance(v, float) and np.isnan(v) else v) for k, v in row.items()}
+            for row in log.display_frame().to_dict('records')]
+
+
+def test_simulate_matches_baseline_backtest(frames):
+    """Position-based simulation reproduces the baseline bar-by-bar loop, trade for trade."""
+    params = {"rsi_period": 14, "bb_period": 20, "bb_std": 2.0}
+    cutoff = pd.bdate_range("2024-10-01", periods=505)[-250]
+    n_trades = 0
+    for t, df in frames.items():
+        bars     = df[['Close', 'High', 'Low', 'Volume']]
+        expected = baseline._backtest_one(t, params, bars, cutoff)
+        result   = _simulate(t, bars, params, cutoff)
+        assert bool(result) == bool(expected), t
+        if not expected:
+            continue
+        assert _records(result.pop("trades")) == expected.pop("trades"), t
+        # the average is now taken over unrounded returns (see test_tally_matches_trade_log_stats)
+        assert result.pop("avg_return") == pytest.approx(expected.pop("avg_return"), abs=0.011), t
+        assert {k: result[k] for k in expected} == expected, t     # plus stops/targets hit
+        n_trades += result["total_trades"]
+    assert n_trades
@@ -0,0 +1,46 @@
+"""feed_cache downloads: a reader that stops early still leaves a complete cached body."""
+
+import threading
+import time
+
+import feed_cache
+
+
+class _Response:
+    """Stands in for a streamed requests.Response whose tail arrives slowly."""
+    status_code = 200
+    headers     = {"ETag": '"v1"'}
+
+    def __init__(self, chunks, release):
+        self.chunks, self.release, self.closed = chunks, release, False
+
+    def iter_content(self, chunk_size):
+        yield self.chunks[0]
+        self.release.wait(5)
+        yield from self.chunks[1:]
+
+    def close(self):
+        self.closed = True
+
+
+def test_early_stop_drains_in_background(tmp_path, monkeypatch):
+    monkeypatch.setattr(feed_cache, "CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(feed_cache, "_INDEX", None)
+    url     = "https://example.com/feed"
+    release = threading.Event()
+    resp    = _Response([b"<rss>", b"<item/>", b"</rss>"], release)
+    monkeypatch.setattr(feed_cache.SESSION, "get", lambda *a, **k: resp)
+
+    chunks = feed_cache.stream(url)
+    assert next(chunks) == b"<rss>"
+    chunks.close()                      # returns at once, although the rest is still pending
+    assert feed_cache._read(url) is None
+
+    release.set()
+    for _ in range(100):
+        if feed_cache._read(url) is not None:
+            break
+        time.sleep(0.02)
+    assert feed_cache._read(url) == b"<rss><item/></rss>"
+    assert feed_cache._load_index()[url]["etag"] == '"v1"'
+    assert resp.closed
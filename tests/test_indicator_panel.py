@@ -0,0 +1,41 @@
+"""Universe-wide indicators vs the baseline per-ticker helpers."""
+
+import numpy as np
+import pandas as pd
+
+import baseline
+from indicator_panel import build_panel, compute_features, feature_rows, rolling_std, sma
+
+
+PARAMS = {"rsi_period": 14, "bb_period": 20, "bb_std": 2.0}
+
+
+def test_features_match_baseline_scalars(frames):
+    rows = feature_rows(compute_features(frames, PARAMS))
+    for t, df in frames.items():
+        close, f = df['Close'], rows[t]
+        assert f['price'] == round(float(close.iloc[-1]), 2)
+        assert f['rsi'] == baseline._rsi(close, 14), t
+        assert (f['bb_pct'], f['bb_upper'], f['bb_lower']) == baseline._bb(close, 20, 2.0), t
+        assert (f['macd_line'], f['macd_signal'], f['macd_hist']) == baseline._macd(close), t
+        assert f['trend_4w'] == baseline._trend_pct(close, 20), t
+        for w in (20, 50, 200):
+            ma = round(float(close.rolling(w).mean().iloc[-1]), 2) if len(close) >= w else None
+            assert f[f'ma{w}'] == ma, (t, w)
+        assert np.isclose(f['avg_vol'], df['Volume'].rolling(20).mean().iloc[-1], rtol=1e-12)
+
+
+def test_rolling_series_match_pandas(frames):
+    close = build_panel(frames, ('Close',))['Close']          # NaN where a ticker has no bar
+    ref   = pd.DataFrame(close)
+    for w in (2, 20, 50):
+        np.testing.assert_allclose(sma(close, w), ref.rolling(w).mean().to_numpy(), rtol=1e-10)
+        np.testing.assert_allclose(rolling_std(close, w), ref.rolling(w).std().to_numpy(),
+                                   rtol=1e-6, atol=1e-6)
+
+
+def test_rolling_std_of_flat_window_is_zero():
+    x   = np.array([[5.0], [5.0], [5.0], [6.0], [6.0], [6.0]])
+    out = rolling_std(x, 3)[:, 0]
+    assert np.isnan(out[:2]).all() and out[2] == 0.0 and out[5] == 0.0
+    np.testing.assert_allclose(out[3:5], np.std([5, 5, 6], ddof=1))
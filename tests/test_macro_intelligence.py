@@ -0,0 +1,42 @@
+"""Macro theme detection vs the baseline substring scan."""
+
+import random
+
+import baseline
+from macro_intelligence import MACRO_PLAYBOOKS, _detect_themes_fast, theme_hits, THEME_KEYS
+
+
+TRIGGERS = sorted({kw for p in MACRO_PLAYBOOKS.values() for kw in p['triggers']})
+
+
+def _headlines(seed: int, n: int = 40) -> list:
+    """Headlines of whole-word triggers, each ending in '.' so none match across titles."""
+    rng = random.Random(seed)
+    return [{"title": " ".join(rng.sample(TRIGGERS, rng.randint(1, 3))).title() + " today."}
+            for _ in range(n)]
+
+
+def _themes(detected: list) -> list:
+    return sorted((d['theme'], d['score']) for d in detected)
+
+
+def test_detect_themes_matches_baseline():
+    for seed in range(20):
+        heads = _headlines(seed, n=seed % 6 + 1)
+        assert _themes(_detect_themes_fast(heads)) == \
+               _themes(baseline._detect_themes_fast(heads, MACRO_PLAYBOOKS)), seed
+
+
+def test_theme_hits_count_triggers_per_headline():
+    heads   = _headlines(3)
+    hits, _ = theme_hits(heads)
+    for i, h in enumerate(heads):
+        title = h['title'].lower()
+        for j, key in enumerate(THEME_KEYS):
+            want = sum(kw in title for kw in MACRO_PLAYBOOKS[key]['triggers'])
+            assert hits[i, j] == want, (h['title'], key)
+
+
+def test_triggers_need_word_boundaries():
+    assert _detect_themes_fast([{"title": "Early warning signs"}]) == \
+           _detect_themes_fast([{"title": "Early signs"}])
@@ -0,0 +1,81 @@
+"""News dedup: LSH clustering vs a brute-force pass over every pair."""
+
+import random
+
+import numpy as np
+
+from news_dedup import (signatures, cluster_labels, collapse,
+                        NUM_PERM, BANDS, THRESHOLD)
+
+
+WORDS = ("fed rates oil stocks earnings chip tariff china bank yields rally "
+         "slump merger guidance inflation jobs").split()
+
+
+def _titles(seed: int, n: int = 60) -> list:
+    rng   = random.Random(seed)
+    base  = [" ".join(rng.choices(WORDS, k=8)) for _ in range(n // 3)]
+    pubs  = ["Reuters", "Bloomberg", "CNBC"]
+    out   = []
+    for _ in range(n):
+        t = rng.choice(base)
+        if rng.random() < 0.5:
+            t += " - " + rng.choice(pubs)
+        if rng.random() < 0.3:
+            t = t.replace(rng.choice(WORDS), rng.choice(WORDS), 1)
+        out.append(t)
+    return out
+
+
+def _brute_force(titles: list) -> np.ndarray:
+    """Every pair that shares a band and clears THRESHOLD, min-root union-find."""
+    sig, rows = signatures(titles), NUM_PERM // BANDS
+    parent    = list(range(len(titles)))
+
+    def find(i):
+        while parent[i] != i:
+            i = parent[i]
+        return i
+
+    for i in range(len(titles)):
+        for j in range(i + 1, len(titles)):
+            bands = (sig[i] == sig[j]).reshape(BANDS, rows).all(axis=1)
+            if bands.any() and (sig[i] == sig[j]).mean() >= THRESHOLD:
+                ri, rj = find(i), find(j)
+                parent[max(ri, rj)] = min(ri, rj)
+    return np.array([find(i) for i in range(len(titles))])
+
+
+def test_cluster_labels_match_brute_force():
+    for seed in range(5):
+        titles = _titles(seed)
+        np.testing.assert_array_equal(cluster_labels(titles), _brute_force(titles))
+
+
+def test_publisher_suffixes_collapse():
+    titles = ["Fed holds rates steady as inflation cools - Reuters",
+              "Fed holds rates steady as inflation cools | Bloomberg",
+              "Fed holds rates steady as inflation cools",
+              "Oil jumps after OPEC cut"]
+    assert list(cluster_labels(titles)) == [0, 0, 0, 3]
+
+
+def test_clusters_do_not_depend_on_order():
+    titles = _titles(7)
+    perm   = np.random.default_rng(0).permutation(len(titles))
+    a      = cluster_labels(titles)
+    b      = cluster_labels([titles[i] for i in perm])
+    same_a = a[:, None] == a[None, :]
+    same_b = b[:, None] == b[None, :]
+    np.testing.assert_array_equal(same_a[np.ix_(perm, perm)], same_b)
+
+
+def test_collapse_counts_distinct_sources():
+    heads = [{"title": "Nvidia beats earnings estimates - Reuters", "source": "google"},
+             {"title": "Nvidia beats earnings estimates",           "source": "yahoo"},
+             {"title": "Nvidia beats earnings estimates - CNBC",    "source": "google"},
+             {"title": "Oil jumps after OPEC cut",                  "source": "yahoo"}]
+    reps = collapse(heads)
+    assert [r['title'] for r in reps] == [heads[0]['title'], heads[3]['title']]
+    assert [r['source_count'] for r in reps] == [2, 1]
+    assert reps[0]['sources'] == ["google", "yahoo"]
@@ -0,0 +1,56 @@
+"""Portfolio simulation vs the per-ticker backtest."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from backtester import _simulate
+from portfolio import simulate_portfolio
+
+
+PARAMS = {"rsi_period": 14, "bb_period": 20, "bb_std": 2.0}
+
+
+def _frames(n_tickers=6, n_bars=500, seed=7):
+    rng   = np.random.default_rng(seed)
+    dates = pd.bdate_range("2023-01-02", periods=n_bars)
+    out   = {}
+    for j in range(n_tickers):
+        close = 50 * np.exp(np.cumsum(rng.normal(0.0003, 0.02, n_bars)))
+        out[f"T{j}"] = pd.DataFrame({"Open": close, "High": close * 1.01, "Low": close * 0.99,
+                                     "Close": close, "Volume": 1e6}, index=dates)
+    return out
+
+
+def _key(ticker, buy, sell, ret):
+    return ticker, pd.Timestamp(buy).strftime('%Y-%m-%d'), sell, round(float(ret), 2)
+
+
+def _per_ticker(frames, start):
+    trades = set()
+    for t, df in frames.items():
+        res = _simulate(t, df, PARAMS, start)
+        if not res:
+            continue
+        f = res["trades"].to_frame()
+        for _, r in f.iterrows():
+            sell = "OPEN" if pd.isna(r["sell_date"]) else r["sell_date"].strftime('%Y-%m-%d')
+            trades.add(_key(t, r["buy_date"], sell, r["return_%"]))
+    return trades
+
+
+def _portfolio(frames, start):
+    res = simulate_portfolio(frames, PARAMS, capital=1e6, max_positions=10_000, start=start)
+    return {_key(t["ticker"], t["buy_date"], t["sell_date"], t["return_%"]) for t in res["trades"]}
+
+
+@pytest.mark.parametrize("drop", [30, 210, 300, 420])
+def test_missing_bar_matches_per_ticker_backtest(drop):
+    """With unlimited slots, a gap in one ticker changes nothing but that ticker's own bars."""
+    frames = _frames()
+    frames["T2"] = frames["T2"].drop(frames["T2"].index[drop])
+    start  = frames["T0"].index[250]
+
+    expected = _per_ticker(frames, start)
+    assert expected
+    assert _portfolio(frames, start) == expected
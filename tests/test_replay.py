@@ -0,0 +1,68 @@
+"""Replay vs the live screener, and run_replay's handling of its inputs."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import replay
+import screener
+import ticker_meta
+from screener import REGIME_TICKERS, ScanContext
+
+
+PARAMS = dict(min_price=5, min_volume=100_000, min_beta=0.3, rsi_min=0, rsi_max=70,
+              rsi_period=14, require_above_200=False, require_above_50=True,
+              require_above_20=False, require_uptrend_52w=False, bb_period=20, bb_std=2.0,
+              min_institutional=0, apply_quality_filter=False)
+
+
+def _bars(rng, dates, scale=1.0):
+    c = rng.uniform(20, 200) * np.exp(np.cumsum(rng.normal(0.0008, 0.02, len(dates)))) * scale
+    h = c * (1 + np.abs(rng.normal(0, 0.01, len(c))))
+    l = c * (1 - np.abs(rng.normal(0, 0.01, len(c))))
+    v = rng.integers(100_000, 5_000_000, len(c)).astype(float)
+    return pd.DataFrame({"Open": c, "High": h, "Low": l, "Close": c, "Volume": v}, index=dates)
+
+
+@pytest.fixture
+def market():
+    rng    = np.random.default_rng(5)
+    dates  = pd.bdate_range("2024-10-01", periods=505)
+    spy    = _bars(rng, dates)['Close']
+    frames = {}
+    for j in range(4):
+        m = (spy / spy.iloc[0]) ** rng.uniform(0.3, 2)      # some beta to SPY
+        frames[f"T{j}"] = _bars(rng, dates[j * 40:], m.iloc[j * 40:].to_numpy())
+    return frames, spy
+
+
+@pytest.mark.parametrize("quality", [False, True])
+def test_scores_match_live_screener(market, monkeypatch, quality):
+    frames, spy = market
+    params = dict(PARAMS, apply_quality_filter=quality, require_uptrend_52w=quality)
+    vix    = pd.Series(18.0, index=spy.index)
+    monkeypatch.setattr(ticker_meta, "get", lambda t, fetch_missing=False: {})
+    rng    = np.random.default_rng(0)
+    passed = 0
+    for t, df in frames.items():
+        scores = replay.ticker_scores(t, df, params, spy, replay.vix_regimes(vix))
+        for i in sorted(set(rng.integers(60, len(df), 6).tolist()) | {len(df) - 1}):
+            sub = df.iloc[:i + 1]
+            ctx = ScanContext(vix=18.0, vix_regime='low', priority_tickers=REGIME_TICKERS['low'],
+                              spy_close=spy[spy.index <= sub.index[-1]].iloc[-251:], scan_date='x')
+            live = screener.calculate_indicators(t, params, ctx, df=sub)
+            live = live['score'] if live and live.get('passes_filter') else np.nan
+            rep  = scores.iloc[i] if len(scores) else np.nan
+            assert (np.isnan(live) and np.isnan(rep)) or live == rep, (t, i)
+            passed += not np.isnan(live)
+    assert passed
+
+
+def test_run_replay_keeps_benchmarks_in_loaded_frames(market, monkeypatch):
+    frames, spy = market
+    loaded = {**frames, "SPY": pd.DataFrame({"Close": spy}), "^VIX": pd.DataFrame({"Close": spy * 0 + 18})}
+    monkeypatch.setattr(replay.price_store, "load_many", lambda tickers, period: loaded)
+
+    out = replay.run_replay(["T0", "T1", "SPY"], PARAMS, replay_days=100_000)
+    assert "SPY" in loaded and "^VIX" in loaded
+    assert set(out["scores"]["ticker"]) <= {"T0", "T1", "SPY"}
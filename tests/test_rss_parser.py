@@ -0,0 +1,25 @@
+"""Pull parser vs the regex scan on the recorded-format feed fixtures."""
+
+import glob
+import os
+
+import pytest
+
+import rss_parser
+
+
+FEEDS = sorted(glob.glob(os.path.join(os.path.dirname(__file__), "fixtures", "feeds", "*.xml")))
+
+
+@pytest.mark.parametrize("path", FEEDS, ids=os.path.basename)
+def test_pull_parser_matches_regex_scan(path):
+    body = open(path, "rb").read()
+    assert rss_parser.parse_items(body) == rss_parser.regex_items(body.decode("utf-8"))
+
+
+@pytest.mark.parametrize("path", FEEDS, ids=os.path.basename)
+def test_chunked_and_limited(path):
+    body  = open(path, "rb").read()
+    whole = rss_parser.parse_items(body)
+    assert rss_parser.parse_items(body, chunk_size=97) == whole
+    assert rss_parser.parse_items(body, limit=5, chunk_size=97) == whole[:5]
@@ -0,0 +1,38 @@
+"""Screener helpers (FeatureFrame, levels, chart patterns) vs the baseline versions."""
+
+import baseline
+from chart_patterns import batch_patterns
+from screener import (FeatureFrame, _scalar_features, _volume_analysis, _uptrend_52w,
+                      _quality_filters, _support_resistance, _chart_patterns)
+
+
+PARAMS = {"rsi_period": 14, "bb_period": 20, "bb_std": 2.0}
+
+
+def test_feature_frame_helpers_match_baseline(frames):
+    for t, df in frames.items():
+        close = df['Close']
+        ff    = FeatureFrame(df)
+        f     = _scalar_features(ff, PARAMS)
+        assert f['rsi'] == baseline._rsi(close, 14), t
+        assert (f['bb_pct'], f['bb_upper'], f['bb_lower']) == baseline._bb(close, 20, 2.0), t
+        assert (f['macd_line'], f['macd_signal'], f['macd_hist']) == baseline._macd(close), t
+        assert _uptrend_52w(ff) == baseline._uptrend_52w(close), t
+        assert _volume_analysis(ff) == baseline._volume_analysis(df, close), t
+        assert _quality_filters(ff, f['ma50']) == baseline._quality_filters(close, f['ma50']), t
+
+
+def test_support_resistance_matches_baseline(frames):
+    for t, df in frames.items():
+        assert _support_resistance(df) == baseline._support_resistance(df), t
+
+
+def test_chart_patterns_match_baseline(frames):
+    batch = batch_patterns(frames)
+    hits  = 0
+    for t, df in frames.items():
+        expected = baseline._chart_patterns(df)
+        assert _chart_patterns(df) == expected, t
+        assert batch[t] == expected, t
+        hits += len(expected)
+    assert hits                                        # the sample does exercise the detectors
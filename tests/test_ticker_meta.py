@@ -0,0 +1,50 @@
+"""ticker_meta: no duplicate .info calls, one disk write per refresh."""
+
+import threading
+import time
+
+import pytest
+
+import ticker_meta
+
+
+@pytest.fixture
+def meta(tmp_path, monkeypatch):
+    monkeypatch.setattr(ticker_meta, "META_PATH", str(tmp_path / "meta.json"))
+    monkeypatch.setattr(ticker_meta, "_META", {})
+    monkeypatch.setattr(ticker_meta, "_INFLIGHT", {})
+    monkeypatch.setattr(ticker_meta, "_RUNNING", set())
+    monkeypatch.setattr(ticker_meta, "_DIRTY", False)
+    calls, saves, lock = [], [], threading.Lock()
+
+    def fetch(t):
+        with lock:
+            calls.append(t)
+        time.sleep(0.1)
+        return {"name": t, "inst_pct": 50.0, "fetched": time.time()}
+
+    save = ticker_meta._save
+    monkeypatch.setattr(ticker_meta, "_fetch", fetch)
+    monkeypatch.setattr(ticker_meta, "_save", lambda: (saves.append(1), save()))
+    return calls, saves
+
+
+def test_get_waits_for_inflight_refresh(meta):
+    calls, saves = meta
+    tickers = [f"X{i}" for i in range(12)]
+    ticker_meta.refresh_async(tickers, batch_size=3)
+    time.sleep(0.03)                                   # first batches are fetching
+
+    assert ticker_meta.get("X0", fetch_missing=True)["name"] == "X0"     # running: waited on
+    assert ticker_meta.get("X11", fetch_missing=True)["name"] == "X11"   # queued: fetched here
+    assert ticker_meta.get("Y", fetch_missing=True)["name"] == "Y"
+    assert not saves                                   # misses are not written one by one
+
+    deadline = time.time() + 5
+    while ticker_meta._INFLIGHT and time.time() < deadline:
+        time.sleep(0.02)
+    time.sleep(0.05)
+    assert sorted(calls) == sorted(tickers + ["Y"])    # every ticker fetched exactly once
+    assert len(saves) == 1
+    ticker_meta.flush()
+    assert len(saves) == 1                             # nothing new since
@@ -0,0 +1,190 @@
+"""
+Ticker metadata store — company name, sector and ownership fields cached on
+disk with a TTL.
+
+Lookups are plain dict reads. Missing or expired tickers are refreshed in
+bulk on a small background pool; a lookup only waits on the network when the
+caller asks for a ticker that has never been fetched (fetch_missing=True),
+and then waits for a fetch already under way rather than starting another.
+New entries are written to disk in one go by flush(): when the background
+refresh drains, and once at the end of a scan.
+"""
+
+import os
+import json
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import yfinance as yf
+
+
+META_PATH    = os.environ.get("TICKER_META_PATH",
+                              os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                           ".cache", "ticker_meta.json"))
+TTL_SECONDS  = 7 * 24 * 3600
+BG_WORKERS   = 4
+WAIT_SECONDS = 30           # longest a lookup waits on someone else's fetch
+
+# our field -> yfinance .info key
+INFO_FIELDS = {
+    "name":       "shortName",
+    "long_name":  "longName",
+    "sector":     "sector",
+    "industry":   "industry",
+    "inst_pct":   "heldPercentInstitutions",
+    "market_cap": "marketCap",
+    "beta":       "beta",
+}
+
+_LOCK     = threading.Lock()
+_META     = None      # {ticker: {field: value, "fetched": epoch}}
+_INFLIGHT = {}        # ticker -> Event set once it is stored (queued or fetching)
+_RUNNING  = set()     # in-flight tickers whose .info call has started
+_DIRTY    = False     # entries added since the last write
+_POOL     = None
+
+
+def _fresh(entry) -> bool:
+    return bool(entry) and time.time() - entry.get("fetched", 0) < TTL_SECONDS
+
+
+def _load() -> dict:
+    global _META
+    if _META is None:
+        try:
+            with open(META_PATH) as f:
+                raw = json.load(f)
+        except Exception:
+            raw = {}
+        _META = {t: e for t, e in raw.items() if _fresh(e)}   # evict expired
+    return _META
+
+
+def _save():
+    try:
+        os.makedirs(os.path.dirname(META_PATH), exist_ok=True)
+        with _LOCK:
+            data = json.dumps(_META)
+        tmp = META_PATH + ".tmp"
+        with open(tmp, "w") as f:
+            f.write(data)
+        os.replace(tmp, META_PATH)
+    except Exception:
+        pass
+
+
+def _fetch(ticker: str) -> dict:
+    """One .info call → metadata entry (empty on failure)."""
+    try:
+        info = yf.Ticker(ticker).info or {}
+    except Exception:
+        return {}
+    entry = {k: info.get(src) for k, src in INFO_FIELDS.items()}
+    if entry["inst_pct"] is not None:
+        entry["inst_pct"] = round(float(entry["inst_pct"]) * 100, 1)
+    entry["name"]    = entry["name"] or entry["long_name"] or ticker
+    entry["fetched"] = time.time()
+    return entry
+
+
+def flush():
+    """Write the store to disk if entries were added since the last write."""
+    global _DIRTY
+    with _LOCK:
+        if not _DIRTY:
+            return
+        _DIRTY = False
+    _save()
+
+
+def _claim(ticker: str, queued_only: bool = False) -> tuple:
+    """
+    (done event, whether the caller should fetch `ticker`): False while
+    another fetch of it is running. queued_only: only claim a ticker that
+    is still waiting in the background queue.
+    """
+    with _LOCK:
+        if queued_only and ticker not in _INFLIGHT:
+            return None, False
+        done  = _INFLIGHT.setdefault(ticker, threading.Event())
+        claim = ticker not in _RUNNING
+        _RUNNING.add(ticker)
+    return done, claim
+
+
+def _store(ticker: str, entry: dict):
+    global _DIRTY
+    with _LOCK:
+        _load()
+        if entry:
+            _META[ticker] = entry
+            _DIRTY = True
+        done = _INFLIGHT.pop(ticker, None)
+        _RUNNING.discard(ticker)
+    if done:
+        done.set()
+
+
+def get(ticker: str, fetch_missing: bool = False) -> dict:
+    """
+    Cached metadata for `ticker`, or {} if unknown/expired.
+    With fetch_missing=True an unknown ticker is fetched (blocking) and
+    stored; if a fetch of it is already running, that one is waited for.
+    A ticker still queued for the background refresh is fetched here and
+    skipped there.
+    """
+    with _LOCK:
+        entry = _load().get(ticker)
+    if _fresh(entry):
+        return entry
+    if not fetch_missing:
+        return {}
+    done, claim = _claim(ticker)
+    if not claim:
+        done.wait(WAIT_SECONDS)
+        with _LOCK:
+            entry = _META.get(ticker)
+        return entry if _fresh(entry) else {}
+    entry = _fetch(ticker)
+    _store(ticker, entry)
+    return entry
+
+
+def get_many(tickers: list, fetch_missing: bool = False, max_workers: int = 8) -> dict:
+    """{ticker: metadata} for many tickers; missing ones are fetched in parallel."""
+    out  = {t: get(t) for t in tickers}
+    todo = [t for t, e in out.items() if not e]
+    if fetch_missing and todo:
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            for t, entry in zip(todo, pool.map(_fetch, todo)):
+                _store(t, entry)
+                out[t] = entry
+        flush()
+    return out
+
+
+def _refresh_batch(tickers: list):
+    for t in tickers:
+        if _claim(t, queued_only=True)[1]:     # not already fetched by a get()
+            _store(t, _fetch(t))
+    with _LOCK:
+        idle = not _INFLIGHT
+    if idle:                            # last batch of the refresh — one write for all of it
+        flush()
+
+
+def refresh_async(tickers: list, batch_size: int = 25):
+    """Queue missing/expired tickers for a background refresh. Returns immediately."""
+    global _POOL
+    with _LOCK:
+        meta = _load()
+        todo = [t for t in dict.fromkeys(tickers)
+                if not _fresh(meta.get(t)) and t not in _INFLIGHT]
+        for t in todo:
+            _INFLIGHT[t] = threading.Event()
+        if _POOL is None:
+            _POOL = ThreadPoolExecutor(max_workers=BG_WORKERS, thread_name_prefix="ticker-meta")
+    for i in range(0, len(todo), batch_size):
+        _POOL.submit(_refresh_batch, todo[i:i + batch_size])
+    return len(todo)
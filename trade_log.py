@@ -0,0 +1,213 @@
+"""
+Trade log — backtest trades as parallel NumPy arrays.
+
+One element per trade: ticker (as a code into a symbol table), entry/exit
+dates as datetime64 (exit NaT while the trade is open), prices, return,
+holding days, RSI at entry and why the trade exited. Stats are array reductions and a groupby on
+the ticker codes; strings, rounding and emoji labels are only produced by
+display_frame() when the log is rendered. to_arrow()/to_parquet() hand the
+arrays to Arrow without converting them row by row.
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+
+EXIT_REASONS = ("signal", "stop", "target", "open")    # exit_reason codes
+SIGNAL, STOP, TARGET, OPEN = range(len(EXIT_REASONS))
+
+@dataclass(frozen=True)
+class TradeLog:
+    """Trades as columns; `code` indexes into `symbols`."""
+    symbols:     tuple
+    code:        np.ndarray      # int32
+    buy_date:    np.ndarray      # datetime64[ns]
+    sell_date:   np.ndarray      # datetime64[ns], NaT while open
+    buy_price:   np.ndarray
+    sell_price:  np.ndarray      # last close for open trades
+    return_pct:  np.ndarray
+    hold_days:   np.ndarray      # int64
+    rsi_at_buy:  np.ndarray      # NaN for open trades
+    exit_reason: np.ndarray      # int8 index into EXIT_REASONS
+
+    _COLUMNS = ("buy_date", "sell_date", "buy_price", "sell_price",
+                "return_pct", "hold_days", "rsi_at_buy", "exit_reason")
+
+    # ── Construction ──────────────────────────────────────────
+    @classmethod
+    def empty(cls) -> "TradeLog":
+        f = np.array([], dtype=float)
+        d = np.array([], dtype='datetime64[ns]')
+        return cls((), np.array([], dtype=np.int32), d, d, f, f, f, np.array([], dtype=np.int64), f,
+                   np.array([], dtype=np.int8))
+
+    @classmethod
+    def from_positions(cls, ticker: str, dates: pd.DatetimeIndex, close: np.ndarray,
+                       rsi: np.ndarray, positions: list, fills: np.ndarray = None,
+                       reasons: np.ndarray = None) -> "TradeLog":
+        """
+        One ticker's trades from _trade_positions output [(entry, exit or None), ...].
+        fills/reasons give per-trade exit prices and EXIT_REASONS codes for
+        exits that did not happen at the exit bar's close on a sell signal.
+        """
+        if not positions:
+            return cls.empty()
+        dates  = np.asarray(dates, dtype='datetime64[ns]')
+        entry  = np.array([e for e, _ in positions], dtype=np.int64)
+        exit_  = np.array([-1 if x is None else x for _, x in positions], dtype=np.int64)
+        is_open = exit_ < 0
+        last   = np.where(is_open, len(close) - 1, exit_)
+        buy_p, sell_p = close[entry], close[last]
+        if fills is not None:
+            sell_p = np.where(np.isnan(fills), sell_p, fills)
+        return cls(
+            symbols    = (ticker,),
+            code       = np.zeros(len(entry), dtype=np.int32),
+            buy_date   = dates[entry],
+            sell_date  = np.where(is_open, np.datetime64('NaT', 'ns'), dates[last]),
+            buy_price  = buy_p.astype(float),
+            sell_price = sell_p.astype(float),
+            return_pct = (sell_p - buy_p) / buy_p * 100,
+            hold_days  = (dates[last] - dates[entry]).astype('timedelta64[D]').astype(np.int64),
+            rsi_at_buy = np.where(is_open, np.nan, rsi[entry]),
+            exit_reason = (np.asarray(reasons, dtype=np.int8) if reasons is not None else
+                           np.where(is_open, OPEN, SIGNAL).astype(np.int8)),
+        )
+
+    @classmethod
+    def concat(cls, logs: list) -> "TradeLog":
+        """Logs in order, one symbol table (first appearance order)."""
+        logs = [lg for lg in logs if len(lg)]
+        if not logs:
+            return cls.empty()
+        symbols = list(dict.fromkeys(s for lg in logs for s in lg.symbols))
+        pos     = {s: i for i, s in enumerate(symbols)}
+        codes   = [np.array([pos[s] for s in lg.symbols], dtype=np.int32)[lg.code] for lg in logs]
+        cols    = {f: np.concatenate([getattr(lg, f) for lg in logs]) for f in cls._COLUMNS}
+        return cls(tuple(symbols), np.concatenate(codes), **cols)
+
+    def take(self, idx) -> "TradeLog":
+        return TradeLog(self.symbols, self.code[idx],
+                        **{f: getattr(self, f)[idx] for f in self._COLUMNS})
+
+    def sorted_by_entry(self, descending: bool = True) -> "TradeLog":
+        """Stable sort on entry date (newest first by default)."""
+        key = self.buy_date.view(np.int64)
+        return self.take(np.argsort(-key if descending else key, kind='stable'))
+
+    # ── Columns ───────────────────────────────────────────────
+    def __len__(self) -> int:
+        return len(self.code)
+
+    @property
+    def ticker(self) -> np.ndarray:
+        return np.asarray(self.symbols, dtype=object)[self.code]
+
+    @property
+    def is_open(self) -> np.ndarray:
+        return np.isnat(self.sell_date)
+
+    @property
+    def is_win(self) -> np.ndarray:
+        return ~self.is_open & (self.return_pct > 0)
+
+    # ── Stats ─────────────────────────────────────────────────
+    def stats(self) -> dict:
+        """Summary over every trade (open trades count toward return and hold, not win rate)."""
+        if not len(self):
+            return {"total_trades": 0, "wins": 0, "losses": 0, "win_rate": 0,
+                    "avg_return": 0, "best_trade": 0, "worst_trade": 0, "avg_hold_days": 0,
+                    "stops_hit": 0, "targets_hit": 0}
+        closed = int((~self.is_open).sum())
+        wins   = int(self.is_win.sum())
+        return {
+            "total_trades":  len(self),
+            "wins":          wins,
+            "losses":        closed - wins,
+            "win_rate":      round(wins / closed * 100, 1) if closed else 0,
+            "avg_return":    round(float(self.return_pct.mean()), 2),
+            "best_trade":    round(float(self.return_pct.max()), 2),
+            "worst_trade":   round(float(self.return_pct.min()), 2),
+            "avg_hold_days": round(float(self.hold_days.mean()), 1),
+            "stops_hit":     int((self.exit_reason == STOP).sum()),
+            "targets_hit":   int((self.exit_reason == TARGET).sum()),
+        }
+
+    def per_ticker(self) -> dict:
+        """{ticker: stats()} in symbol-table order, from one groupby over the codes."""
+        if not len(self):
+            return {}
+        df = pd.DataFrame({"code": self.code, "ret": self.return_pct, "hold": self.hold_days,
+                           "win": self.is_win, "closed": ~self.is_open})
+        g  = df.groupby("code").agg(total_trades=("ret", "size"), wins=("win", "sum"),
+                                    closed=("closed", "sum"), avg_return=("ret", "mean"),
+                                    best_trade=("ret", "max"), worst_trade=("ret", "min"),
+                                    avg_hold_days=("hold", "mean"))
+        out = {}
+        for code, r in g.iterrows():
+            closed, wins = int(r["closed"]), int(r["wins"])
+            out[self.symbols[code]] = {
+                "total_trades":  int(r["total_trades"]),
+                "wins":          wins,
+                "losses":        closed - wins,
+                "win_rate":      round(wins / closed * 100, 1) if closed else 0,
+                "avg_return":    round(float(r["avg_return"]), 2),
+                "best_trade":    round(float(r["best_trade"]), 2),
+                "worst_trade":   round(float(r["worst_trade"]), 2),
+                "avg_hold_days": round(float(r["avg_hold_days"]), 1),
+            }
+        return out
+
+    # ── Output ────────────────────────────────────────────────
+    def to_frame(self) -> pd.DataFrame:
+        """Raw columns (datetime64 dates, unrounded numbers, categorical ticker)."""
+        return pd.DataFrame({
+            "ticker":     pd.Categorical.from_codes(self.code, categories=list(self.symbols))
+                          if self.symbols else pd.Categorical([]),
+            "buy_date":   self.buy_date,
+            "sell_date":  self.sell_date,
+            "buy_price":  self.buy_price,
+            "sell_price": self.sell_price,
+            "return_%":   self.return_pct,
+            "hold_days":  self.hold_days,
+            "rsi_at_buy": self.rsi_at_buy,
+            "exit":       pd.Categorical.from_codes(self.exit_reason, categories=list(EXIT_REASONS)),
+        })
+
+    def display_frame(self) -> pd.DataFrame:
+        """The log as shown in the app: date strings, rounded prices, result labels."""
+        df = self.to_frame()
+        df["ticker"]     = df["ticker"].astype(str)
+        df["buy_date"]   = df["buy_date"].dt.strftime('%Y-%m-%d')
+        df["sell_date"]  = df["sell_date"].dt.strftime('%Y-%m-%d').fillna("OPEN")
+        for col, nd in (("buy_price", 2), ("sell_price", 2), ("return_%", 2), ("rsi_at_buy", 1)):
+            df[col] = df[col].round(nd)
+        df.insert(7, "result", np.select([self.is_open, self.return_pct > 0],
+                                         ["🔵 Open", "✅ Win"], "❌ Loss"))
+        if not np.isin(self.exit_reason, (STOP, TARGET)).any():
+            df = df.drop(columns="exit")         # close-only backtest: every exit is a signal
+        return df
+
+    def to_arrow(self) -> pa.Table:
+        """Arrow table over the same buffers (ticker dictionary-encoded)."""
+        return pa.table({
+            "ticker":     pa.DictionaryArray.from_arrays(pa.array(self.code, type=pa.int32()),
+                                                         pa.array(self.symbols, type=pa.string())),
+            "buy_date":   pa.array(self.buy_date),
+            "sell_date":  pa.array(self.sell_date, from_pandas=True),    # NaT → null
+            "buy_price":  pa.array(self.buy_price),
+            "sell_price": pa.array(self.sell_price),
+            "return_pct": pa.array(self.return_pct),
+            "hold_days":  pa.array(self.hold_days),
+            "rsi_at_buy": pa.array(self.rsi_at_buy),
+            "exit":       pa.DictionaryArray.from_arrays(pa.array(self.exit_reason, type=pa.int8()),
+                                                         pa.array(EXIT_REASONS, type=pa.string())),
+        })
+
+    def to_parquet(self, where):
+        """Write the log to a Parquet file path or binary file object."""
+        pq.write_table(self.to_arrow(), where)